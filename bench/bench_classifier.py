@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Classify every title in data/discovery-candidates.json with the full
+discovery config (performance keywords, blockedTerms,
+blockedChannelKeywords, trusted-channels.json) and compare the compiled
+TitleClassifier against the old any()-over-keywords checks.
+
+Usage:
+  python bench/bench_classifier.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.classifier import TitleClassifier  # noqa: E402
+from nhra_scraper import INCLUDE_KEYWORDS, EXCLUDE_KEYWORDS  # noqa: E402
+
+# Same list discover-shows.js uses for its "performance signal" check.
+PERFORMANCE_KEYWORDS = [
+    "full concert", "full show", "full set", "live at", "live in", "live from",
+    "unplugged", "acoustic", "tiny desk", "pro-shot", "pro shot", "official live",
+    "festival", "full performance", "full session", "concert film", "live concert",
+]
+
+
+def load(name):
+    with open(os.path.join(ROOT, "data", name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def naive(title, channel, include, exclude, blocked, blocked_channels, trusted):
+    lower = title.lower()
+    channel_lower = channel.strip().lower()
+    trusted_hit = any(channel_lower == t for t in trusted)
+    if any(bad in lower for bad in exclude):
+        return False, trusted_hit
+    if any(bad in lower for bad in blocked):
+        return False, trusted_hit
+    if any(kw in channel_lower for kw in blocked_channels):
+        return False, trusted_hit
+    return any(good in lower for good in include), trusted_hit
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compiled classifier vs a pass per keyword.")
+    parser.add_argument("--repeat", type=int, default=20, metavar="N")
+    repeat = parser.parse_args(argv).repeat
+    candidates = load("discovery-candidates.json")
+    watchlist = load("artist-watchlist.json")
+    trusted = [t.lower() for t in load("trusted-channels.json")]
+
+    include = [k.lower() for k in INCLUDE_KEYWORDS + PERFORMANCE_KEYWORDS]
+    exclude = [k.lower() for k in EXCLUDE_KEYWORDS]
+    blocked = [k.lower() for k in watchlist.get("blockedTerms", [])]
+    blocked_channels = [k.lower() for k in watchlist.get("blockedChannelKeywords", [])]
+    rows = [(c.get("title", ""), c.get("channelName", "")) for c in candidates]
+
+    started = time.perf_counter()
+    classifier = TitleClassifier(include, exclude, blocked, blocked_channels, trusted)
+    compile_s = time.perf_counter() - started
+
+    def run(fn):
+        best = None
+        out = None
+        for _ in range(repeat):
+            t = time.perf_counter()
+            out = [fn(title, channel) for title, channel in rows]
+            elapsed = time.perf_counter() - t
+            best = elapsed if best is None else min(best, elapsed)
+        return best, out
+
+    naive_s, naive_out = run(lambda t, c: naive(t, c, include, exclude, blocked, blocked_channels, trusted))
+    compiled_s, compiled_out = run(lambda t, c: classifier.classify(t, c))
+
+    mismatches = sum(1 for a, b in zip(naive_out, compiled_out) if a != (b.accepted, b.trusted_channel))
+    print(json.dumps({
+        "titles": len(rows),
+        "keywords": len(include) + len(exclude) + len(blocked) + len(blocked_channels),
+        "trusted_channels": len(trusted),
+        "compile_ms": round(compile_s * 1000, 3),
+        "naive_ms": round(naive_s * 1000, 3),
+        "compiled_ms": round(compiled_s * 1000, 3),
+        "accepted": sum(1 for c in compiled_out if c.accepted),
+        "mismatches": mismatches,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Times the addons' and the scraper's hot paths against synthetic inputs
+(bench/synth.py) with in-process xbmc/xbmcgui/xbmcplugin fakes
+(bench/fakes/), and prints the results as JSON.
+
+Each case is run once to warm up, --repeat times for wall time (best
+and median), then once more under tracemalloc for the peak memory it
+allocated. Catalog sizes are in tracks; folders are nested --depth
+levels, --fanout wide.
+
+Cases per catalog size:
+  default.get_node_by_path      deepest path, resolved --ops times
+  default.list_node.root        root listing
+  default.list_node.leaf        a deepest-level folder
+  default.browse_queue          the largest queue
+  default.get_track_video_ids   every queue in the catalog
+  default.yt_id_from_url        every track URL in the catalog
+  default.search.build          search index over the whole tree
+  default.search.query          a handful of queries on that index
+  plugin.list_mode              "all" view, first page (builds the Catalog)
+  plugin.list_tracks            largest queue by key (builds the Catalog)
+
+Cases per feed size:
+  scraper.parse_entries
+  scraper.looks_like_full_broadcast
+
+Usage:
+  python bench/bench_hotpaths.py [--sizes 1000,10000,100000,1000000]
+      [--feeds 15,1000,20000] [--depth 5] [--fanout 12] [--repeat 3]
+      [--ops 1000] [--only SUBSTRING] [--out results.json]
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(HERE, "fakes"))
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+import xbmcaddon  # noqa: E402  (the fake)
+import xbmcplugin  # noqa: E402
+
+import synth  # noqa: E402
+from jac.search import SearchIndex  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_FEEDS = [15, 1000, 20000]
+QUERIES = ["nirvana", "unplugged rooster", "tiny desk 2001", "ounds", "zzz"]
+
+
+class TreeCache(object):
+    """Stands in for JsonCache: hands out one in-memory catalog."""
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def get(self, key, url, ttl=None):
+        return self.tree
+
+    def version(self, key):
+        return "bench"
+
+    def flush_stats(self):
+        return ""
+
+
+def load_addon(name, path):
+    # Both addons read sys.argv at import time, as Kodi sets it.
+    sys.argv = ["plugin://plugin.video.joeysacousticcorner/", "1", ""]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(fn, repeat):
+    result = fn()  # warm-up: compiled regexes, lazily built state
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return {
+        "best_ms": round(min(times) * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "peak_kb": round(peak / 1024.0, 1),
+    }, result
+
+
+def rendered(fn):
+    # Runs a listing against the fake xbmcplugin; returns rows handed over.
+    # No rows means the case hit an error branch, which isn't worth timing.
+    def run():
+        xbmcplugin.reset()
+        fn()
+        if not xbmcplugin.STATS["items"]:
+            raise RuntimeError("listing rendered no rows")
+        return xbmcplugin.STATS["items"]
+    return run
+
+
+def catalog_cases(default, plugin, tree, ops):
+    all_eps = list(iter_all_episodes(tree))
+    queues = [ep for ep in all_eps if ep.get("mode") == "queue"]
+    urls = [t.get("url", "") for ep in all_eps for t in ep.get("tracks") or []]
+    deep = synth.deepest_path(tree)
+    leaf = deep.rsplit("/", 1)[0] if "/" in deep else ""
+    leaf_node = default.get_node_by_path(tree, leaf)
+    queue_path, queue = synth.largest_queue(tree)
+
+    def node_by_path():
+        for _ in range(ops):
+            node = default.get_node_by_path(tree, deep)
+        return node.get("title")
+
+    def search_docs():
+        return SearchIndex.build(default.iter_search_docs(tree), "bench")
+
+    index = []  # built by the untimed warm-up call
+
+    def queries():
+        if not index:
+            index.append(search_docs())
+        return sum(len(index[0].search(q)) for q in QUERIES)
+
+    def plugin_tracks():
+        catalog = plugin.load_catalog()
+        key = next(k for k, ep in catalog.episodes.items() if ep is queue)
+        plugin.list_tracks(key)
+
+    return [
+        ("default.get_node_by_path", node_by_path, {"path": deep, "ops": ops}),
+        ("default.list_node.root", rendered(lambda: default.list_node(tree, "")), {}),
+        ("default.list_node.leaf", rendered(lambda: default.list_node(leaf_node, leaf)), {"path": leaf}),
+        ("default.browse_queue", rendered(lambda: default.browse_queue(tree, {"path": queue_path})),
+         {"tracks": len(queue["tracks"])}),
+        ("default.get_track_video_ids", lambda: sum(len(default.get_track_video_ids(q)) for q in queues),
+         {"queues": len(queues)}),
+        ("default.yt_id_from_url", lambda: sum(1 for u in urls if default.yt_id_from_url(u)),
+         {"urls": len(urls)}),
+        ("default.search.build", lambda: len(search_docs().docs), {}),
+        ("default.search.query", queries, {"queries": len(QUERIES)}),
+        ("plugin.list_mode", rendered(lambda: plugin.list_mode("all", 0)), {"episodes": len(all_eps)}),
+        ("plugin.list_tracks", rendered(plugin_tracks), {}),
+    ]
+
+
+def feed_cases(scraper, n_entries):
+    feed = synth.make_feed(n_entries)
+    titles = [e["title"] for e in scraper.parse_entries(feed)]
+    return [
+        ("scraper.parse_entries", lambda: len(scraper.parse_entries(feed)), {"bytes": len(feed)}),
+        ("scraper.looks_like_full_broadcast",
+         lambda: sum(1 for t in titles if scraper.looks_like_full_broadcast(t)), {}),
+    ]
+
+
+def iter_all_episodes(tree):
+    stack = [tree]
+    while stack:
+        for node in stack.pop():
+            if node.get("mode") == "folder":
+                stack.append(node.get("items") or [])
+            else:
+                yield node
+
+
+def int_list(text):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Time the addons' and the scraper's hot paths.")
+    parser.add_argument("--sizes", type=int_list, default=DEFAULT_SIZES, metavar="N,N")
+    parser.add_argument("--feeds", type=int_list, default=DEFAULT_FEEDS, metavar="N,N")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--fanout", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--only", default="")
+    parser.add_argument("--out", metavar="results.json")
+    args = parser.parse_args(argv)
+    sizes, feeds, depth, fanout = args.sizes, args.feeds, args.depth, args.fanout
+    repeat, ops, only, out_path = args.repeat, args.ops, args.only, args.out
+
+    xbmcaddon.SETTINGS.update({"page_size": "100", "cache_ttl_minutes": "15", "art_enabled": "false"})
+    default = load_addon("jac_default", os.path.join(ROOT, "default.py"))
+    plugin = load_addon("jac_plugin", os.path.join(ROOT, "plugin.video.joeysacousticcorner", "default.py"))
+    import nhra_scraper as scraper
+
+    results = []
+
+    def run(cases, **labels):
+        for name, fn, extra in cases:
+            if only and only not in name:
+                continue
+            stats, value = measure(fn, repeat)
+            row = dict(case=name, **labels)
+            row.update(stats)
+            row["result"] = value
+            row.update(extra)
+            results.append(row)
+            print(f"  {name:<36} {stats['best_ms']:>10.2f} ms  {stats['peak_kb']:>10.1f} KiB", file=sys.stderr)
+
+    for n in sizes:
+        started = time.perf_counter()
+        tree = synth.make_catalog(n, depth=depth, fanout=fanout)
+        print(f"{n} tracks (generated in {time.perf_counter() - started:.2f}s)", file=sys.stderr)
+        cache = TreeCache(tree)
+        default.CACHE = cache
+        plugin.CACHE = cache
+        run(catalog_cases(default, plugin, tree, ops), tracks=n)
+        default.CACHE = plugin.CACHE = tree = cache = None
+        gc.collect()
+
+    for n in feeds:
+        print(f"feed with {n} entries", file=sys.stderr)
+        run(feed_cases(scraper, n), entries=n)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "depth": depth,
+        "fanout": fanout,
+        "repeat": repeat,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Memory of the catalog as raw json.loads dicts vs the compact model
+(bench/model.py), on synthetic catalogs (bench/synth.py).
+
+Every measurement runs in a fresh interpreter, so peak RSS belongs to
+that approach alone. The catalog is written to a temp file first; the
+child reads the bytes, notes its RSS, parses, and reports:
+
+  parse_ms      time to go from bytes to the in-memory tree
+  scan_ms       one full walk counting queues (the mode check every
+                listing does: str(...).lower() on dicts, an int on records)
+  retained_kb   RSS growth that is still there after parsing
+  peak_kb       highest RSS (ru_maxrss) minus the RSS before parsing
+
+Approaches:
+  dict          json.loads, as both addons do
+  model.loads   model.loads: records built during parsing
+
+Linux only (RSS from /proc/self/statm).
+
+Usage:
+  python bench/bench_model.py [--sizes 10000,100000] [--depth 5] [--fanout 12] [--out results.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = [10000, 100000]
+APPROACHES = ("dict", "model.loads")
+
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def count_queues_dict(items):
+    n = 0
+    stack = [items]
+    while stack:
+        for ep in stack.pop():
+            mode = str(ep.get("mode", "")).lower()
+            if mode == "folder":
+                stack.append(ep.get("items", []) or [])
+            elif mode == "queue":
+                n += 1
+    return n
+
+
+def count_queues_model(items):
+    from model import FOLDER, QUEUE
+    n = 0
+    stack = [items]
+    while stack:
+        for node in stack.pop():
+            if node.mode == FOLDER:
+                stack.append(node.items)
+            elif node.mode == QUEUE:
+                n += 1
+    return n
+
+
+def child(approach, path):
+    import model
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    gc.collect()
+    before = rss_kb()
+
+    started = time.perf_counter()
+    if approach == "dict":
+        tree = json.loads(raw)
+    else:
+        tree = model.loads(raw)
+    parse_s = time.perf_counter() - started
+    del raw
+    gc.collect()
+    after = rss_kb()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    queues = count_queues_dict(tree) if approach == "dict" else count_queues_model(tree)
+    scan_s = time.perf_counter() - started
+
+    print(json.dumps({
+        "parse_ms": round(parse_s * 1000, 1),
+        "scan_ms": round(scan_s * 1000, 1),
+        "queues": queues,
+        "retained_kb": after - before,
+        "peak_kb": peak - before,
+    }))
+
+
+def main(argv):
+    if argv and argv[0] == "--child":
+        child(argv[1], argv[2])
+        return
+
+    import synth
+
+    parser = argparse.ArgumentParser(description="Catalog memory: json.loads dicts vs the compact model.")
+    parser.add_argument("--sizes", type=lambda text: [int(x) for x in text.split(",") if x.strip()],
+                        default=DEFAULT_SIZES, metavar="N,N")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--fanout", type=int, default=12)
+    parser.add_argument("--out", metavar="results.json")
+    args = parser.parse_args(argv)
+    sizes, depth, fanout, out_path = args.sizes, args.depth, args.fanout, args.out
+
+    results = []
+    for n in sizes:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        try:
+            tree = synth.make_catalog(n, depth=depth, fanout=fanout)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(tree, f, ensure_ascii=False)
+            tree = None
+            size_kb = os.path.getsize(path) // 1024
+            print(f"{n} tracks ({size_kb} KiB of JSON)", file=sys.stderr)
+            for approach in APPROACHES:
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", approach, path],
+                                     check=True, stdout=subprocess.PIPE).stdout
+                row = dict(case=approach, tracks=n, json_kb=size_kb, **json.loads(out.decode("utf-8")))
+                results.append(row)
+                print(f"  {approach:<12} parse {row['parse_ms']:>9.1f} ms  retained {row['retained_kb']:>9} KiB"
+                      f"  peak {row['peak_kb']:>9} KiB", file=sys.stderr)
+        finally:
+            os.remove(path)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "depth": depth,
+        "fanout": fanout,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
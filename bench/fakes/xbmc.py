@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""In-process stand-in for Kodi's xbmc module (benchmarks only)."""
+
+LOGDEBUG, LOGINFO, LOGWARNING, LOGERROR = 0, 1, 2, 3
+PLAYLIST_MUSIC, PLAYLIST_VIDEO = 0, 1
+
+# Every log() call lands here, so a benchmark can check what was said.
+LOG = []
+PLAYED = []
+
+
+def log(msg, level=LOGDEBUG):
+    LOG.append((level, msg))
+
+
+class PlayList(object):
+    def __init__(self, kind):
+        self.kind = kind
+        self.items = []
+
+    def clear(self):
+        self.items = []
+
+    def add(self, url, listitem=None, index=-1):
+        self.items.append(url)
+
+    def size(self):
+        return len(self.items)
+
+
+class Player(object):
+    def play(self, item=None, listitem=None, windowed=False, startpos=-1):
+        PLAYED.append(item)
+
+    def isPlaying(self):
+        return False
+
+
+class Monitor(object):
+    def abortRequested(self):
+        return True
+
+    def waitForAbort(self, timeout=None):
+        return True
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""In-process stand-in for Kodi's xbmcaddon module (benchmarks only)."""
+
+import tempfile
+
+# Benchmarks set these before importing an addon.
+SETTINGS = {}
+PROFILE = tempfile.mkdtemp(prefix="jac-bench-profile-")
+
+
+class Addon(object):
+    def __init__(self, id=None):
+        self.id = id or "plugin.video.joeysacousticcorner"
+
+    def getSetting(self, key):
+        return str(SETTINGS.get(key, ""))
+
+    def setSetting(self, key, value):
+        SETTINGS[key] = value
+
+    def getAddonInfo(self, key):
+        if key == "profile":
+            return PROFILE
+        if key == "id":
+            return self.id
+        return ""
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""In-process stand-in for Kodi's xbmcgui module (benchmarks only)."""
+
+NOTIFICATION_INFO = "info"
+NOTIFICATION_WARNING = "warning"
+NOTIFICATION_ERROR = "error"
+
+# Answer Dialog().input() gives; set by the benchmark.
+INPUT = ""
+
+
+class ListItem(object):
+    __slots__ = ("label", "path", "properties", "info", "art")
+
+    def __init__(self, label="", label2="", path="", offscreen=False):
+        self.label = label
+        self.path = path
+        self.properties = {}
+        self.info = None
+        self.art = None
+
+    def setProperty(self, key, value):
+        self.properties[key] = value
+
+    def setInfo(self, kind, info):
+        self.info = info
+
+    def setArt(self, art):
+        self.art = dict(art)
+
+    def getLabel(self):
+        return self.label
+
+
+class Dialog(object):
+    def notification(self, heading, message, icon=None, time=0, sound=True):
+        pass
+
+    def input(self, heading, defaultt="", type=0):
+        return INPUT
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+In-process stand-in for Kodi's xbmcplugin module (benchmarks only).
+
+Only counts what the addon hands over, so rendering a million rows
+doesn't also measure the cost of keeping them.
+"""
+
+STATS = {"items": 0, "folders": 0, "directories": 0, "resolved": 0}
+LAST = {"url": None, "label": None}
+
+
+def reset():
+    for key in STATS:
+        STATS[key] = 0
+    LAST["url"] = LAST["label"] = None
+
+
+def addDirectoryItem(handle, url, listitem, isFolder=False, totalItems=0):
+    STATS["items"] += 1
+    if isFolder:
+        STATS["folders"] += 1
+    LAST["url"], LAST["label"] = url, listitem.label
+    return True
+
+
+def addDirectoryItems(handle, items, totalItems=0):
+    for url, listitem, is_folder in items:
+        addDirectoryItem(handle, url, listitem, is_folder)
+    return True
+
+
+def endOfDirectory(handle, succeeded=True, updateListing=False, cacheToDisc=True):
+    STATS["directories"] += 1
+
+
+def setResolvedUrl(handle, succeeded, listitem):
+    STATS["resolved"] += 1
+    LAST["url"] = listitem.path
+
+
+def setContent(handle, content):
+    pass
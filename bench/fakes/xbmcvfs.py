@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""In-process stand-in for Kodi's xbmcvfs module (benchmarks only)."""
+
+
+def translatePath(path):
+    return path
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Compact in-memory catalog model.
+
+json.loads gives every node and track its own dict, with its own copy of
+strings like "Full Session Stream", "fullshow" or an artist's name, and
+every caller re-derives the mode with str(...).lower(). Here:
+
+  - Node and Track are __slots__ records (no per-object dict)
+  - strings that repeat across the catalog (modes, artists, track
+    titles, thumbs) are interned, so each distinct value is stored once
+  - the mode is normalized once into a small int (FOLDER, FULLSHOW,
+    QUEUE, PLAYLIST, OTHER); node.mode_name gives the canonical string
+  - keys the model doesn't know about are kept in a per-node "extra"
+    dict (None when there are none, which is nearly always)
+
+loads() parses episodes.json straight into records (an object_hook),
+so the dict tree never exists as a whole. On bench/bench_model.py's
+100k-track catalog it retains about a third of what json.loads does,
+but parses about 3x slower. The addons stay on plain dicts (a plugin
+run is short and latency-bound, and the longer-lived copies are
+already SQLite or shards), so this module lives with the benchmark
+and isn't shipped in the Kodi zip; it is what a long-lived, large
+in-memory copy would use.
+
+Node and Track also answer get()/[]/in/keys() like the dicts they
+replace, so code written against episodes.json dicts (jac.youtube,
+the listing helpers) works on either, and to_plain() turns them back
+into dicts for JSON.
+"""
+
+import json
+import sys
+
+FOLDER, FULLSHOW, QUEUE, PLAYLIST, OTHER = range(5)
+MODE_NAMES = ("folder", "fullshow", "queue", "playlist", "")
+_MODES = {name: i for i, name in enumerate(MODE_NAMES) if name}
+
+_MISSING = object()
+_intern = sys.intern
+
+
+def parse_mode(value):
+    return _MODES.get(str(value or "").lower(), OTHER)
+
+
+def _istr(value):
+    return _intern(value) if isinstance(value, str) else value
+
+
+class Track(object):
+    __slots__ = ("title", "url", "extra")
+
+    _FIELDS = ("title", "url")
+
+    def __init__(self, title=_MISSING, url=_MISSING, extra=None):
+        self.title = _istr(title)
+        self.url = url
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d):
+        extra = {k: v for k, v in d.items() if k not in cls._FIELDS} or None
+        return cls(d.get("title", _MISSING), d.get("url", _MISSING), extra)
+
+    def get(self, key, default=None):
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self):
+        return [k for k in self._FIELDS if getattr(self, k) is not _MISSING] + list(self.extra or ())
+
+    def to_dict(self):
+        return {k: self[k] for k in self.keys()}
+
+
+def _track(value):
+    if isinstance(value, dict):
+        return Track.from_dict(value)
+    return value
+
+
+class Node(object):
+    __slots__ = ("title", "artist", "year", "mode", "thumb", "tracks", "encore",
+                 "encore_after", "extra", "_items", "_raw_mode")
+
+    # dict key -> slot
+    _FIELDS = {
+        "title": "title",
+        "artist": "artist",
+        "year": "year",
+        "thumb": "thumb",
+        "encore": "encore",
+        "encoreAfterTrackIndex": "encore_after",
+    }
+
+    @classmethod
+    def from_dict(cls, d):
+        node = cls.__new__(cls)
+        node.title = d.get("title", _MISSING)
+        node.artist = _istr(d.get("artist", _MISSING))
+        node.year = d.get("year", _MISSING)
+        node.thumb = _istr(d.get("thumb", _MISSING))
+        raw_mode = d.get("mode", _MISSING)
+        node.mode = parse_mode(raw_mode if raw_mode is not _MISSING else "")
+        # Kept as written only when it isn't already the canonical name.
+        node._raw_mode = raw_mode if raw_mode is _MISSING or raw_mode != MODE_NAMES[node.mode] else None
+        node.encore = _track(d.get("encore", _MISSING))
+        node.encore_after = d.get("encoreAfterTrackIndex", _MISSING)
+        tracks = d.get("tracks", _MISSING)
+        node.tracks = tuple(_track(t) for t in tracks) if isinstance(tracks, list) else tracks
+
+        items = d.get("items", _MISSING)
+        node._items = tuple(items) if isinstance(items, list) else items
+
+        known = ("mode", "tracks", "items")
+        node.extra = {k: v for k, v in d.items() if k not in cls._FIELDS and k not in known} or None
+        return node
+
+    @property
+    def items(self):
+        """Children, or () for a non-folder."""
+        return () if self._items is _MISSING else self._items
+
+    @property
+    def mode_name(self):
+        return MODE_NAMES[self.mode]
+
+    def get(self, key, default=None):
+        slot = self._FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+        elif key == "mode":
+            value = MODE_NAMES[self.mode] if self._raw_mode is None else self._raw_mode
+        elif key == "tracks":
+            value = self.tracks
+        elif key == "items":
+            value = self._items
+        else:
+            return self.extra.get(key, default) if self.extra else default
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self):
+        keys = [k for k in ("title", "artist", "year", "mode", "thumb", "tracks", "encore",
+                            "encoreAfterTrackIndex", "items") if k in self]
+        return keys + list(self.extra or ())
+
+    def to_dict(self):
+        return {k: to_plain(self[k]) for k in self.keys()}
+
+
+def to_plain(value):
+    """Dicts/lists again, for json.dumps."""
+    if isinstance(value, (Node, Track)):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
+
+
+def _hook(d):
+    # Bottom-up: children are records already by the time their parent is seen.
+    if "mode" in d or "items" in d or "tracks" in d:
+        return Node.from_dict(d)
+    if "url" in d:
+        return Track.from_dict(d)
+    return d
+
+
+def loads(raw):
+    """Parses episodes.json (bytes or str) directly into records."""
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    data = json.loads(raw, object_hook=_hook)
+    return list(data) if isinstance(data, list) else data
+
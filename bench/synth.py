@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic inputs for the benchmarks: catalogs shaped like episodes.json
+and Atom feeds shaped like YouTube's channel feeds.
+
+Everything is driven by a seeded random.Random, so the same arguments
+always produce the same document and runs are comparable.
+
+make_catalog(n_tracks, depth, fanout)
+    Episodes in the proportions the real catalog has (mostly full
+    shows, a good share of queues, a few playlists, some queues with
+    an encore), all three YouTube URL forms, then grouped into folders
+    `fanout` wide and up to `depth` levels deep.
+
+make_feed(n_entries)
+    An Atom document with n entries, newest first; about one title in
+    five reads like a full broadcast, the rest like highlight reels.
+"""
+
+import math
+import random
+from xml.sax.saxutils import escape
+
+_ID_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+
+_ARTISTS = [
+    "Alice In Chains", "Nirvana", "Pearl Jam", "Creed", "Alanis Morissette",
+    "Stone Temple Pilots", "Soundgarden", "Foo Fighters", "Eric Clapton",
+    "Jewel", "Hozier", "Chris Stapleton", "Billie Eilish", "Sigur Rós",
+]
+_VENUES = ["MTV Unplugged", "Tiny Desk", "Live at the Fillmore", "KEXP Session",
+           "Austin City Limits", "BBC Live Lounge", "SiriusXM Session"]
+_SONGS = ["Nutshell", "Down In A Hole", "Heaven Beside You", "Rooster",
+          "Would?", "Black", "About A Girl", "Hallelujah", "Everlong",
+          "Layla", "Tears In Heaven", "Ironic", "Hand In My Pocket"]
+
+
+def _video_id(rng):
+    return "".join(rng.choice(_ID_CHARS) for _ in range(11))
+
+
+def _video_url(rng):
+    vid = _video_id(rng)
+    form = rng.random()
+    if form < 0.6:
+        return f"https://youtu.be/{vid}"
+    if form < 0.9:
+        return f"https://www.youtube.com/watch?v={vid}"
+    return f"https://www.youtube.com/embed/{vid}"
+
+
+def _episode(rng, n, budget):
+    artist = rng.choice(_ARTISTS)
+    venue = rng.choice(_VENUES)
+    year = rng.randint(1989, 2025)
+    ep = {"title": f"{artist} — {venue} #{n}", "artist": artist, "year": year}
+
+    kind = rng.random()
+    if kind < 0.55 or budget < 2:
+        ep["mode"] = "fullshow"
+        ep["tracks"] = [{"title": "Full Session", "url": _video_url(rng)}]
+    elif kind < 0.60:
+        ep["mode"] = "queue"
+        ep["tracks"] = [{"title": "Playlist",
+                         "url": f"https://www.youtube.com/playlist?list=PL{_video_id(rng)}{_video_id(rng)}"}]
+    else:
+        count = min(budget, rng.randint(4, 18))
+        ep["mode"] = "queue"
+        ep["tracks"] = [{"title": rng.choice(_SONGS), "url": _video_url(rng)} for _ in range(count)]
+        if kind > 0.95:
+            ep["encore"] = {"title": rng.choice(_SONGS), "url": _video_url(rng)}
+            ep["encoreAfterTrackIndex"] = rng.randrange(count)
+    return ep
+
+
+def _nest(items, depth, fanout, label="Folder"):
+    if depth <= 1 or len(items) <= fanout:
+        return items
+    size = int(math.ceil(len(items) / float(fanout)))
+    folders = []
+    for i in range(0, len(items), size):
+        name = f"{label} {len(folders) + 1}"
+        folders.append({"title": name, "mode": "folder",
+                        "items": _nest(items[i:i + size], depth - 1, fanout, name)})
+    return folders
+
+
+def make_catalog(n_tracks, depth=5, fanout=12, seed=1):
+    """A catalog tree holding about n_tracks tracks."""
+    rng = random.Random(seed)
+    episodes = []
+    left = n_tracks
+    while left > 0:
+        ep = _episode(rng, len(episodes) + 1, left)
+        left -= len(ep["tracks"])
+        episodes.append(ep)
+    return _nest(episodes, depth, fanout)
+
+
+def deepest_path(tree):
+    """"i/j/k" of the last item in the last folder at every level."""
+    parts = []
+    node = tree
+    while True:
+        items = node if isinstance(node, list) else node.get("items") or []
+        if not items:
+            break
+        parts.append(str(len(items) - 1))
+        node = items[-1]
+        if node.get("mode") != "folder":
+            break
+    return "/".join(parts)
+
+
+def largest_queue(tree):
+    """(path, node) of the queue with the most tracks."""
+    best = (None, {"tracks": []})
+    stack = [(tree, "")]
+    while stack:
+        items, path = stack.pop()
+        for i, node in enumerate(items):
+            child = f"{path}/{i}" if path else str(i)
+            if node.get("mode") == "folder":
+                stack.append((node.get("items") or [], child))
+            elif node.get("mode") == "queue" and len(node["tracks"]) > len(best[1]["tracks"]):
+                best = (child, node)
+    return best
+
+
+def make_feed(n_entries, seed=1):
+    """Atom feed bytes with n_entries entries, newest first."""
+    rng = random.Random(seed)
+    full = ["Full Broadcast", "Full Race", "Final Round", "Race Day Replay", "Full Qualifying"]
+    other = ["Highlights", "Top 5 Moments", "Recap", "Preview", "Shorts"]
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" '
+        'xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+        "<title>NHRA</title>\n"
+    ]
+    for i in range(n_entries):
+        vid = _video_id(rng)
+        words = full if rng.random() < 0.2 else other
+        title = escape(f"Event {n_entries - i} {rng.choice(words)} | NHRA Drag Racing")
+        day = 1 + i % 28
+        parts.append(
+            "<entry>\n"
+            f"  <id>yt:video:{vid}</id>\n"
+            f"  <yt:videoId>{vid}</yt:videoId>\n"
+            f"  <title>{title}</title>\n"
+            f'  <link rel="alternate" href="https://www.youtube.com/watch?v={vid}"/>\n'
+            f"  <published>2025-06-{day:02d}T12:00:00+00:00</published>\n"
+            "  <media:group>\n"
+            f"    <media:title>{title}</media:title>\n"
+            f'    <media:thumbnail url="https://i.ytimg.com/vi/{vid}/hqdefault.jpg" width="480" height="360"/>\n'
+            "    <media:description>Synthetic entry for benchmarking.</media:description>\n"
+            "  </media:group>\n"
+            "</entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
@@ -1,71 +1,116 @@
 # -*- coding: utf-8 -*-
+import os
 import sys
-import json
-import re
-import time
-import urllib.request
+import itertools
 import urllib.parse
 
 import xbmc
+import xbmcaddon
 import xbmcgui
 import xbmcplugin
+import xbmcvfs
+
+from jac.artwork import ArtCache, youtube_thumb
+from jac.cache import JsonCache
+from jac.catalog import index_nodes
+from jac.delta import DeltaSync
+from jac.search import load_or_build
+from jac.service import PORT_FILE, ServiceCatalog, ServiceUnavailable
+from jac.shards import ShardedCatalog
+from jac.sqlcatalog import fetch_database
+from jac.trace import Tracer
+from jac.transport import default_client
+from jac.youtube import (
+    get_track_video_ids,
+    has_encore,
+    iter_track_video_ids,
+    pack_video_ids,
+    playlist_id_from_url,
+    unpack_video_ids,
+    youtube_play_video,
+    yt_id_from_url,
+)
 
 HANDLE = int(sys.argv[1])
+ADDON = xbmcaddon.Addon()
+PROFILE_DIR = xbmcvfs.translatePath(ADDON.getAddonInfo("profile"))
 
 # ====== CHANGE THIS to your live Netlify site ======
 SITE = "https://mellifluous-tanuki-51d911.netlify.app"
 
-# ✅ ONE SOURCE OF TRUTH (cache-busted every run)
-EP_URL = SITE + "/episodes.json?nocache=" + str(int(time.time()))
+# ✅ ONE SOURCE OF TRUTH (kept in the profile dir, revalidated with ETag/Last-Modified)
+EP_URL = SITE + "/episodes.json"
+# Sharded layout (scripts/build_shards.py); used when the SQLite one isn't there
+CATALOG_URL = SITE + "/catalog"
+# The same catalog compiled to SQLite (scripts/build_sqlite.py); tried first
+SQLITE_URL = CATALOG_URL + "/sqlite"
+# Catalog version + change sets (scripts/build_deltas.py): refreshing the
+# local episodes.json downloads only what changed
+VERSION_URL = CATALOG_URL + "/version.json"
 
 UA = "Kodi/21 JoeysAcousticCorner"
 
+# ListItems are handed to Kodi this many at a time (addDirectoryItems)
+ITEM_BATCH = 50
+
+# Thumbnails: rows use the cached file or the remote URL, never waiting.
+# Up to ART_PREFETCH_MAX uncached ones per listing go to the service to
+# download; with no service, the plugin spends about ART_WAIT s on them
+# after the listing has been handed to Kodi.
+ART_PREFETCH_MAX = 100
+ART_WAIT = 1.0
+
+# "Play All" starts with this many tracks queued past the first; the
+# background service adds the rest as playback advances
+QUEUE_AHEAD = 3
+
+# Queues up to this long carry their video IDs in the "Play All" URL, so
+# playback starts without loading the catalog; longer ones go by path
+MAX_URL_IDS = 200
+
 # ====== FALLBACK (only if JSON is unreachable) ======
 FALLBACK_EPISODES = [
     ("Nirvana — MTV Unplugged (Full Session)", "https://youtu.be/pOTkCgkxqyg"),
     ("Alice In Chains — MTV Unplugged (Full Session)", "https://youtu.be/Jprla2NvHY0"),
 ]
 
+# Set by load_episodes() when the service, the SQLite or the sharded catalog is in use
+SHARDS = None
+# {node ID: path} when running from episodes.json (the others answer path_of())
+NODE_PATHS = None
+CACHE = None
+ART = None
+# Thumbnail URLs this run listed without a cached file
+ART_PENDING = []
+
+# Timing spans for this invocation (Settings → Diagnostics)
+TRACE = Tracer(enabled=ADDON.getSetting("trace_enabled") == "true")
+
 def log(msg):
     xbmc.log(f"[JAC] {msg}", xbmc.LOGINFO)
 
 def notify(msg):
     xbmcgui.Dialog().notification("Joey’s Acoustic Corner", msg, xbmcgui.NOTIFICATION_INFO, 4000)
 
-def http_get_json(url):
-    headers = {
-        "User-Agent": UA,
-        "Cache-Control": "no-cache, no-store, must-revalidate",
-        "Pragma": "no-cache",
-        "Expires": "0",
-    }
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        data = resp.read().decode("utf-8")
-        return json.loads(data)
-
-def yt_id_from_url(url):
-    if not url:
-        return None
-    m = re.search(r"youtu\.be/([A-Za-z0-9_\-]+)", url)
-    if m:
-        return m.group(1)
-    m = re.search(r"[?&]v=([A-Za-z0-9_\-]+)", url)
-    if m:
-        return m.group(1)
-    m = re.search(r"/embed/([A-Za-z0-9_\-]+)", url)
-    if m:
-        return m.group(1)
-    return None
-
-def playlist_id_from_url(url):
-    if not url:
-        return None
-    m = re.search(r"[?&]list=([A-Za-z0-9_\-]+)", url)
-    return m.group(1) if m else None
-
-def youtube_play_video(video_id):
-    return f"plugin://plugin.video.youtube/play/?video_id={video_id}"
+def get_setting_int(key, default):
+    try:
+        return int(ADDON.getSetting(key))
+    except (TypeError, ValueError):
+        return default
+
+def get_cache():
+    global CACHE
+    if CACHE is None:
+        ttl = get_setting_int("cache_ttl_minutes", 15) * 60
+        CACHE = JsonCache(os.path.join(PROFILE_DIR, "cache"), ttl=ttl, user_agent=UA, log=log, tracer=TRACE)
+    return CACHE
+
+def get_art():
+    global ART
+    if ART is None and ADDON.getSetting("art_enabled") != "false":
+        budget = get_setting_int("art_cache_mb", 50) * 1024 * 1024
+        ART = ArtCache(os.path.join(PROFILE_DIR, "art"), budget=budget, user_agent=UA, log=log)
+    return ART
 
 def youtube_play_playlist(playlist_id):
     return f"plugin://plugin.video.youtube/play/?playlist_id={playlist_id}"
@@ -74,35 +119,162 @@ def youtube_play_playlist(playlist_id):
 def youtube_browse_playlist(playlist_id):
     return f"plugin://plugin.video.youtube/playlist/?playlist_id={playlist_id}"
 
-def add_item(label, action=None, params=None, is_folder=False, playable=False):
-    li = xbmcgui.ListItem(label=label)
-    if playable:
-        li.setProperty("IsPlayable", "true")
-
-    url = sys.argv[0]
-    if action:
-        q = {"action": action}
-        if params:
-            q.update(params)
-        url = url + "?" + urllib.parse.urlencode(q)
-
-    xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=is_folder)
+def plugin_url(action, params=None):
+    q = {"action": action}
+    if params:
+        q.update(params)
+    return sys.argv[0] + "?" + urllib.parse.urlencode(q)
 
-def add_external(label, path, is_folder=False, playable=False):
+def make_item(label, url, is_folder=False, playable=False, thumb=None):
     li = xbmcgui.ListItem(label=label)
     if playable:
         li.setProperty("IsPlayable", "true")
-    xbmcplugin.addDirectoryItem(HANDLE, path, li, isFolder=is_folder)
+    if thumb:
+        li.setArt({"thumb": thumb, "icon": thumb})
+    return (url, li, is_folder)
+
+def add_item(label, action=None, params=None, is_folder=False, playable=False, thumb=None):
+    url = plugin_url(action, params) if action else sys.argv[0]
+    xbmcplugin.addDirectoryItem(HANDLE, *make_item(label, url, is_folder, playable, thumb))
+    TRACE.add("items")
+
+def add_external(label, path, is_folder=False, playable=False, thumb=None):
+    xbmcplugin.addDirectoryItem(HANDLE, *make_item(label, path, is_folder, playable, thumb))
+    TRACE.add("items")
+
+def thumb_url(ep):
+    # the node's own thumb (site-relative ones resolved against SITE),
+    # else the first video's YouTube thumbnail
+    thumb = ep.get("thumb")
+    if thumb:
+        return urllib.parse.urljoin(SITE + "/", thumb)
+    tracks = ep.get("tracks", []) or []
+    vid = yt_id_from_url((tracks[0] or {}).get("url", "")) if tracks else None
+    return youtube_thumb(vid) if vid else None
+
+def with_local_art(rows):
+    # Swaps thumbnail URLs for cached files as rows are pulled; the
+    # uncached ones stay remote and are remembered for warm_art().
+    art = get_art()
+    if art is None:
+        yield from rows
+        return
+    for label, url, is_folder, playable, thumb in rows:
+        path = art.lookup(thumb) if thumb else None
+        if thumb and path is None and len(ART_PENDING) < ART_PREFETCH_MAX:
+            ART_PENDING.append(thumb)
+        yield label, url, is_folder, playable, path or thumb
+
+def warm_art():
+    # After the listing: the service downloads ART_PENDING in the
+    # background, or failing that this run does (see jac/artwork.py).
+    if not ART_PENDING:
+        return
+    try:
+        get_service().call("art", urls=ART_PENDING)
+        return
+    except ServiceUnavailable as e:
+        log(f"Art hand-off failed ({e}); fetching here")
+    with TRACE.span("art") as span:
+        local = ART.prefetch(ART_PENDING, timeout=ART_WAIT)
+        span.set(local=len(local))
+    ART.evict()
+
+def add_items(rows):
+    # rows: iterable of (label, url, is_folder, playable, thumb); ListItems
+    # are built as rows are pulled, and go to Kodi in ITEM_BATCH-sized chunks.
+    batch = []
+    for label, url, is_folder, playable, thumb in with_local_art(rows):
+        batch.append(make_item(label, url, is_folder, playable, thumb))
+        if len(batch) >= ITEM_BATCH:
+            xbmcplugin.addDirectoryItems(HANDLE, batch)
+            TRACE.add("items", len(batch))
+            batch = []
+    if batch:
+        xbmcplugin.addDirectoryItems(HANDLE, batch)
+        TRACE.add("items", len(batch))
+
+def page_bounds(page):
+    # (start, stop) child indexes for a page; stop None = no paging
+    size = get_setting_int("page_size", 100)
+    if size <= 0:
+        return 0, None
+    return page * size, (page + 1) * size
 
 def end_dir():
-    xbmcplugin.endOfDirectory(HANDLE, cacheToDisc=False)
+    with TRACE.span("endOfDirectory"):
+        xbmcplugin.endOfDirectory(HANDLE, cacheToDisc=False)
+
+def get_episodes_json():
+    # Full tree, brought up to date through the published deltas when
+    # the site has them (jac/delta.py), else fetched/revalidated whole.
+    cache = get_cache()
+    try:
+        with TRACE.span("delta") as span:
+            sync = DeltaSync(cache, VERSION_URL, EP_URL, log=log)
+            data = sync.get()
+            span.set(**sync.stats)
+        return data
+    except Exception as e:
+        log(f"Delta sync unavailable ({e})")
+    return cache.get("episodes", EP_URL)
 
 def load_episodes():
+    with TRACE.span("load") as span:
+        data = _load_episodes()
+        span.set(items=len(data) if data else 0)
+    return data
+
+def load_from_service():
+    # The background service (service.py) has the catalog parsed already.
+    global SHARDS
+    if ADDON.getSetting("service_enabled") == "false":
+        return None
+    service = ServiceCatalog(os.path.join(PROFILE_DIR, PORT_FILE))
+    try:
+        with TRACE.span("service") as span:
+            data = service.load_root()
+            span.set(items=len(data))
+    except ServiceUnavailable as e:
+        log(f"Background service unavailable ({e})")
+        service.close()
+        return None
+    SHARDS = service
+    log(f"Loaded catalog from background service ({len(data)} items)")
+    return data
+
+def _load_episodes():
+    global SHARDS, NODE_PATHS
+    data = load_from_service()
+    if data:
+        return data
+
+    cache = get_cache()
     try:
-        log("EP_URL USED: " + EP_URL)
-        data = http_get_json(EP_URL)
+        try:
+            with TRACE.span("sqlite"):
+                db = fetch_database(cache, SQLITE_URL, os.path.join(PROFILE_DIR, "sqlite"))
+                data = db.load_root()
+            SHARDS = db
+            log(f"Loaded SQLite catalog {db.version} ({len(data)} items)")
+            return data
+        except Exception as e:
+            log(f"SQLite catalog unavailable ({e}); trying shards")
+
+        try:
+            shards = ShardedCatalog(cache, CATALOG_URL)
+            data = shards.load_root()
+            SHARDS = shards
+            log(f"Loaded catalog manifest OK ({len(data)} items)")
+            return data
+        except Exception as e:
+            log(f"Sharded catalog unavailable ({e}); using episodes.json")
+
+        data = get_episodes_json()
         if isinstance(data, list):
             log(f"Loaded JSON OK ({len(data)} items)")
+            with TRACE.span("index"):
+                NODE_PATHS = index_nodes(data)
             return data
         log("JSON was not a list (bad format).")
         return None
@@ -110,34 +282,6 @@ def load_episodes():
         log(f"JSON fetch failed: {e}")
         return None
 
-def has_encore(ep):
-    try:
-        mode = str(ep.get("mode", "")).lower()
-        encore = ep.get("encore") or {}
-        encore_url = encore.get("url")
-        after_idx = ep.get("encoreAfterTrackIndex")
-        return (mode == "queue" and encore_url and isinstance(after_idx, int))
-    except Exception:
-        return False
-
-def get_track_video_ids(ep):
-    tracks = ep.get("tracks", []) or []
-    ids = []
-    for t in tracks:
-        url = (t or {}).get("url", "")
-        vid = yt_id_from_url(url)
-        if vid:
-            ids.append(vid)
-
-    if has_encore(ep):
-        after_idx = ep.get("encoreAfterTrackIndex")
-        encore_url = (ep.get("encore") or {}).get("url")
-        encore_id = yt_id_from_url(encore_url)
-        if encore_id:
-            insert_at = max(0, min(len(ids), after_idx + 1))
-            ids.insert(insert_at, encore_id)
-    return ids
-
 def is_playlist_episode(ep):
     tracks = ep.get("tracks", []) or []
     if not tracks:
@@ -153,38 +297,58 @@ def display_title(ep):
         return f"{a} — {t}"
     return t
 
+def expand(node):
+    # shard/SQLite stubs -> full node (fetched on first open); anything else as-is
+    if SHARDS is not None:
+        return SHARDS.expand(node)
+    return node
+
+def node_ref(ep, path):
+    # URL params for a node: its stable ID, or the path for catalogs
+    # published before nodes had one
+    node_id = ep.get("id") if isinstance(ep, dict) else None
+    return {"id": node_id} if node_id else {"path": path}
+
+def node_path(params):
+    # Current path for a URL's id= (which survives shows being added or
+    # moved), or its path= as-is (URLs from before IDs)
+    node_id = params.get("id")
+    if not node_id:
+        return params.get("path", "")
+    with TRACE.span("lookup", id=node_id):
+        path = SHARDS.path_of(node_id) if SHARDS is not None else (NODE_PATHS or {}).get(node_id)
+    if path is None:
+        raise KeyError(f"unknown node id {node_id}")
+    return path
+
 def get_node_by_path(root_list, path_str):
     # path like "0/2/1"
     if not path_str:
         return root_list
 
-    parts = [p for p in path_str.split("/") if p.strip() != ""]
-    node = root_list
-    for p in parts:
-        i = int(p)
-        if isinstance(node, list):
-            node = node[i]
-        else:
-            node = (node.get("items") or [])[i]
-    return node
-
-def list_node(node, path_str=""):
-    # node can be list or a folder object
-    if isinstance(node, dict) and str(node.get("mode", "")).lower() == "folder":
-        items = node.get("items", []) or []
-    elif isinstance(node, list):
-        items = node
-    else:
-        items = []
-
-    for idx, ep in enumerate(items):
+    with TRACE.span("resolve", path=path_str):
+        parts = [p for p in path_str.split("/") if p.strip() != ""]
+        node = root_list
+        for p in parts:
+            i = int(p)
+            if isinstance(node, list):
+                node = node[i]
+            else:
+                node = (expand(node).get("items") or [])[i]
+        return expand(node)
+
+def iter_node_rows(items, path_str="", start=0, stop=None):
+    # one folder's children as (label, url, is_folder, playable, thumb) rows;
+    # slicing first lets a lazy (SQLite) items list read just this page
+    for idx, ep in enumerate(items[start:stop], start):
         mode = str(ep.get("mode", "")).lower()
         label = display_title(ep)
+        child_path = f"{path_str}/{idx}" if path_str else str(idx)
+        thumb = thumb_url(ep)
 
         # folder
         if mode == "folder":
-            new_path = f"{path_str}/{idx}" if path_str else str(idx)
-            add_item(label, action="open_folder", params={"path": new_path}, is_folder=True, playable=False)
+            yield label, plugin_url("open_folder", node_ref(ep, child_path)), True, False, thumb
             continue
 
         # playlist detection by URL
@@ -192,52 +356,169 @@ def list_node(node, path_str=""):
             tracks = ep.get("tracks", []) or []
             pid = playlist_id_from_url((tracks[0] or {}).get("url", ""))
             if pid:
-                add_item(f"{label} (▶ Play)", action="play_playlist_direct", params={"pid": pid}, playable=True, is_folder=False)
-                add_external(f"{label} (📂 Browse videos)", youtube_browse_playlist(pid), is_folder=True, playable=False)
+                yield f"{label} (▶ Play)", plugin_url("play_playlist_direct", {"pid": pid}), False, True, thumb
+                yield f"{label} (📂 Browse videos)", youtube_browse_playlist(pid), True, False, thumb
             continue
 
         if has_encore(ep):
             label = label + "  🕯️"
 
-        if mode == "fullshow":
-            add_item(label, action="play_fullshow_direct",
-                     params={"path": f"{path_str}/{idx}" if path_str else str(idx)},
-                     playable=True, is_folder=False)
+        if mode == "queue":
+            yield label, plugin_url("browse_queue", node_ref(ep, child_path)), True, False, thumb
+        else:
+            # fullshow (and anything unrecognised) plays directly
+            yield label, plugin_url("play_fullshow_direct", play_params(ep, child_path)), False, True, thumb
 
-        elif mode == "queue":
-            add_item(label, action="browse_queue",
-                     params={"path": f"{path_str}/{idx}" if path_str else str(idx)},
-                     playable=False, is_folder=True)
+def play_params(ep, path):
+    # The first track's video (or playlist) ID rides along in the URL, so
+    # play_fullshow_direct doesn't need the catalog; the node is the fallback.
+    params = node_ref(ep, path)
+    tracks = ep.get("tracks", []) or []
+    url = (tracks[0] or {}).get("url", "") if tracks else ""
+    vid = yt_id_from_url(url)
+    if vid:
+        params["vid"] = vid
+    else:
+        pid = playlist_id_from_url(url)
+        if pid:
+            params["pid"] = pid
+    return params
 
-        else:
-            add_item(label, action="play_fullshow_direct",
-                     params={"path": f"{path_str}/{idx}" if path_str else str(idx)},
-                     playable=True, is_folder=False)
+def list_node(node, path_str="", page=0):
+    # node can be list or a folder object
+    node = expand(node)
+    if isinstance(node, dict) and str(node.get("mode", "")).lower() == "folder":
+        items = node.get("items", []) or []
+    elif isinstance(node, list):
+        items = node
+    else:
+        items = []
+
+    start, stop = page_bounds(page)
+    with TRACE.span("render"):
+        add_items(iter_node_rows(items, path_str, start, stop))
+        if stop is not None and stop < len(items):
+            add_item(f"Next page ({page + 2}) »", action="open_folder",
+                     params=dict(node_ref(node, path_str), page=page + 1), is_folder=True)
 
     end_dir()
 
-def browse_queue(root, path):
+def iter_queue_rows(ep, ids, start=0, stop=None):
+    tracks = ep.get("tracks", []) or []
+    for i, vid in itertools.islice(enumerate(ids), start, stop):
+        if i < len(tracks):
+            label = f"{i+1}. {(tracks[i] or {}).get('title', 'Track')}"
+        else:
+            encore_title = ((ep.get("encore") or {}).get("title")) or "Encore"
+            label = f"{i+1}. {encore_title} 🕯️"
+
+        yield label, plugin_url("play_video", {"video_id": vid}), False, True, youtube_thumb(vid)
+
+def browse_queue(root, params, page=0):
     try:
+        path = node_path(params)
         ep = get_node_by_path(root, path)
     except Exception:
         notify("Bad queue path.")
         end_dir()
         return
 
-    add_item("▶ Play All (Queue)", action="play_queue_all", params={"path": path}, playable=True, is_folder=False)
-
-    tracks = ep.get("tracks", []) or []
     ids = get_track_video_ids(ep)
+    if page == 0:
+        play = node_ref(ep, path)
+        if len(ids) <= MAX_URL_IDS:
+            play["ids"] = pack_video_ids(ids)
+        add_item("▶ Play All (Queue)", action="play_queue_all", params=play, playable=True, is_folder=False)
+
+    start, stop = page_bounds(page)
+    with TRACE.span("render"):
+        add_items(iter_queue_rows(ep, ids, start, stop))
+        if stop is not None and stop < len(ids):
+            add_item(f"Next page ({page + 2}) »", action="browse_queue",
+                     params=dict(node_ref(ep, path), page=page + 1), is_folder=True)
 
-    for i, vid in enumerate(ids):
-        if i < len(tracks):
-            label = f"{i+1}. {(tracks[i] or {}).get('title', 'Track')}"
-        else:
-            encore_title = ((ep.get("encore") or {}).get("title")) or "Encore"
-            label = f"{i+1}. {encore_title} 🕯️"
+    end_dir()
+
+def iter_search_docs(items, path_str="", parent=""):
+    # (text, label, target) for every show, queue, track and encore
+    for idx, ep in enumerate(items):
+        mode = str(ep.get("mode", "")).lower()
+        child_path = f"{path_str}/{idx}" if path_str else str(idx)
+
+        if mode == "folder":
+            yield from iter_search_docs(ep.get("items", []) or [], child_path, ep.get("title", ""))
+            continue
 
-        add_item(label, action="play_video", params={"video_id": vid}, playable=True, is_folder=False)
+        label = display_title(ep)
+        if parent and not ep.get("artist"):
+            label = f"{parent} — {label}"  # artist folders: shows without an artist field
+        text = f"{parent} {ep.get('artist', '')} {ep.get('title', '')}"
+        tracks = ep.get("tracks", []) or []
 
+        if is_playlist_episode(ep):
+            pid = playlist_id_from_url((tracks[0] or {}).get("url", ""))
+            if pid:
+                yield text, label, {"action": "play_playlist_direct", "pid": pid}
+            continue
+
+        if mode != "queue":
+            yield text, label, dict(play_params(ep, child_path), action="play_fullshow_direct")
+            continue
+
+        yield text, label, dict(node_ref(ep, child_path), action="browse_queue")
+        extras = list(tracks)
+        if has_encore(ep):
+            extras.append(dict(ep.get("encore") or {}, title=(ep.get("encore") or {}).get("title") or "Encore"))
+        for t in extras:
+            vid = yt_id_from_url((t or {}).get("url", ""))
+            if vid:
+                t_title = (t or {}).get("title", "Track")
+                yield f"{text} {t_title}", f"{label} — {t_title}", {"action": "play_video", "video_id": vid}
+
+def search(root, query):
+    if not query:
+        query = xbmcgui.Dialog().input("Search artists, sessions and songs")
+    if not query:
+        end_dir()
+        return
+
+    def documents():
+        tree = root
+        if SHARDS is not None:
+            # The service/SQLite/sharded root only has stubs; building the
+            # index needs the whole tree, so fetch it only then.
+            tree = get_episodes_json()
+            index_nodes(tree)  # IDs for the result URLs
+        return iter_search_docs(tree)
+
+    try:
+        # Keyed on the version of whichever catalog is in use, so a search
+        # against an unchanged catalog never touches episodes.json.
+        version = SHARDS.version if SHARDS is not None else get_cache().version("episodes")
+        with TRACE.span("index"):
+            index = load_or_build(os.path.join(PROFILE_DIR, "search-index.json"), version, documents)
+    except Exception as e:
+        log(f"Search index unavailable: {e}")
+        notify("Search is unavailable right now.")
+        end_dir()
+        return
+
+    with TRACE.span("query") as span:
+        results = index.search(query)
+        span.set(results=len(results))
+    if not results:
+        notify(f"No matches for “{query}”.")
+
+    def rows():
+        for label, target in results:
+            target = dict(target)
+            action = target.pop("action")
+            is_folder = action == "browse_queue"
+            thumb = youtube_thumb(target["video_id"]) if "video_id" in target else None
+            yield label, plugin_url(action, target), is_folder, not is_folder, thumb
+
+    with TRACE.span("render"):
+        add_items(rows())
     end_dir()
 
 def play_video(video_id):
@@ -246,8 +527,9 @@ def play_video(video_id):
         return
     xbmc.Player().play(youtube_play_video(video_id))
 
-def play_fullshow_direct(root, path):
+def play_fullshow_direct(root, params):
     try:
+        path = node_path(params)
         ep = get_node_by_path(root, path)
     except Exception:
         notify("Bad item path.")
@@ -258,17 +540,17 @@ def play_fullshow_direct(root, path):
         notify("No tracks.")
         return
 
-    url = (tracks[0] or {}).get("url", "")
-    vid = yt_id_from_url(url)
-    if not vid:
-        pid = playlist_id_from_url(url)
-        if pid:
-            xbmc.Player().play(youtube_play_playlist(pid))
-            return
+    target = play_params(ep, path)
+    if "vid" not in target and "pid" not in target:
         notify("Bad YouTube link.")
         return
+    play_ids(target.get("vid"), target.get("pid"))
 
-    xbmc.Player().play(youtube_play_video(vid))
+def play_ids(vid, pid):
+    if vid:
+        xbmc.Player().play(youtube_play_video(vid))
+    else:
+        xbmc.Player().play(youtube_play_playlist(pid))
 
 def play_playlist_direct(pid):
     if not pid:
@@ -276,24 +558,48 @@ def play_playlist_direct(pid):
         return
     xbmc.Player().play(youtube_play_playlist(pid))
 
-def play_queue_all(root, path):
+def play_queue_all(root, params):
     try:
-        ep = get_node_by_path(root, path)
+        ep = get_node_by_path(root, node_path(params))
     except Exception:
         notify("Bad queue path.")
         return
+    queue_and_play(iter_track_video_ids(ep), node=ep)
 
-    ids = get_track_video_ids(ep)
-    if not ids:
-        notify("No playable tracks in this queue.")
-        return
-
+def queue_and_play(order, **hand_off):
+    # order: iterator in play order; hand_off: what the service needs to
+    # produce the same sequence ("node" or "ids")
     pl = xbmc.PlayList(xbmc.PLAYLIST_VIDEO)
     pl.clear()
-    for vid in ids:
+    for vid in itertools.islice(order, QUEUE_AHEAD + 1):
         pl.add(youtube_play_video(vid))
+    if pl.size() == 0:
+        notify("No playable tracks in this queue.")
+        return
+    queued = pl.size()
     xbmc.Player().play(pl)
 
+    rest = next(order, None)
+    if rest is None or hand_off_queue(queued, **hand_off):
+        return
+    # No service to feed it: queue the remainder now, behind the first tracks.
+    for vid in itertools.chain([rest], order):
+        pl.add(youtube_play_video(vid))
+
+def get_service():
+    # The connection the catalog came over, or a new one
+    if not isinstance(SHARDS, ServiceCatalog):
+        return ServiceCatalog(os.path.join(PROFILE_DIR, PORT_FILE))
+    return SHARDS
+
+def hand_off_queue(queued, **payload):
+    try:
+        get_service().call("queue", queued=queued, **payload)
+    except ServiceUnavailable as e:
+        log(f"Queue hand-off failed ({e}); queueing everything")
+        return False
+    return True
+
 def render_fallback():
     notify("Using fallback list (JSON not reachable).")
     for title, url in FALLBACK_EPISODES:
@@ -310,6 +616,32 @@ def router():
         params = dict(urllib.parse.parse_qsl(sys.argv[2][1:]))
 
     action = params.get("action")
+    try:
+        page = max(0, int(params.get("page", 0)))
+    except ValueError:
+        page = 0
+    TRACE.set(action=action or "root", page=page)
+
+    # Play actions carry their IDs in the URL (put there when the list was
+    # drawn), so they start without loading the catalog. URLs from older
+    # listings only have a path and take the normal route below.
+    if action == "play_video":
+        play_video(params.get("video_id"))
+        return
+
+    if action == "play_playlist_direct":
+        play_playlist_direct(params.get("pid"))
+        return
+
+    if action == "play_fullshow_direct" and (params.get("vid") or params.get("pid")):
+        play_ids(params.get("vid"), params.get("pid"))
+        return
+
+    if action == "play_queue_all" and params.get("ids"):
+        ids = unpack_video_ids(params["ids"])
+        queue_and_play(iter(ids), ids=ids)
+        return
+
     root = load_episodes()
     if not root:
         render_fallback()
@@ -317,30 +649,54 @@ def router():
 
     if action == "open_folder":
         path = params.get("path", "")
-        node = get_node_by_path(root, path)
-        list_node(node, path)
+        try:
+            path = node_path(params)
+            node = get_node_by_path(root, path)
+        except Exception as e:
+            log(f"open_folder {params.get('id') or path} failed: {e}")
+            notify("Bad folder path.")
+            end_dir()
+            return
+        list_node(node, path, page)
         return
 
     if action == "browse_queue":
-        browse_queue(root, params.get("path", ""))
-        return
-
-    if action == "play_video":
-        play_video(params.get("video_id"))
+        browse_queue(root, params, page)
         return
 
     if action == "play_fullshow_direct":
-        play_fullshow_direct(root, params.get("path", ""))
+        play_fullshow_direct(root, params)
         return
 
-    if action == "play_playlist_direct":
-        play_playlist_direct(params.get("pid"))
+    if action == "play_queue_all":
+        play_queue_all(root, params)
         return
 
-    if action == "play_queue_all":
-        play_queue_all(root, params.get("path", ""))
+    if action == "search":
+        search(root, params.get("q", ""))
         return
 
+    add_item("🔍 Search", action="search", is_folder=True)
     list_node(root, "")
 
-router()
+def write_trace():
+    log(TRACE.summary())
+    if ADDON.getSetting("trace_jsonl") == "true":
+        try:
+            TRACE.append_jsonl(os.path.join(PROFILE_DIR, "trace.jsonl"))
+        except OSError as e:
+            log(f"Could not write trace.jsonl: {e}")
+
+if __name__ == "__main__":
+    try:
+        with TRACE.span("router"):
+            router()
+    finally:
+        if CACHE is not None:
+            log(CACHE.flush_stats())
+            log(default_client(UA).summary())
+        if ART is not None:
+            warm_art()
+            log(ART.summary())
+        if TRACE.enabled:
+            write_trace()
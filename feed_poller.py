@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+feed_poller.py — config-driven, multi-channel version of nhra_scraper.py
+
+Reads a list of rules from data/feed-rules.json. Each rule names one or
+more YouTube channel IDs, the top-level episodes.json section their
+matches go into, and the include/exclude keywords that decide what
+counts as a match. All channel feeds are fetched concurrently on a
+bounded thread pool (maxConcurrency), so a run takes about as long as
+the slowest feed rather than the sum of all of them. episodes.json is
+loaded once and, if anything was added, saved once at the end.
+
+Rule fields:
+  name          label for log lines
+  channels      list of channel IDs (Atom feeds)
+  section       exact title of the top-level section to add to
+  include       keywords; at least one must appear in the title
+  exclude       keywords; none may appear in the title
+  maxTracks     queue cap, newest first (default 30)
+  thumb         thumb to set if the section has none (optional)
+
+Per-channel high-water marks live in data/feed-poller-state.json, so a
+feed with no new uploads is only parsed up to its first entry. A
+channel's mark only moves once every rule it feeds has been applied: a
+rule whose section is missing leaves its channels' entries to be
+matched again next run.
+
+Usage:
+  python feed_poller.py [path/to/feed-rules.json]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jac.classifier import TitleClassifier
+from jac.transport import HttpClient
+from jac.videoindex import build_index
+from nhra_scraper import (
+    EPISODES_JSON_PATH,
+    MAX_TRACKS,
+    SEEN_KEEP,
+    add_candidates,
+    ensure_queue_mode,
+    episodes_store,
+    find_section,
+    iter_entries,
+    load_feed_state,
+    write_json_atomic,
+)
+
+RULES_PATH = "data/feed-rules.json"
+STATE_PATH = "data/feed-poller-state.json"
+FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+DEFAULT_CONCURRENCY = 8
+
+_local = threading.local()
+
+
+def load_rules(path):
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return config.get("rules", []), int(config.get("maxConcurrency", DEFAULT_CONCURRENCY))
+
+
+def _client():
+    # HttpClient pools connections per host and isn't thread-safe, so
+    # each worker thread keeps its own.
+    client = getattr(_local, "client", None)
+    if client is None:
+        client = _local.client = HttpClient(user_agent="Mozilla/5.0")
+    return client
+
+
+def fetch_channel(channel_id, seen=()):
+    """Returns (channel_id, new entries, seconds, error)."""
+    started = time.time()
+    try:
+        body = _client().get(FEED_URL.format(channel_id)).body
+        return channel_id, list(iter_entries(body, stop_at=seen)), time.time() - started, None
+    except Exception as e:
+        return channel_id, [], time.time() - started, e
+
+
+def fetch_all(channel_ids, max_workers, seen_by_channel=None):
+    """{channel_id: new entries} for every feed that could be fetched."""
+    results = {}
+    if not channel_ids:
+        return results
+    seen_by_channel = seen_by_channel or {}
+    seen_sets = [set(seen_by_channel.get(c, [])) for c in channel_ids]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(channel_ids)))) as pool:
+        for channel_id, entries, seconds, error in pool.map(fetch_channel, channel_ids, seen_sets):
+            if error is not None:
+                print(f"  ! {channel_id}: fetch failed after {seconds:.2f}s: {error}", file=sys.stderr)
+                continue
+            print(f"  {channel_id}: {len(entries)} new entries in {seconds:.2f}s")
+            results[channel_id] = entries
+    return results
+
+
+def rule_classifier(rule):
+    return TitleClassifier(include=rule.get("include", []), exclude=rule.get("exclude", []))
+
+
+def save_state(state, feeds, held=()):
+    """Moves each fetched channel's high-water mark forward, except the `held` ones."""
+    channel_states = state.setdefault("channels", {})
+    for channel_id, entries in feeds.items():
+        if entries and channel_id not in held:
+            channel_state = channel_states.setdefault(channel_id, {"seen": []})
+            fresh = set(e["video_id"] for e in entries)
+            channel_state["seen"] = ([e["video_id"] for e in entries] +
+                                     [v for v in channel_state["seen"] if v not in fresh])[:SEEN_KEEP]
+    write_json_atomic(STATE_PATH, state)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Poll the feeds in feed-rules.json.")
+    parser.add_argument("rules_path", nargs="?", default=RULES_PATH, metavar="feed-rules.json")
+    rules_path = parser.parse_args(argv).rules_path
+    rules, max_workers = load_rules(rules_path)
+
+    channel_ids = sorted({c for rule in rules for c in rule.get("channels", [])})
+    print(f"Polling {len(channel_ids)} feed(s) for {len(rules)} rule(s), up to {max_workers} at a time")
+    started = time.time()
+    state = load_feed_state(STATE_PATH)
+    state.pop("seen", None)
+    channel_states = state.setdefault("channels", {})
+    feeds = fetch_all(channel_ids, max_workers,
+                      {c: st.get("seen", []) for c, st in channel_states.items()})
+    print(f"Fetched {len(feeds)}/{len(channel_ids)} feed(s) in {time.time() - started:.2f}s")
+
+    matches = []
+    for rule in rules:
+        classifier = rule_classifier(rule)
+        candidates = [e for c in rule.get("channels", []) for e in feeds.get(c, [])
+                      if classifier.accepts(e["title"])]
+        if candidates:
+            matches.append((rule, candidates))
+
+    if not matches:
+        print("No matching videos in any feed. Nothing to do.")
+        save_state(state, feeds)
+        return
+
+    total_added = 0
+    held = set()
+    # One locked load/save for the whole run (see jac/store.py).
+    with episodes_store().edit() as data:
+        # Shared by all rules, so one video matched by two rules lands once.
+        index = build_index(trees={EPISODES_JSON_PATH: data})
+        for rule, candidates in matches:
+            name = rule.get("name") or rule.get("section")
+            section = find_section(data, rule.get("section"))
+            if section is None:
+                print(f"  ! [{name}] section {rule.get('section')!r} not found in episodes.json — skipped", file=sys.stderr)
+                held.update(rule.get("channels", []))
+                continue
+
+            ensure_queue_mode(section, thumb=rule.get("thumb"))
+            added = add_candidates(section, candidates, int(rule.get("maxTracks", MAX_TRACKS)), index=index)
+            total_added += len(added)
+            print(f"[{name}] {len(candidates)} match(es), {len(added)} new")
+            for t in added:
+                print(f"  - {t}")
+
+    if total_added:
+        print(f"Saved episodes.json with {total_added} new track(s).")
+    else:
+        print("All matches were already in the catalog.")
+    save_state(state, feeds, held)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+Shared Python helpers for Joey's Acoustic Corner.
+
+Used by the Kodi addon (default.py), the plugin.video.joeysacousticcorner
+addon and the scraper tooling. Nothing in here imports the xbmc modules,
+so everything can run (and be exercised) outside Kodi.
+"""
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Thumbnail cache for listings.
+
+ArtCache keeps downloaded images in one directory, named by a hash of
+their URL, and holds the directory under a byte budget by evicting the
+least recently used files (a cache hit bumps the file's mtime).
+
+Listings never wait on a download: a plugin run takes the cached file
+for each row (lookup()) and leaves the rest on their remote URL for
+Kodi to load itself. The URLs it didn't have are handed to the
+background service, which fetches them with prefetch() and then runs
+evict(), all on one thread so eviction never races a download; the
+next listing finds them on disk. Without the service, the plugin runs
+prefetch() itself after the listing has gone to Kodi.
+
+prefetch() downloads on a small thread pool within a time budget. Each
+download gets the budget as its socket timeout and no retries; at the
+deadline, downloads that haven't started are cancelled and the pool is
+joined, so no worker outlives the call. URLs that 404 leave an empty
+"<file>.miss" marker so they aren't retried on every listing.
+"""
+
+import hashlib
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from jac.transport import HttpClient, HttpError
+
+DEFAULT_BUDGET = 50 * 1024 * 1024
+DEFAULT_WORKERS = 4
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+# A 404 (e.g. a deleted video's thumbnail) isn't asked for again for a day
+MISS_TTL = 24 * 3600
+
+_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg")
+
+
+# The service's downloads aren't holding up a listing: normal timeouts
+WARM_TIMEOUT = 10
+
+
+def youtube_thumb(video_id):
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+
+class ArtCache(object):
+    def __init__(self, directory, budget=DEFAULT_BUDGET, workers=DEFAULT_WORKERS,
+                 user_agent="Kodi", log=None, timeout=10):
+        self.directory = directory
+        self.budget = budget
+        self.workers = workers
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.log = log or (lambda msg: None)
+        self.stats = {"hits": 0, "fetched": 0, "failed": 0, "skipped": 0, "evicted": 0}
+        self._local = threading.local()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, url):
+        ext = os.path.splitext(urllib.parse.urlsplit(url).path)[1].lower()
+        if ext not in _EXTENSIONS:
+            ext = ".img"
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest()[:20] + ext)
+
+    def lookup(self, url):
+        """Local path if `url` is cached (and marks it recently used), else None."""
+        path = self.path_for(url)
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+        self.stats["hits"] += 1
+        return path
+
+    def _missing(self, url):
+        try:
+            return time.time() - os.stat(self.path_for(url) + ".miss").st_mtime < MISS_TTL
+        except OSError:
+            return False
+
+    def _client(self, timeout=None, retries=1):
+        # HttpClient isn't thread-safe; one per worker thread.
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = HttpClient(user_agent=self.user_agent,
+                                                     timeout=timeout or self.timeout, retries=retries)
+        return client
+
+    def fetch(self, url, timeout=None, retries=1):
+        """Downloads `url` into the cache; returns the local path or None."""
+        path = self.path_for(url)
+        try:
+            body = self._client(timeout, retries).get(url).body
+            if not body or len(body) > MAX_IMAGE_BYTES:
+                raise ValueError(f"unexpected size {len(body or b'')}")
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except Exception as e:
+            self.log(f"Art: {url} failed: {e}")
+            self.stats["failed"] += 1
+            if isinstance(e, HttpError) and e.code == 404:
+                try:
+                    open(path + ".miss", "wb").close()
+                except OSError:
+                    pass
+            return None
+        self.stats["fetched"] += 1
+        return path
+
+    def prefetch(self, urls, timeout=1.0):
+        """
+        {url: local path} for every URL that is cached or arrives within
+        about `timeout` seconds. Returns with no download still running.
+        """
+        found = {}
+        missing = []
+        for url in dict.fromkeys(u for u in urls if u):
+            path = self.lookup(url)
+            if path:
+                found[url] = path
+            elif not self._missing(url):
+                missing.append(url)
+        if not missing:
+            return found
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(missing))))
+        futures = {pool.submit(self.fetch, url, timeout, 0): url for url in missing}
+        _, pending = wait(futures, timeout=timeout)
+        for future in pending:
+            if future.cancel():
+                self.stats["skipped"] += 1
+        # Running downloads are bounded by their socket timeout (the same
+        # budget), so this waits at most about that long again.
+        pool.shutdown(wait=True)
+        for future, url in futures.items():
+            if not future.cancelled():
+                path = future.result()
+                if path:
+                    found[url] = path
+        return found
+
+    def evict(self):
+        """Deletes least recently used files until the cache fits the budget."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats["evicted"] += 1
+        return total
+
+    def summary(self):
+        s = self.stats
+        return (f"Art: {s['hits']} cached, {s['fetched']} fetched, {s['failed']} failed, "
+                f"{s['skipped']} skipped, {s['evicted']} evicted")
+
+
+class ArtWarmer(object):
+    """
+    The service side: queue() takes URLs from plugin runs and returns at
+    once; one thread fetches them (prefetch) and then evicts, batch by
+    batch.
+    """
+
+    def __init__(self, art, timeout=WARM_TIMEOUT):
+        self.art = art
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def queue(self, urls):
+        urls = [u for u in urls or () if u]
+        if urls:
+            self._queue.put(urls)
+        return len(urls)
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            # Whatever else arrived meanwhile goes in the same batch.
+            stop = False
+            while not stop:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                else:
+                    batch.extend(more)
+            try:
+                self.art.prefetch(batch, timeout=self.timeout)
+                self.art.evict()
+            except Exception as e:
+                self.art.log(f"Art: warming failed: {e}")
+            if stop:
+                return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="jac-art")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(self.timeout)
+            self._thread = None
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent on-disk cache for JSON documents fetched over HTTP.
+
+Each entry lives in the cache directory as two files: the raw body
+(<key>.json) and a small metadata file (<key>.meta.json) holding the
+ETag / Last-Modified validators plus the time the copy was last known
+to be fresh.
+
+  - Inside the TTL the cached copy is served with no network access.
+  - After the TTL it is revalidated with a conditional GET
+    (If-None-Match / If-Modified-Since); a 304 just refreshes the clock.
+  - If the network is down, the last good copy is served regardless of
+    age, so a flaky connection never drops us to an empty listing.
+
+Hit / miss / revalidate / stale counts are kept per instance and also
+accumulated in cache-stats.json so they survive between plugin runs.
+"""
+
+import json
+import os
+import time
+
+from jac.trace import NULL_TRACER
+from jac.transport import HttpError, default_client
+
+STATS_FILE = "cache-stats.json"
+STAT_KEYS = ("hits", "misses", "revalidated", "stale")
+
+
+class NotFound(Exception):
+    """The server answered 404 (remembered for the TTL, like a hit)."""
+
+
+def _write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class JsonCache(object):
+    def __init__(self, directory, ttl=900, user_agent="Kodi", log=None, client=None, tracer=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.client = client or default_client(user_agent)
+        self.log = log or (lambda msg: None)
+        self.tracer = tracer or NULL_TRACER
+        self.stats = dict.fromkeys(STAT_KEYS, 0)
+        os.makedirs(directory, exist_ok=True)
+
+    # ---- files -------------------------------------------------------
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, key + ".meta.json")
+
+    def _read_meta(self, key):
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key, meta):
+        _write_atomic(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+
+    def _read_body(self, key):
+        try:
+            with self.tracer.span("read", key=key) as span:
+                with open(self._body_path(key), "rb") as f:
+                    raw = f.read()
+                span.add("bytes", len(raw))
+            with self.tracer.span("decode", bytes=len(raw)):
+                return json.loads(raw.decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    # ---- network -----------------------------------------------------
+
+    def _fetch(self, url, headers):
+        """
+        Returns (status, body_bytes, response_headers). A 304 comes back
+        as a normal status; other 4xx/5xx raise HttpError.
+        """
+        with self.tracer.span("fetch", url=url) as span:
+            resp = self.client.request("GET", url, headers)
+            span.set(status=resp.status, bytes=len(resp.body), wire_bytes=resp.wire_bytes)
+        if resp.status >= 400:
+            raise HttpError(url, resp.status, resp)
+        return resp.status, resp.body, resp.headers
+
+    # ---- public ------------------------------------------------------
+
+    def get(self, key, url, ttl=None):
+        """
+        Returns the parsed JSON for `url`, cached under `key`. Raises
+        only when there is neither a network copy nor a cached one.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        meta = self._read_meta(key)
+
+        cached = None
+        if meta is not None and not meta.get("missing"):
+            cached = self._read_body(key)
+            if cached is None:
+                meta = None  # body missing or corrupt -> treat as cold
+
+        if meta is not None and meta.get("missing"):
+            if now - meta.get("checked", 0) < ttl:
+                self.stats["hits"] += 1
+                raise NotFound(url)
+            meta = None
+
+        if meta is not None and now - meta.get("checked", 0) < ttl:
+            self.stats["hits"] += 1
+            return cached
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            status, body, resp_headers = self._fetch(url, headers)
+            if status == 304 and meta is not None:
+                meta["checked"] = now
+                self._write_meta(key, meta)
+                self.stats["revalidated"] += 1
+                return cached
+            with self.tracer.span("decode", bytes=len(body)):
+                data = json.loads(body.decode("utf-8"))
+        except Exception as e:
+            if meta is None:
+                if isinstance(e, HttpError) and e.code == 404:
+                    self._write_meta(key, {"url": url, "missing": True, "checked": now})
+                    self.stats["misses"] += 1
+                    raise NotFound(url)
+                raise
+            self.log(f"Cache: fetch of {key} failed ({e}); serving last good copy")
+            self.stats["stale"] += 1
+            return cached
+
+        _write_atomic(self._body_path(key), body)
+        self._write_meta(key, {
+            "url": url,
+            "etag": resp_headers.get("ETag"),
+            "last_modified": resp_headers.get("Last-Modified"),
+            "checked": now,
+            "bytes": len(body),
+        })
+        self.stats["misses"] += 1
+        return data
+
+    def put(self, key, data, **fields):
+        """
+        Stores `data` under `key` as a fresh copy that was built locally
+        (jac.delta), with `fields` added to its metadata. Having no
+        validators, it is fetched unconditionally once the TTL is up.
+        """
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        _write_atomic(self._body_path(key), body)
+        self._write_meta(key, dict(fields, checked=time.time(), bytes=len(body)))
+
+    def meta(self, key):
+        return self._read_meta(key) or {}
+
+    def set_meta(self, key, **fields):
+        """Adds `fields` to an existing entry's metadata."""
+        meta = self._read_meta(key)
+        if meta is not None:
+            meta.update(fields)
+            self._write_meta(key, meta)
+
+    def version(self, key):
+        """
+        Identity of the cached copy built from its validators; changes
+        whenever a new body is stored. None if nothing is cached.
+        """
+        meta = self._read_meta(key)
+        if not meta or meta.get("missing"):
+            return None
+        return "|".join(str(meta.get(k) or "") for k in ("etag", "last_modified", "bytes", "catalog_version"))
+
+    def get_cached(self, key):
+        """Last good copy for `key` (any age), or None."""
+        if self._read_meta(key) is None:
+            return None
+        return self._read_body(key)
+
+    def flush_stats(self):
+        """
+        Folds this run's counts into cache-stats.json and returns a
+        one-line summary ("run ... | total ...") for the log.
+        """
+        path = os.path.join(self.directory, STATS_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                totals = json.load(f)
+        except (OSError, ValueError):
+            totals = {}
+        for k in STAT_KEYS:
+            totals[k] = int(totals.get(k, 0)) + self.stats[k]
+        try:
+            _write_atomic(path, json.dumps(totals).encode("utf-8"))
+        except OSError:
+            pass
+
+        def fmt(d):
+            return " ".join(f"{k}={d.get(k, 0)}" for k in STAT_KEYS)
+        return f"Cache run: {fmt(self.stats)} | total: {fmt(totals)}"
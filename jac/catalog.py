@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory catalog model: built once per load, then every lookup is a
+dict hit and every listing is a slice of a pre-sorted view.
+
+  - episodes are collected from the whole tree (nested folders included)
+  - each one gets a key derived from its content, so two episodes that
+    share a title still resolve to the right one
+  - views["all" | "fullshow" | "queue" | "playlist"] are lists of keys,
+    sorted once by (artist, year, title)
+
+iter_node_ids() extends the keys to the whole tree for default.py's
+navigation: shows and queues keep their episode key, folders get a hash
+of their title under their parent folder's ID. Unlike a "0/2/1" path,
+an ID survives shows being added or reordered around it; index_nodes()
+and the published catalogs (jac.shards, jac.sqlcatalog) map IDs back to
+the node's current path.
+"""
+
+import hashlib
+
+VIEW_MODES = ("fullshow", "queue", "playlist")
+
+
+def _mode(ep):
+    return str(ep.get("mode", "")).lower()
+
+
+def _first_url(ep):
+    tracks = ep.get("tracks") or []
+    return (tracks[0] or {}).get("url", "") if tracks else ""
+
+
+def episode_key(ep):
+    """Short content hash: mode, artist, title and first track URL."""
+    raw = "\x1f".join((_mode(ep), str(ep.get("artist", "")), str(ep.get("title", "")), _first_url(ep)))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def folder_key(title, parent_id=""):
+    """Short hash of a folder's title under its parent folder's ID."""
+    raw = "\x1f".join(("folder", parent_id or "", str(title or "")))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def sort_key(ep):
+    return (str(ep.get("artist", "")).lower(),
+            str(ep.get("year", "")),
+            str(ep.get("title", "")).lower())
+
+
+def iter_episodes(tree):
+    """Every non-folder node in the tree, depth first, in file order."""
+    stack = [iter(tree if isinstance(tree, list) else [])]
+    while stack:
+        for node in stack[-1]:
+            if not isinstance(node, dict):
+                continue
+            if _mode(node) == "folder":
+                stack.append(iter(node.get("items") or []))
+                break
+            yield node
+        else:
+            stack.pop()
+
+
+def iter_node_ids(tree):
+    """
+    (path, node ID, node) for every node, preorder. Repeats get "-2",
+    "-3"... in file order, the same way Catalog numbers its keys, so a
+    show's ID is its Catalog key.
+    """
+    seen = set()
+
+    def walk(items, path_str, parent_id):
+        for i, node in enumerate(items):
+            if not isinstance(node, dict):
+                continue
+            path = f"{path_str}/{i}" if path_str else str(i)
+            is_folder = _mode(node) == "folder"
+            node_id = base = folder_key(node.get("title"), parent_id) if is_folder else episode_key(node)
+            n = 1
+            while node_id in seen:
+                n += 1
+                node_id = f"{base}-{n}"
+            seen.add(node_id)
+            yield path, node_id, node
+            if is_folder:
+                yield from walk(node.get("items") or [], path, node_id)
+
+    return walk(tree if isinstance(tree, list) else [], "", "")
+
+
+def index_nodes(tree):
+    """Stamps every node with its "id" and returns {node ID: path}."""
+    paths = {}
+    for path, node_id, node in iter_node_ids(tree):
+        node["id"] = node_id
+        paths[node_id] = path
+    return paths
+
+
+class Catalog(object):
+    def __init__(self, tree):
+        self.episodes = {}
+        for ep in iter_episodes(tree):
+            key = base = episode_key(ep)
+            n = 1
+            while key in self.episodes:  # identical entries in two folders
+                n += 1
+                key = f"{base}-{n}"
+            self.episodes[key] = ep
+
+        ordered = sorted(self.episodes, key=lambda k: sort_key(self.episodes[k]))
+        self.views = {"all": ordered}
+        for mode in VIEW_MODES:
+            self.views[mode] = [k for k in ordered if _mode(self.episodes[k]) == mode]
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def get(self, key):
+        return self.episodes.get(key)
+
+    def view(self, mode):
+        return self.views.get(mode, [])
+
+    def page(self, mode, page, page_size):
+        """(keys on this page, has_more) for a view."""
+        keys = self.view(mode)
+        start = max(0, page) * page_size
+        return keys[start:start + page_size], start + page_size < len(keys)
+
+    def find_by_title(self, title):
+        """Legacy lookup for old ?action=tracks&title=... URLs."""
+        for key, ep in self.episodes.items():
+            if ep.get("title") == title:
+                return key
+        return None
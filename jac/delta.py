@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Versioned delta sync for episodes.json.
+
+Publishing side (publish) keeps two things next to the shards:
+
+  catalog/version.json        {"format", "version", "hash", "bytes", "deltas"}
+  catalog/deltas/<N>.json     what changed from version N-1 to N
+
+"version" goes up by one every time episodes.json's content changes;
+"hash" is a hash of its canonical JSON; "deltas" lists the last
+MAX_DELTAS change sets ({"from", "to", "file", "bytes"}). A change set
+is a jac.jsondiff op list ("set"/"del"/"splice" on the nodes that
+were added, removed or modified) plus the hashes it goes from and to.
+When the previous content can't be matched to the published hash (the
+file was edited without running the publisher) the chain starts over
+and older clients simply do a full fetch.
+
+Client side (DeltaSync) keeps its copy of episodes.json in a JsonCache
+entry with the catalog version it was built from. Refreshing reads
+version.json (through the cache, so inside the TTL that is free); if
+the local copy is behind, it downloads just the deltas in between,
+applies them and checks the result against "hash". It falls back to
+fetching the whole file when there is no local copy, the chain has a
+gap, it's longer than `max_chain`, its deltas add up to more than the
+full file, or the result doesn't match.
+"""
+
+import hashlib
+import json
+import os
+
+from jac import jsondiff
+
+FORMAT = 1
+VERSION_NAME = "version.json"
+DELTA_DIR = "deltas"
+# Change sets kept on the site; a client further behind does a full fetch
+MAX_DELTAS = 30
+# Client side: more deltas than this in a row -> full fetch instead
+MAX_CHAIN = 10
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def tree_hash(tree):
+    return hashlib.sha1(_dumps(tree).encode("utf-8")).hexdigest()
+
+
+def _write_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def load_version(out_dir):
+    try:
+        with open(os.path.join(out_dir, VERSION_NAME), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("format") == FORMAT:
+            return info
+    except (OSError, ValueError):
+        pass
+    return {"format": FORMAT, "version": 0, "hash": None, "bytes": 0, "deltas": []}
+
+
+def publish(tree, out_dir, old_tree=None, full_bytes=0):
+    """
+    Records `tree` as the next version under out_dir if its content
+    changed, with a delta from `old_tree` when that is the version
+    currently published. Returns (version info, delta entry or None);
+    the info is unchanged (and nothing is written) if `tree` is too.
+    """
+    info = load_version(out_dir)
+    new_hash = tree_hash(tree)
+    if new_hash == info.get("hash"):
+        return info, None
+
+    version = int(info.get("version", 0)) + 1
+    deltas = list(info.get("deltas", []))
+    entry = None
+    if old_tree is not None and info.get("hash") and tree_hash(old_tree) == info["hash"]:
+        os.makedirs(os.path.join(out_dir, DELTA_DIR), exist_ok=True)
+        name = f"{DELTA_DIR}/{version}.json"
+        _write_json(os.path.join(out_dir, name), {
+            "format": FORMAT,
+            "from": info["version"],
+            "to": version,
+            "base": info["hash"],
+            "hash": new_hash,
+            "ops": jsondiff.diff(old_tree, tree),
+        })
+        entry = {"from": info["version"], "to": version, "file": name,
+                 "bytes": os.path.getsize(os.path.join(out_dir, name))}
+        deltas.append(entry)
+    else:
+        deltas = []  # can't connect to the published chain: start a new one
+    deltas = deltas[-MAX_DELTAS:]
+
+    info = {"format": FORMAT, "version": version, "hash": new_hash, "bytes": full_bytes, "deltas": deltas}
+    _write_json(os.path.join(out_dir, VERSION_NAME), info)
+
+    keep = {os.path.basename(d["file"]) for d in deltas}
+    delta_dir = os.path.join(out_dir, DELTA_DIR)
+    if os.path.isdir(delta_dir):
+        for name in os.listdir(delta_dir):
+            if name.endswith(".json") and name not in keep:
+                os.remove(os.path.join(delta_dir, name))
+    return info, entry
+
+
+def plan_chain(info, have, max_chain=MAX_CHAIN):
+    """
+    Delta entries that take version `have` to info["version"], or None
+    if that can't (or shouldn't) be done with deltas.
+    """
+    by_from = {d.get("from"): d for d in info.get("deltas", [])}
+    chain = []
+    current = have
+    while current != info.get("version"):
+        d = by_from.get(current)
+        if d is None or len(chain) >= max_chain:
+            return None
+        chain.append(d)
+        current = d.get("to")
+    if info.get("bytes") and sum(d.get("bytes", 0) for d in chain) >= info["bytes"]:
+        return None
+    return chain
+
+
+class DeltaSync(object):
+    def __init__(self, cache, version_url, full_url, key="episodes", max_chain=MAX_CHAIN, log=None):
+        self.cache = cache
+        self.version_url = version_url
+        self.full_url = full_url
+        self.base_url = version_url.rsplit("/", 1)[0]
+        self.key = key
+        self.max_chain = max_chain
+        self.log = log or (lambda msg: None)
+        self.stats = {"deltas": 0, "delta_bytes": 0, "full": 0}
+
+    def get(self, ttl=None):
+        """
+        The current catalog tree. Raises if version.json can't be had
+        (the caller then falls back to a plain fetch of the full file).
+        """
+        info = self.cache.get(self.key + "-version", self.version_url, ttl=ttl)
+        if not isinstance(info, dict) or info.get("format") != FORMAT:
+            raise ValueError("unsupported version.json")
+
+        have = self.cache.meta(self.key).get("catalog_version")
+        local = self.cache.get_cached(self.key) if have is not None else None
+        if local is not None and have == info["version"]:
+            return local
+
+        chain = plan_chain(info, have, self.max_chain) if local is not None else None
+        if chain:
+            try:
+                return self._apply(local, have, chain, info)
+            except Exception as e:
+                self.log(f"Delta sync: v{have} -> v{info['version']} failed ({e}); fetching in full")
+        return self._full(info)
+
+    def _apply(self, tree, have, chain, info):
+        for entry in chain:
+            body = self.cache.client.get(f"{self.base_url}/{entry['file']}").body
+            self.stats["deltas"] += 1
+            self.stats["delta_bytes"] += len(body)
+            delta = json.loads(body.decode("utf-8"))
+            if delta.get("from") != have:
+                raise ValueError(f"delta {entry['file']} doesn't start at v{have}")
+            tree = jsondiff.apply(tree, delta.get("ops", []))
+            have = delta.get("to")
+        if tree_hash(tree) != info["hash"]:
+            raise ValueError("hash mismatch after applying deltas")
+        self.cache.put(self.key, tree, url=self.full_url, catalog_version=info["version"])
+        self.log(f"Delta sync: now at v{info['version']} ({len(chain)} delta(s), {self.stats['delta_bytes']} B)")
+        return tree
+
+    def _full(self, info):
+        # ttl=0: revalidate now (a 304 is fine if the copy is already current)
+        tree = self.cache.get(self.key, self.full_url, ttl=0)
+        self.stats["full"] += 1
+        if tree_hash(tree) == info["hash"]:
+            self.cache.set_meta(self.key, catalog_version=info["version"])
+        self.log(f"Delta sync: fetched {self.key} in full (v{info['version']})")
+        return tree
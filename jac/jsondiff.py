@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Minimal structural diff/patch for JSON documents.
+
+diff(old, new) returns a list of ops that turns `old` into `new` when
+applied in order by apply(). Paths are lists of dict keys / list
+indexes from the root.
+
+  {"op": "set",    "path": [...], "value": v}       set/replace one value
+  {"op": "del",    "path": [...]}                   remove a dict key
+  {"op": "splice", "path": [...], "index": i,       list edit in place
+   "remove": n, "insert": [...]}
+
+Lists are matched element-wise with difflib, so inserting one track at
+the top of a 30-item queue is a single splice, not 30 "set"s. Edited
+runs of equal length are diffed recursively, so one renamed episode is
+one small "set" deep in the tree.
+"""
+
+import difflib
+import json
+
+
+def _fingerprint(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def diff(old, new, path=None):
+    path = list(path or [])
+    if type(old) is not type(new):
+        return [{"op": "set", "path": path, "value": new}]
+
+    if isinstance(old, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "del", "path": path + [key]})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "set", "path": path + [key], "value": value})
+            else:
+                ops.extend(diff(old[key], value, path + [key]))
+        return ops
+
+    if isinstance(old, list):
+        if old == new:
+            return []
+        a = [_fingerprint(x) for x in old]
+        b = [_fingerprint(x) for x in new]
+        ops = []
+        # Back to front, so earlier indexes are still valid when applied in order.
+        for tag, i1, i2, j1, j2 in reversed(difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()):
+            if tag == "equal":
+                continue
+            if tag == "replace" and i2 - i1 == j2 - j1:
+                for k in range(i2 - i1 - 1, -1, -1):
+                    ops.extend(diff(old[i1 + k], new[j1 + k], path + [i1 + k]))
+                continue
+            ops.append({"op": "splice", "path": path, "index": i1,
+                        "remove": i2 - i1, "insert": new[j1:j2]})
+        return ops
+
+    if old != new:
+        return [{"op": "set", "path": path, "value": new}]
+    return []
+
+
+def _resolve(doc, path):
+    for key in path:
+        doc = doc[key]
+    return doc
+
+
+def apply(doc, ops):
+    """Applies ops to doc in place; returns the (possibly replaced) root."""
+    for op in ops:
+        path = op["path"]
+        kind = op["op"]
+        if kind == "splice":
+            target = _resolve(doc, path)
+            i = op["index"]
+            target[i:i + op["remove"]] = op["insert"]
+        elif kind == "set":
+            if not path:
+                doc = op["value"]
+            else:
+                _resolve(doc, path[:-1])[path[-1]] = op["value"]
+        elif kind == "del":
+            del _resolve(doc, path[:-1])[path[-1]]
+        else:
+            raise ValueError(f"unknown op {kind!r}")
+    return doc
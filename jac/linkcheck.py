@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Link health for the catalog files.
+
+collect_links() pulls every YouTube video and playlist ID out of the
+catalog trees, with the same parsing the addons use at play time
+(jac.youtube.yt_id_from_url / playlist_id_from_url), and remembers
+where each one occurs. check_links() then asks an oEmbed endpoint about
+each of them on a bounded thread pool:
+
+  200          ok
+  401, 403     restricted  (private, or embedding/region blocked)
+  404          dead        (removed, or the ID never existed)
+  400, 422     invalid     (malformed ID)
+  other        error       (timeouts, 429/5xx after retries, ...)
+
+The endpoint is a template with "{url}" in it, so a local stand-in can
+take YouTube's place. Requests to one host are spaced out by a
+RateLimiter (at most `rate` per second per host), on top of the
+`concurrency` cap; each worker thread keeps its own pooled HttpClient,
+which already retries 429/5xx with backoff and honours Retry-After.
+
+HealthCache keeps the last answer per link with the time it was
+checked, so a rerun only asks about links that are new or older than
+the TTL. "error" answers are never cached: they say nothing about the
+link.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from jac.transport import HttpClient
+from jac.videoindex import iter_tree_urls
+from jac.youtube import playlist_id_from_url, yt_id_from_url
+
+OEMBED_URL = "https://www.youtube.com/oembed?format=json&url={url}"
+DEFAULT_CONCURRENCY = 4
+# Gentle on the real endpoint; a local stand-in can take --rate 0.
+DEFAULT_RATE = 5.0
+DEFAULT_TTL = 7 * 24 * 3600
+
+STATUSES = ("ok", "restricted", "dead", "invalid", "error")
+_CODE_STATUS = {200: "ok", 401: "restricted", 403: "restricted", 404: "dead", 400: "invalid", 422: "invalid"}
+
+_local = threading.local()
+
+
+def link_keys(url):
+    """
+    ["video:<id>", "playlist:<id>"] for a track URL, each only if the
+    URL has that ID. Which one the addons play depends on the node:
+    queues and full shows take v= first (default.py play_fullshow_direct),
+    playlist nodes take list=, so a URL carrying both has both checked.
+    """
+    keys = []
+    vid = yt_id_from_url(url or "")
+    if vid:
+        keys.append("video:" + vid)
+    pid = playlist_id_from_url(url or "")
+    if pid:
+        keys.append("playlist:" + pid)
+    return keys
+
+
+def watch_url(key):
+    kind, _, ident = key.partition(":")
+    if kind == "playlist":
+        return "https://www.youtube.com/playlist?list=" + ident
+    return "https://www.youtube.com/watch?v=" + ident
+
+
+def collect_links(trees):
+    """{link key: [locations]} over {source file: tree}; locations as in jac.videoindex."""
+    links = {}
+    for source, tree in trees.items():
+        for path, track, title, url in iter_tree_urls(tree):
+            for key in link_keys(url):
+                links.setdefault(key, []).append({"source": source, "path": path, "track": track, "title": title})
+    return links
+
+
+class RateLimiter(object):
+    """At most `rate` calls per second per host (rate <= 0: no limit)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HealthCache(object):
+    """{link key: {"status", "code", "title", "checked"}} in a JSON file."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.entries = data.get("links", {}) if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                pass
+
+    def fresh(self, key, now=None):
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        now = time.time() if now is None else now
+        return entry if now - entry.get("checked", 0) < self.ttl else None
+
+    def put(self, key, result):
+        if result["status"] != "error":
+            self.entries[key] = result
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"links": self.entries}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+
+def _client(timeout):
+    # HttpClient pools connections per host and isn't thread-safe, so
+    # each worker thread keeps its own.
+    client = getattr(_local, "client", None)
+    if client is None:
+        client = _local.client = HttpClient(user_agent="Mozilla/5.0", timeout=timeout)
+    return client
+
+
+def check_link(key, endpoint=OEMBED_URL, limiter=None, timeout=10):
+    """{"status", "code", "title", "checked"} for one link key."""
+    url = endpoint.replace("{url}", urllib.parse.quote(watch_url(key), safe=""))
+    if limiter is not None:
+        limiter.wait(urllib.parse.urlsplit(url).netloc)
+    result = {"status": "error", "code": None, "title": None, "checked": round(time.time())}
+    try:
+        resp = _client(timeout).request("GET", url)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result["code"] = resp.status
+    result["status"] = _CODE_STATUS.get(resp.status, "error")
+    if resp.status == 200:
+        try:
+            result["title"] = resp.json().get("title")
+        except (ValueError, AttributeError):
+            pass
+    return result
+
+
+def check_links(keys, endpoint=OEMBED_URL, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                cache=None, timeout=10):
+    """
+    ({link key: result}, stats) for every key: fresh cache entries as
+    they are, the rest checked `concurrency` at a time.
+    """
+    now = time.time()
+    results = {}
+    stale = []
+    for key in keys:
+        entry = cache.fresh(key, now) if cache is not None else None
+        if entry is not None:
+            results[key] = entry
+        else:
+            stale.append(key)
+
+    started = time.time()
+    limiter = RateLimiter(rate)
+    if stale:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(stale)))) as pool:
+            checked = pool.map(lambda k: check_link(k, endpoint, limiter, timeout), stale)
+            for key, result in zip(stale, checked):
+                results[key] = result
+                if cache is not None:
+                    cache.put(key, result)
+    stats = {"links": len(results), "cached": len(results) - len(stale), "checked": len(stale),
+             "seconds": round(time.time() - started, 3)}
+    return results, stats
+
+
+def build_report(links, results, stats, endpoint):
+    """Health report: counts per status, and every link that isn't "ok" with where it is used."""
+    counts = dict.fromkeys(STATUSES, 0)
+    problems = []
+    for key in sorted(results):
+        result = results[key]
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if result["status"] != "ok":
+            kind, _, ident = key.partition(":")
+            problems.append(dict(result, kind=kind, id=ident, url=watch_url(key), locations=links.get(key, [])))
+    return {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "endpoint": endpoint,
+        "stats": stats,
+        "counts": counts,
+        "problems": problems,
+    }
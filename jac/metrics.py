@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Per-run metrics for the scheduled scripts (nhra_scraper.py).
+
+    metrics = RunMetrics("nhra_scraper")
+    with metrics.phase("fetch"):
+        body = client.get(url).body
+    metrics.set(feed_bytes=len(body))
+    metrics.add("tracks_added", 2)
+    metrics.finish("added")
+
+A run is a handful of phase timings (seconds; a phase entered twice
+adds up), flat numeric counters, and an outcome: one word for how the
+run ended ("added", "no_new_uploads", "fetch_failed", ...) plus ok=False
+when it ended in a way someone should look at.
+
+Two outputs:
+
+  write_prometheus(path)  the last run in Prometheus text format, for
+                          node_exporter's textfile collector: phase
+                          times, counters, run duration, the run's
+                          timestamp, ok and outcome. Written atomically,
+                          so the collector never reads half a file.
+  append_jsonl(path)      one JSON line per run, kept as history for
+                          trends (rotated to "<file>.1" past
+                          MAX_HISTORY_BYTES).
+
+Alerting on a run that "silently did nothing" is then a rule on the
+last-run timestamp going stale, ok dropping to 0, or entries_parsed
+staying at 0.
+"""
+
+import contextlib
+import json
+import os
+import re
+import time
+
+from jac.store import write_bytes_atomic
+
+PREFIX = "jac"
+MAX_HISTORY_BYTES = 4 * 1024 * 1024
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _metric_name(name):
+    return _NAME_RE.sub("_", str(name)).lower()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+class RunMetrics(object):
+    def __init__(self, job, clock=time.perf_counter):
+        self.job = job
+        self.clock = clock
+        self.ts = time.time()
+        self._start = clock()
+        self.phases = {}
+        self.counters = {}
+        self.outcome = None
+        self.ok = True
+        self.seconds = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = self.clock()
+        try:
+            yield self
+        finally:
+            self.record(name, self.clock() - started)
+
+    def record(self, name, seconds):
+        """Adds `seconds` to a phase timed by hand (when a `with` block doesn't fit)."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, **values):
+        self.counters.update(values)
+
+    def finish(self, outcome, ok=True):
+        """Ends the run; the first outcome given sticks."""
+        if self.outcome is None:
+            self.outcome = outcome
+            self.ok = ok
+            self.seconds = self.clock() - self._start
+
+    def to_dict(self):
+        return {
+            "ts": round(self.ts, 3),
+            "job": self.job,
+            "outcome": self.outcome,
+            "ok": self.ok,
+            "seconds": round(self.seconds if self.seconds is not None else self.clock() - self._start, 4),
+            "phases": {k: round(v, 4) for k, v in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def to_prometheus(self, prefix=PREFIX):
+        run = self.to_dict()
+        job = f'job="{_label(self.job)}"'
+        lines = []
+
+        def family(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{{{labels}}} {_number(value)}")
+
+        family("last_run_timestamp_seconds", "Unix time the last run started.", [(job, run["ts"])])
+        family("run_seconds", "Wall time of the last run.", [(job, run["seconds"])])
+        family("run_ok", "1 if the last run ended normally, 0 if it needs a look.", [(job, int(run["ok"]))])
+        family("run_outcome", "How the last run ended (the outcome label is set to 1).",
+               [(f'{job},outcome="{_label(run["outcome"])}"', 1)])
+        family("run_phase_seconds", "Wall time per phase of the last run.",
+               [(f'{job},phase="{_label(name)}"', seconds) for name, seconds in run["phases"].items()])
+        for name, value in sorted(run["counters"].items()):
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, (int, float)):
+                family("run_" + _metric_name(name), f"{name} in the last run.", [(job, value)])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix=PREFIX):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_bytes_atomic(path, self.to_prometheus(prefix).encode("utf-8"))
+
+    def append_jsonl(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            if os.path.getsize(path) > MAX_HISTORY_BYTES:
+                os.replace(path, path + ".1")
+        except OSError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False) + "\n")
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Batch scoring of discovery candidates (data/discovery-candidates.json).
+
+CandidateColumns loads the candidate list into parallel NumPy arrays
+(one per field) and parses the YouTube display strings in bulk:
+
+  viewCountText  "1,646,307 views", "12K views"  -> views (float, NaN if unknown)
+  publishedText  "3 years ago", "2mo ago",       -> age in days (float, NaN if unknown)
+                 "Streamed 1 year ago"
+
+score() then turns the columns into features in [0, 1] and combines
+them with one weighted sum over all candidates at once:
+
+  duration   ramps up from minDurationMinutes to a full-show length,
+             tapering off past MAX_SHOW_MINUTES (compilations, 24/7 streams)
+  views      log scale, 10 views -> 0 ... 10M views -> 1
+  recency    halves every RECENCY_HALF_LIFE_DAYS
+  trusted    channel is in data/trusted-channels.json
+  keywords   include-keyword hits in the title, capped at 3
+
+Titles are classified with jac.classifier.TitleClassifier (one compiled
+regex scan each); excluded/blocked ones are dropped along with anything
+whose video ID is already in the approved or rejected history, and
+repeats of the same video within the list. rank() returns the best
+`top` as (score, candidate, features) rows.
+
+NumPy is only needed by this tooling, never by the Kodi addons; importing
+the module works without it and using it raises a RuntimeError naming
+the missing package.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # optional: only scripts/rank_candidates.py needs it
+    np = None
+
+from jac.classifier import TitleClassifier
+
+# Same list discover-shows.js uses for its "performance signal" check.
+PERFORMANCE_KEYWORDS = [
+    "full concert", "full show", "full set", "live at", "live in", "live from",
+    "unplugged", "acoustic", "tiny desk", "pro-shot", "pro shot", "official live",
+    "festival", "full performance", "full session", "concert film", "live concert",
+]
+
+# Titles that aren't a show: reactions, talk, trailers, lessons, excerpts
+# (on top of the watchlist's blockedTerms)
+NON_PERFORMANCE_KEYWORDS = [
+    "reaction", "reacts to", "interview", "trailer", "teaser", "behind the scenes",
+    "lyric video", "tutorial", "lesson", "how to play", "karaoke", "review",
+    "podcast", "#shorts", "highlights",
+]
+
+DEFAULT_WEIGHTS = {
+    "duration": 0.30,
+    "views": 0.25,
+    "recency": 0.10,
+    "trusted": 0.15,
+    "keywords": 0.20,
+}
+
+MIN_SHOW_MINUTES = 20
+FULL_SHOW_MINUTES = 60
+MAX_SHOW_MINUTES = 240
+RECENCY_HALF_LIFE_DAYS = 2 * 365
+
+# Unit prefixes of "3 years ago" / "3y ago" (checked in this order) -> days
+_AGE_UNITS = (
+    ("mo", 30.0), ("mi", 1.0 / 1440), ("y", 365.0), ("w", 7.0),
+    ("d", 1.0), ("h", 1.0 / 24), ("s", 1.0 / 86400),
+)
+_COUNT_SUFFIXES = (("k", 1e3), ("m", 1e6), ("b", 1e9))
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("candidate scoring needs numpy (pip install numpy)")
+
+
+def _text_column(values):
+    return np.array([str(v) if v is not None else "" for v in values], dtype=str)
+
+
+def parse_view_counts(texts):
+    """views for each "1,234 views" / "1.2M views" string; NaN when unparseable."""
+    _require_numpy()
+    s = _text_column(texts)
+    if not len(s):
+        return np.zeros(0)
+    s = np.char.replace(np.char.lower(s), ",", "")
+    number = np.char.partition(s, " ")[:, 0]
+    scale = np.ones(len(s))
+    for suffix, mult in _COUNT_SUFFIXES:
+        has = np.char.endswith(number, suffix)
+        scale[has] = mult
+        number = np.where(has, np.char.rstrip(number, suffix), number)
+    ok = (np.char.str_len(number) > 0) & np.char.isdigit(np.char.replace(number, ".", "", 1))
+    views = np.full(len(s), np.nan)
+    views[ok] = number[ok].astype(float) * scale[ok]
+    return views
+
+
+def parse_ages_days(texts):
+    """Age in days for each "3 years ago" / "2mo ago" string; NaN when unparseable."""
+    _require_numpy()
+    s = _text_column(texts)
+    if not len(s):
+        return np.zeros(0)
+    s = np.char.lower(s)
+    s = np.char.replace(np.char.replace(s, "streamed", ""), "ago", "")
+    s = np.char.replace(np.char.strip(s), " ", "")
+    unit = np.char.lstrip(s, "0123456789")
+    number = np.char.rstrip(s, "abcdefghijklmnopqrstuvwxyz")
+    days_per = np.full(len(s), np.nan)
+    for prefix, days in _AGE_UNITS:
+        days_per = np.where(np.isnan(days_per) & np.char.startswith(unit, prefix), days, days_per)
+    ok = (np.char.str_len(number) > 0) & np.char.isdigit(number) & ~np.isnan(days_per)
+    ages = np.full(len(s), np.nan)
+    ages[ok] = number[ok].astype(float) * days_per[ok]
+    return ages
+
+
+class CandidateColumns(object):
+    """The candidate list as parallel arrays (row i = candidates[i])."""
+
+    def __init__(self, candidates):
+        _require_numpy()
+        self.rows = list(candidates)
+        get = lambda key: [c.get(key) for c in self.rows]  # noqa: E731
+        self.video_id = _text_column(get("videoId"))
+        self.title = _text_column(get("title"))
+        self.channel = np.char.lower(np.char.strip(_text_column(get("channelName"))))
+        self.duration = np.array([d if isinstance(d, (int, float)) else np.nan
+                                  for d in get("durationMinutes")], dtype=float)
+        self.views = parse_view_counts(get("viewCountText"))
+        self.age_days = parse_ages_days(get("publishedText"))
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def _history_ids(entries):
+    return {str(e.get("videoId")) for e in entries or [] if isinstance(e, dict) and e.get("videoId")}
+
+
+def score(cols, classifier, trusted_channels=(), weights=None, skip_ids=(), min_minutes=MIN_SHOW_MINUTES):
+    """
+    (scores, keep, features) for every row of `cols`: the combined score,
+    a bool mask of rows worth showing, and {feature: array in [0, 1]}.
+    """
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    n = len(cols)
+
+    # The title scan is per row (one compiled regex); everything after is columnar.
+    include_hits = np.zeros(n)
+    rejected = np.zeros(n, dtype=bool)
+    for i, (title, channel) in enumerate(zip(cols.title, cols.channel)):
+        c = classifier.classify(title, channel)
+        include_hits[i] = len(c.hits.get("include", ()))
+        rejected[i] = not c.accepted
+
+    d = np.nan_to_num(cols.duration, nan=0.0)
+    ramp = np.clip((d - min_minutes) / max(1, FULL_SHOW_MINUTES - min_minutes), 0.0, 1.0)
+    taper = np.clip(1.0 - (d - MAX_SHOW_MINUTES) / MAX_SHOW_MINUTES, 0.0, 1.0)
+    features = {
+        "duration": np.where(d > MAX_SHOW_MINUTES, taper, ramp),
+        "views": np.clip((np.log10(np.nan_to_num(cols.views, nan=0.0) + 1.0) - 1.0) / 6.0, 0.0, 1.0),
+        "recency": np.where(np.isnan(cols.age_days), 0.0,
+                            0.5 ** (np.nan_to_num(cols.age_days, nan=0.0) / RECENCY_HALF_LIFE_DAYS)),
+        "trusted": np.isin(cols.channel, np.array(sorted({str(t).strip().lower() for t in trusted_channels}),
+                                                   dtype=str)).astype(float),
+        "keywords": np.minimum(include_hits, 3.0) / 3.0,
+    }
+    scores = np.zeros(n)
+    for name, values in features.items():
+        scores += weights.get(name, 0.0) * values
+
+    # First occurrence of each video ID only, and nothing already reviewed.
+    first = np.zeros(n, dtype=bool)
+    first[np.unique(cols.video_id, return_index=True)[1]] = True
+    reviewed = np.isin(cols.video_id, np.array(sorted(skip_ids), dtype=str)) if skip_ids else np.zeros(n, dtype=bool)
+    keep = first & ~reviewed & ~rejected & (cols.video_id != "") & (d >= min_minutes)
+    return scores, keep, features
+
+
+def rank(candidates, approved=(), rejected=(), include=PERFORMANCE_KEYWORDS, exclude=NON_PERFORMANCE_KEYWORDS,
+         blocked_terms=(), blocked_channels=(), trusted_channels=(), weights=None,
+         min_minutes=MIN_SHOW_MINUTES, top=50):
+    """Best `top` candidates as (score, candidate, {feature: value}), highest first."""
+    _require_numpy()
+    cols = CandidateColumns(candidates)
+    classifier = TitleClassifier(include, exclude, blocked_terms, blocked_channels)
+    skip = _history_ids(approved) | _history_ids(rejected)
+    scores, keep, features = score(cols, classifier, trusted_channels, weights, skip, min_minutes)
+
+    idx = np.flatnonzero(keep)
+    order = idx[np.argsort(-scores[idx], kind="stable")][:top]
+    return [(float(scores[i]), cols.rows[i], {k: round(float(v[i]), 3) for k, v in features.items()})
+            for i in order]
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Full-text search over the catalog with a prebuilt inverted index.
+
+Documents are (text, label, target) triples: `text` is what gets
+matched (artist, episode title, track title), `label` is what the
+result row shows and `target` is the plugin action + params the row
+links to. Callers decide the targets, so the same index serves both
+addons.
+
+Index layout (all plain lists/dicts so it round-trips through JSON):
+
+  vocab     sorted list of distinct terms
+  postings  postings[i] = sorted doc ids containing vocab[i]
+  trigrams  trigram -> term ids, for matching inside a word
+
+A query term matches every vocab term it is a prefix of (two bisects
+on the sorted vocab); if nothing starts with it, terms that contain it
+are found through the trigram table. Each query term's doc set is the
+union of those postings, and the result is the intersection across
+query terms, smallest first.
+"""
+
+import bisect
+import json
+import os
+import re
+
+INDEX_FORMAT = 1
+MAX_RESULTS = 200
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text or "").casefold())
+
+
+def _trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex(object):
+    def __init__(self, docs, vocab, postings, trigrams, version=None):
+        self.docs = docs
+        self.vocab = vocab
+        self.postings = postings
+        self.trigrams = trigrams
+        self.version = version
+
+    @classmethod
+    def build(cls, documents, version=None):
+        docs = []
+        terms = {}
+        for text, label, target in documents:
+            doc_id = len(docs)
+            docs.append([label, target])
+            for term in set(tokenize(text)):
+                terms.setdefault(term, []).append(doc_id)
+
+        vocab = sorted(terms)
+        postings = [terms[t] for t in vocab]  # doc ids already ascending
+        trigrams = {}
+        for term_id, term in enumerate(vocab):
+            for tri in _trigrams(term):
+                trigrams.setdefault(tri, []).append(term_id)
+        return cls(docs, vocab, postings, trigrams, version)
+
+    # ---- querying ----------------------------------------------------
+
+    def _term_ids(self, token):
+        lo = bisect.bisect_left(self.vocab, token)
+        hi = bisect.bisect_left(self.vocab, token + "\U0010ffff", lo)
+        if lo < hi or len(token) < 3:
+            return range(lo, hi)
+
+        # No word starts with it: look for words containing it.
+        candidates = None
+        for tri in _trigrams(token):
+            ids = self.trigrams.get(tri)
+            if not ids:
+                return []
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+            if not candidates:
+                return []
+        return [i for i in sorted(candidates) if token in self.vocab[i]]
+
+    def _doc_set(self, token):
+        term_ids = self._term_ids(token)
+        if len(term_ids) == 1:
+            return set(self.postings[term_ids[0]])
+        out = set()
+        for i in term_ids:
+            out.update(self.postings[i])
+        return out
+
+    def search(self, query, limit=MAX_RESULTS):
+        """[(label, target), ...] for docs matching every query term."""
+        tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not tokens:
+            return []
+
+        # Longest tokens first: they tend to be the most selective.
+        result = None
+        for token in tokens:
+            docs = self._doc_set(token)
+            result = docs if result is None else result & docs
+            if not result:
+                return []
+        return [tuple(self.docs[i]) for i in sorted(result)[:limit]]
+
+    # ---- persistence -------------------------------------------------
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": INDEX_FORMAT,
+                "version": self.version,
+                "docs": self.docs,
+                "vocab": self.vocab,
+                "postings": self.postings,
+                "trigrams": self.trigrams,
+            }, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, version=None):
+        """Cached index from disk, or None if missing/outdated (always None for version=None)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if version is None or raw.get("format") != INDEX_FORMAT or raw.get("version") != version:
+            return None
+        return cls(raw["docs"], raw["vocab"], raw["postings"], raw["trigrams"], raw.get("version"))
+
+
+def load_or_build(path, version, documents):
+    """
+    Index for this catalog version: from disk when it matches, otherwise
+    built from `documents` (a callable returning the doc iterable) and
+    saved for next time. An unknown (None) version always rebuilds.
+    """
+    index = SearchIndex.load(path, version)
+    if index is None:
+        index = SearchIndex.build(documents(), version)
+        try:
+            index.save(path)
+        except OSError:
+            pass
+    return index
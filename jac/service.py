@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Warm catalog shared between the background service and plugin runs.
+
+Kodi starts a fresh interpreter for every plugin URL. The service
+(service.py) lives as long as Kodi does, keeps the parsed catalog in
+memory as a manifest + shards (jac.shards.build_shards) and answers
+plugin runs over a loopback socket, so opening a folder costs one
+small round trip instead of a fetch and a full json.loads.
+
+Protocol: one JSON object per line each way.
+
+  {"token": ..., "op": "ping"}                -> {"ok": true, "version": ...}
+  {"token": ..., "op": "root"}                -> {"ok": true, "version": ..., "items": [...]}
+  {"token": ..., "op": "shard", "name": ...}  -> {"ok": true, "node": {...}}
+  {"token": ..., "op": "path", "id": ...}     -> {"ok": true, "path": "0/2/1" or null}
+  anything else                               -> {"ok": false, "error": ...}
+
+The service can add its own ops (`handlers`: op -> callable taking the
+request and returning the reply); service.py uses that for "queue"
+and "art".
+
+The port and a per-start token are written to PORT_FILE in the profile
+dir; the token keeps other local processes from talking to it by
+accident. The shards of the previous snapshot are kept after a
+refresh, so a plugin run that got its root just before the swap can
+still open folders from it.
+
+ServiceCatalog is the plugin side and has the same load_root()/expand()/
+path_of() interface as ShardedCatalog, so default.py can use either.
+"""
+
+import json
+import os
+import secrets
+import socket
+import socketserver
+import threading
+
+from jac.shards import build_shards, is_stub
+
+PORT_FILE = "service.json"
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.catalog.handle(json.loads(line.decode("utf-8")))
+            except ValueError:
+                reply = {"ok": False, "error": "bad request"}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class CatalogServer(object):
+    def __init__(self, port_file, log=None, handlers=None):
+        self.port_file = port_file
+        self.log = log or (lambda msg: None)
+        self.handlers = dict(handlers or {})
+        self.token = secrets.token_hex(16)
+        self.version = None
+        self._manifest = None
+        self._shards = {}
+        self._previous = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def publish(self, tree, version):
+        """Swaps in a new catalog snapshot."""
+        manifest, shards = build_shards(tree)
+        with self._lock:
+            self._previous = self._shards
+            self._manifest = manifest
+            self._shards = shards
+            self._paths = shards[manifest["index"]]["paths"]
+            self.version = version
+        self.log(f"Service: catalog {version} ready ({len(manifest['items'])} items, {len(shards)} shards)")
+
+    def handle(self, request):
+        if request.get("token") != self.token:
+            return {"ok": False, "error": "bad token"}
+        op = request.get("op")
+        if op in self.handlers:
+            return self.handlers[op](request)
+        with self._lock:
+            if op == "ping":
+                return {"ok": True, "version": self.version}
+            if self._manifest is None:
+                return {"ok": False, "error": "not loaded yet"}
+            if op == "root":
+                return {"ok": True, "version": self.version, "items": self._manifest["items"]}
+            if op == "shard":
+                name = request.get("name")
+                node = self._shards.get(name) or self._previous.get(name)
+                if node is None:
+                    return {"ok": False, "error": f"unknown shard {name}"}
+                return {"ok": True, "node": node}
+            if op == "path":
+                return {"ok": True, "path": self._paths.get(request.get("id"))}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.catalog = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="jac-service")
+        self._thread.daemon = True
+        self._thread.start()
+
+        port = self._server.server_address[1]
+        tmp = self.port_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"port": port, "token": self.token, "pid": os.getpid()}, f)
+        os.replace(tmp, self.port_file)
+        self.log(f"Service: listening on 127.0.0.1:{port}")
+
+    def stop(self):
+        try:
+            os.remove(self.port_file)
+        except OSError:
+            pass
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class ServiceCatalog(object):
+    """Plugin-side client; raises ServiceUnavailable if nothing answers."""
+
+    def __init__(self, port_file, timeout=0.5):
+        self.port_file = port_file
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._token = None
+        self.version = None
+
+    def _connect(self):
+        try:
+            with open(self.port_file, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            self._sock = socket.create_connection(("127.0.0.1", int(info["port"])), timeout=self.timeout)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise ServiceUnavailable(f"service not running ({e})")
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rwb")
+        self._token = info.get("token")
+
+    def call(self, op, **params):
+        if self._sock is None:
+            self._connect()
+        request = dict(params, op=op, token=self._token)
+        try:
+            self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+            reply = json.loads(line.decode("utf-8")) if line else None
+        except (OSError, ValueError) as e:
+            self.close()
+            raise ServiceUnavailable(f"service did not answer ({e})")
+        if not reply or not reply.get("ok"):
+            raise ServiceUnavailable((reply or {}).get("error") or "connection closed")
+        return reply
+
+    def load_root(self):
+        reply = self.call("root")
+        self.version = reply.get("version")
+        return reply["items"]
+
+    def expand(self, node):
+        """Returns the full node for a stub, from the service's snapshot."""
+        if not is_stub(node):
+            return node
+        return self.call("shard", name=node["shard"])["node"]
+
+    def path_of(self, node_id):
+        """Current path of a node ID in the service's snapshot, or None."""
+        return self.call("path", id=node_id)["path"]
+
+    def close(self):
+        for obj in (self._file, self._sock):
+            try:
+                if obj is not None:
+                    obj.close()
+            except OSError:
+                pass
+        self._sock = self._file = None
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Sharded catalog layout.
+
+Publishing side (build_shards) splits episodes.json into:
+
+  catalog/manifest.json       top-level entries; folders/queues as stubs
+  catalog/shards/<hash>.json  one file per folder or queue
+
+A stub is the original node minus its bulk ("items" / "tracks") plus
+"shard" (file name) and "count" (how many children it had). Everything
+list_node() needs to draw the row (title, artist, mode, encore) stays on
+the stub, so a folder can be listed without opening any of its children.
+A queue without its own "thumb" gets its first video's YouTube
+thumbnail on the stub, since the tracks it would come from are gone.
+
+Every node, stub and shard carries its stable "id" (jac.catalog.iter_node_ids),
+and one more shard, named by the manifest's "index", maps each ID to the
+node's path, so default.py can resolve an ID with one cached lookup.
+
+Shard names are a hash of their content, so a shard never changes once
+published and can be cached forever; only the manifest needs revalidating.
+A change deep in the tree re-hashes every shard on the way up to the
+manifest, which is what makes that safe.
+
+When a build changes the manifest, the one it replaces is kept as
+catalog/manifest.previous.json. Pruning keeps the shards either of the
+two reaches and deletes the rest: a client still holding the previous
+manifest (inside its TTL) can finish browsing, anything older is gone.
+
+Client side (ShardedCatalog) fetches the manifest, then each shard the
+first time the user opens it, each through its own JsonCache entry.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from jac.artwork import youtube_thumb
+from jac.catalog import iter_node_ids
+from jac.youtube import yt_id_from_url
+
+MANIFEST_NAME = "manifest.json"
+PREVIOUS_NAME = "manifest.previous.json"
+SHARD_DIR = "shards"
+FORMAT = 1
+
+# Shards are content-addressed, so a cached copy never goes stale.
+IMMUTABLE_TTL = 10 * 365 * 24 * 3600
+
+_PLAYLIST_RE = re.compile(r"[?&]list=([A-Za-z0-9_\-]+)")
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def _should_shard(node):
+    mode = str(node.get("mode", "")).lower()
+    if mode == "folder":
+        return True
+    if mode == "queue":
+        # Playlist-style queues render from their first URL; keep them inline.
+        tracks = node.get("tracks") or []
+        first = (tracks[0] or {}).get("url", "") if tracks else ""
+        return not _PLAYLIST_RE.search(first)
+    return False
+
+
+def is_stub(node):
+    return isinstance(node, dict) and "shard" in node
+
+
+def build_shards(tree):
+    """
+    Returns (manifest, {shard_name: shard_dict}) for a catalog tree.
+    """
+    shards = {}
+    ids = {}
+    paths = {}
+    for path, node_id, node in iter_node_ids(tree):
+        ids[id(node)] = node_id
+        paths[node_id] = path
+
+    def tagged(node):
+        return dict(node, id=ids[id(node)])
+
+    def stub_for(node):
+        body_key = "items" if str(node.get("mode", "")).lower() == "folder" else "tracks"
+        node = tagged(node)
+        shard = dict(node)
+        if body_key == "items":
+            shard["items"] = [stub_for(c) if _should_shard(c) else tagged(c) for c in node.get("items") or []]
+        name = hashlib.sha1(_dumps(shard).encode("utf-8")).hexdigest()[:16] + ".json"
+        shards[name] = shard
+
+        stub = {k: v for k, v in node.items() if k not in ("items", "tracks")}
+        if not stub.get("thumb") and body_key == "tracks":
+            first = (node.get("tracks") or [{}])[0] or {}
+            vid = yt_id_from_url(first.get("url", ""))
+            if vid:
+                stub["thumb"] = youtube_thumb(vid)
+        stub["shard"] = name
+        stub["count"] = len(node.get(body_key) or [])
+        return stub
+
+    items = [stub_for(n) if _should_shard(n) else tagged(n) for n in tree]
+    index = {"format": FORMAT, "paths": paths}
+    index_name = hashlib.sha1(_dumps(index).encode("utf-8")).hexdigest()[:16] + ".json"
+    shards[index_name] = index
+    manifest = {"format": FORMAT, "items": items, "index": index_name}
+    return manifest, shards
+
+
+def referenced_shards(manifest, shard_dir):
+    """Names of every shard `manifest` reaches, read from shard_dir (missing ones are skipped)."""
+    seen = set()
+    pending = [n["shard"] for n in manifest.get("items") or [] if is_stub(n)]
+    if manifest.get("index"):
+        pending.append(manifest["index"])
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            with open(os.path.join(shard_dir, name), "r", encoding="utf-8") as f:
+                shard = json.load(f)
+        except (OSError, ValueError):
+            continue
+        pending.extend(n["shard"] for n in shard.get("items") or [] if is_stub(n))
+    return seen
+
+
+def _read_text(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_text(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_shards(tree, out_dir, prune=False):
+    """
+    Writes manifest + shards into out_dir. Returns (written, removed).
+
+    With prune=True, shards that neither the new manifest nor the
+    previous one reaches are deleted.
+    """
+    manifest, shards = build_shards(tree)
+    shard_dir = os.path.join(out_dir, SHARD_DIR)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    previous_path = os.path.join(out_dir, PREVIOUS_NAME)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    written = 0
+    for name, shard in shards.items():
+        path = os.path.join(shard_dir, name)
+        if os.path.exists(path):
+            continue
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(_dumps(shard))
+        written += 1
+
+    # Manifest after its shards: it only ever points at shards that
+    # already exist. An unchanged build leaves the previous one alone.
+    text = _dumps(manifest)
+    old = _read_text(manifest_path)
+    if old is not None and old != text:
+        _write_text(previous_path, old)
+    _write_text(manifest_path, text)
+
+    removed = 0
+    if prune:
+        keep = set(shards)
+        previous = _read_text(previous_path)
+        if previous is not None:
+            try:
+                keep |= referenced_shards(json.loads(previous), shard_dir)
+            except ValueError:
+                pass
+        for name in os.listdir(shard_dir):
+            if name.endswith(".json") and name not in keep:
+                os.remove(os.path.join(shard_dir, name))
+                removed += 1
+    return written, removed
+
+
+class ShardedCatalog(object):
+    """
+    Lazily-resolved view over a published catalog/ directory.
+    `cache` is a jac.cache.JsonCache; `base_url` points at catalog/.
+    """
+
+    def __init__(self, cache, base_url):
+        self.cache = cache
+        self.base_url = base_url.rstrip("/")
+        self.index_name = None
+        self.version = None
+
+    def load_root(self):
+        manifest = self.cache.get("manifest", self.base_url + "/" + MANIFEST_NAME)
+        if not isinstance(manifest, dict) or manifest.get("format") != FORMAT:
+            raise ValueError("unsupported catalog manifest")
+        self.index_name = manifest.get("index")
+        # Any change re-hashes the shards up to the manifest, so its
+        # cached copy's identity is the catalog's.
+        self.version = self.cache.version("manifest")
+        return manifest.get("items") or []
+
+    def path_of(self, node_id):
+        """Current path of a node ID, or None (also for manifests from before IDs)."""
+        if not self.index_name:
+            return None
+        return (self._fetch_shard(self.index_name).get("paths") or {}).get(node_id)
+
+    def _fetch_shard(self, name):
+        return self.cache.get("shard-" + name[:-len(".json")],
+                              self.base_url + "/" + SHARD_DIR + "/" + name,
+                              ttl=IMMUTABLE_TTL)
+
+    def expand(self, node):
+        """Returns the full node for a stub (fetching its shard once)."""
+        if not is_stub(node):
+            return node
+        return self._fetch_shard(node["shard"])
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+Catalog compiled into SQLite.
+
+Publishing side (write_database) turns a catalog tree (episodes.json,
+episodes_mobile.json) into one database file:
+
+  nodes   one row per folder/show/queue: parent + position links, the
+          "0/2/1" path, the stable node ID (jac.catalog.iter_node_ids;
+          also in the body as "id"), the plugin's episode key, mode,
+          artist/year/title (plus the exact sort keys jac.catalog uses),
+          child count, first video/playlist ID, encore slot, and the
+          node's own JSON minus its items/tracks
+  tracks  one row per track in play order with the encore slotted in,
+          video/playlist IDs already extracted
+
+with indexes on (parent, position), path, node ID, key, mode (+ sort order),
+artist and year. The file is named after a hash of the source JSON
+and FORMAT, "<name>-<version>.db", and a small pointer "<name>.json"
+says which one is current, so clients only re-download when the
+content (or the schema) changed.
+
+Client side, fetch_database() follows the pointer into a local copy
+and SqliteCatalog answers both addons' questions with one indexed
+query each:
+
+  - default.py: load_root()/expand()/path_of() like ShardedCatalog; an
+    expanded folder's "items" is a lazy sequence, so listing a page or
+    walking a path only reads the rows involved
+  - the plugin: page()/get()/find_by_title() like jac.catalog.Catalog
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from jac.artwork import youtube_thumb
+from jac.catalog import Catalog, iter_node_ids, sort_key
+from jac.youtube import has_encore, playlist_id_from_url, yt_id_from_url
+
+FORMAT = 2
+VIEW_MODES = ("fullshow", "queue", "playlist")
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,         -- preorder position in the tree
+    parent INTEGER REFERENCES nodes(id),
+    position INTEGER NOT NULL,      -- index among its siblings
+    path TEXT NOT NULL,
+    uid TEXT NOT NULL,              -- stable node ID
+    key TEXT,                       -- jac.catalog episode key (NULL for folders)
+    mode TEXT NOT NULL,             -- lowercased
+    title TEXT,
+    artist TEXT,
+    year TEXT,
+    sort_artist TEXT NOT NULL,
+    sort_year TEXT NOT NULL,
+    sort_title TEXT NOT NULL,
+    child_count INTEGER NOT NULL,   -- items for folders, tracks otherwise
+    video_id TEXT,                  -- first track's
+    playlist_id TEXT,               -- first track's
+    encore_seq INTEGER,             -- play-order slot of the encore
+    body TEXT NOT NULL              -- node JSON without items/tracks
+);
+CREATE INDEX nodes_parent ON nodes(parent, position);
+CREATE UNIQUE INDEX nodes_path ON nodes(path);
+CREATE UNIQUE INDEX nodes_uid ON nodes(uid);
+CREATE UNIQUE INDEX nodes_key ON nodes(key);
+CREATE INDEX nodes_mode ON nodes(mode, sort_artist, sort_year, sort_title, id);
+CREATE INDEX nodes_artist ON nodes(sort_artist);
+CREATE INDEX nodes_year ON nodes(year);
+CREATE TABLE tracks (
+    node INTEGER NOT NULL REFERENCES nodes(id),
+    seq INTEGER NOT NULL,           -- play order, encore included
+    track INTEGER,                  -- index in "tracks"; NULL for the encore
+    title TEXT,
+    url TEXT,
+    video_id TEXT,
+    playlist_id TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (node, seq)
+) WITHOUT ROWID;
+CREATE INDEX tracks_video ON tracks(video_id);
+"""
+
+_NODE_COLUMNS = "id, mode, child_count, video_id, playlist_id, body"
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def content_version(tree):
+    return hashlib.sha1(f"{FORMAT}\x1f{_dumps(tree)}".encode("utf-8")).hexdigest()[:16]
+
+
+def _mode(node):
+    return str(node.get("mode", "")).lower()
+
+
+def _play_order(ep):
+    """
+    (track index or None for the encore, track dict) in play order,
+    matching jac.youtube.iter_track_video_ids() for the playable ones.
+    """
+    tracks = ep.get("tracks", []) or []
+    encore = None
+    if has_encore(ep) and yt_id_from_url((ep.get("encore") or {}).get("url")):
+        encore = ep.get("encore")
+        insert_at = max(0, ep.get("encoreAfterTrackIndex") + 1)
+
+    out = []
+    playable = 0
+    for i, t in enumerate(tracks):
+        if encore is not None and playable == insert_at:
+            out.append((None, encore))
+            encore = None
+        out.append((i, t))
+        if yt_id_from_url((t or {}).get("url", "")):
+            playable += 1
+    if encore is not None:
+        out.append((None, encore))
+    return out
+
+
+def compile_catalog(tree, path, version=None):
+    """Writes the database for `tree` to `path` (replacing it)."""
+    keys = {id(ep): key for key, ep in Catalog(tree).episodes.items()}
+    uids = {id(node): node_id for _, node_id, node in iter_node_ids(tree)}
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        node_rows = []
+        track_rows = []
+        next_id = [0]
+
+        def add(node, parent, position, path_str):
+            node_id = next_id[0]
+            next_id[0] += 1
+            mode = _mode(node)
+            tracks = node.get("tracks", []) or []
+            first_url = (tracks[0] or {}).get("url", "") if tracks else ""
+            uid = uids[id(node)]
+            body = {k: v for k, v in node.items() if k not in ("items", "tracks")}
+            body["id"] = uid
+            artist, year, title = sort_key(node)
+
+            encore_seq = None
+            if mode != "folder":
+                for seq, (index, t) in enumerate(_play_order(node)):
+                    url = (t or {}).get("url", "")
+                    if index is None:
+                        encore_seq = seq
+                    track_rows.append((node_id, seq, index, (t or {}).get("title"), url,
+                                       yt_id_from_url(url), playlist_id_from_url(url), _dumps(t)))
+
+            children = (node.get("items", []) or []) if mode == "folder" else []
+            node_rows.append((
+                node_id, parent, position, path_str, uid, keys.get(id(node)), mode,
+                node.get("title"), node.get("artist"),
+                None if node.get("year") is None else str(node.get("year")),
+                artist, year, title,
+                len(children) if mode == "folder" else len(tracks),
+                yt_id_from_url(first_url), playlist_id_from_url(first_url),
+                encore_seq, _dumps(body),
+            ))
+            for i, child in enumerate(children):
+                if isinstance(child, dict):
+                    add(child, node_id, i, f"{path_str}/{i}")
+
+        for i, node in enumerate(tree if isinstance(tree, list) else []):
+            if isinstance(node, dict):
+                add(node, None, i, str(i))
+
+        conn.executemany("INSERT INTO nodes VALUES (" + ",".join("?" * 18) + ")", node_rows)
+        conn.executemany("INSERT INTO tracks VALUES (?,?,?,?,?,?,?,?)", track_rows)
+        conn.executemany("INSERT INTO meta VALUES (?,?)", [
+            ("format", str(FORMAT)),
+            ("version", version or content_version(tree)),
+            ("top_level", str(len(tree) if isinstance(tree, list) else 0)),
+        ])
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+def _sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_database(tree, out_dir, name="episodes"):
+    """
+    Compiles `tree` into out_dir/<name>-<version>.db and points
+    out_dir/<name>.json at it. Returns (pointer, built). Older databases
+    of the same name are removed, except the one the previous pointer
+    named (clients may still hold that pointer inside their TTL).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    version = content_version(tree)
+    file_name = f"{name}-{version}.db"
+    db_path = os.path.join(out_dir, file_name)
+    pointer_path = os.path.join(out_dir, name + ".json")
+
+    previous = None
+    try:
+        with open(pointer_path, "r", encoding="utf-8") as f:
+            previous = json.load(f).get("file")
+    except (OSError, ValueError):
+        pass
+
+    built = not os.path.exists(db_path)
+    if built:
+        compile_catalog(tree, db_path, version)
+
+    pointer = {
+        "format": FORMAT,
+        "version": version,
+        "file": file_name,
+        "bytes": os.path.getsize(db_path),
+        "sha1": _sha1_file(db_path),
+    }
+    tmp = pointer_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(pointer, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, pointer_path)
+
+    for other in os.listdir(out_dir):
+        if other.startswith(name + "-") and other.endswith(".db") and other not in (file_name, previous):
+            os.remove(os.path.join(out_dir, other))
+    return pointer, built
+
+
+def fetch_database(cache, base_url, directory, name="episodes"):
+    """
+    Local SqliteCatalog for the published database, downloading it only
+    when the pointer (revalidated through `cache`) names a new file.
+    """
+    base_url = base_url.rstrip("/")
+    pointer = cache.get("sqlite-" + name, f"{base_url}/{name}.json")
+    if not isinstance(pointer, dict) or pointer.get("format") != FORMAT:
+        raise ValueError("unsupported sqlite catalog pointer")
+
+    file_name = pointer["file"]
+    path = os.path.join(directory, file_name)
+    if not os.path.exists(path):
+        body = cache.client.get(f"{base_url}/{file_name}").body
+        if hashlib.sha1(body).hexdigest() != pointer.get("sha1"):
+            raise ValueError(f"checksum mismatch for {file_name}")
+        os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        for other in os.listdir(directory):
+            if other.startswith(name + "-") and other.endswith(".db") and other != file_name:
+                try:
+                    os.remove(os.path.join(directory, other))
+                except OSError:
+                    pass  # still open in another plugin run; next time
+    return SqliteCatalog(path)
+
+
+class _Children(object):
+    """A folder's items, read from the database a slice at a time."""
+
+    CHUNK = 200
+
+    def __init__(self, catalog, parent, count):
+        self.catalog = catalog
+        self.parent = parent
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            if step != 1:
+                return self.catalog._children(self.parent, start, stop - start)[::step]
+            return self.catalog._children(self.parent, start, max(0, stop - start))
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.catalog._children(self.parent, index, 1)[0]
+
+    def __iter__(self):
+        for start in range(0, self.count, self.CHUNK):
+            for node in self.catalog._children(self.parent, start, self.CHUNK):
+                yield node
+
+
+class SqliteCatalog(object):
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get("format") != str(FORMAT):
+            raise ValueError("unsupported sqlite catalog format")
+        self.version = meta.get("version")
+        self._episodes = None
+
+    def close(self):
+        self.conn.close()
+
+    # ---- rows -> nodes -----------------------------------------------
+
+    def _tracks(self, node_ids):
+        """{node id: [track dicts in file order]}"""
+        out = {}
+        if not node_ids:
+            return out
+        marks = ",".join("?" * len(node_ids))
+        for node, body in self.conn.execute(
+                f"SELECT node, body FROM tracks WHERE node IN ({marks}) AND track IS NOT NULL "
+                "ORDER BY node, track", list(node_ids)):
+            out.setdefault(node, []).append(json.loads(body))
+        return out
+
+    def _nodes(self, rows):
+        """
+        Child rows as list_node() wants them: folders and non-playlist
+        queues as stubs ("node_id", "count", a thumb), the rest whole.
+        """
+        rows = list(rows)
+        inline = {r[0] for r in rows if r[1] != "folder" and (r[1] != "queue" or r[4])}
+        tracks = self._tracks(inline)
+        nodes = []
+        for node_id, mode, count, video_id, playlist_id, body in rows:
+            node = json.loads(body)
+            if node_id in inline:
+                node["tracks"] = tracks.get(node_id, [])
+            else:
+                node["node_id"] = node_id
+                node["count"] = count
+                if not node.get("thumb") and video_id:
+                    node["thumb"] = youtube_thumb(video_id)
+            nodes.append(node)
+        return nodes
+
+    def _children(self, parent, offset, limit):
+        return self._nodes(self.conn.execute(
+            f"SELECT {_NODE_COLUMNS} FROM nodes WHERE parent IS ? ORDER BY position LIMIT ? OFFSET ?",
+            (parent, limit, offset)))
+
+    # ---- default.py: ShardedCatalog interface ------------------------
+
+    def load_root(self):
+        return self._children(None, 0, -1)
+
+    def expand(self, node):
+        """Full node for a stub: lazy items for folders, tracks for queues."""
+        if not isinstance(node, dict) or "node_id" not in node:
+            return node
+        node_id = node["node_id"]
+        row = self.conn.execute("SELECT mode, child_count, body FROM nodes WHERE id = ?", (node_id,)).fetchone()
+        if row is None:
+            raise KeyError(node_id)
+        mode, count, body = row
+        full = json.loads(body)
+        if mode == "folder":
+            full["items"] = _Children(self, node_id, count)
+        else:
+            full["tracks"] = self._tracks([node_id]).get(node_id, [])
+        return full
+
+    def path_of(self, node_id):
+        """Current path of a node ID, or None."""
+        row = self.conn.execute("SELECT path FROM nodes WHERE uid = ?", (node_id,)).fetchone()
+        return row[0] if row else None
+
+    def video_ids(self, path):
+        """Play-order video IDs of the queue at `path` (encore included)."""
+        return [vid for (vid,) in self.conn.execute(
+            "SELECT t.video_id FROM tracks t JOIN nodes n ON n.id = t.node "
+            "WHERE n.path = ? AND t.video_id IS NOT NULL ORDER BY t.seq", (path,))]
+
+    # ---- plugin: jac.catalog.Catalog interface -----------------------
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM nodes WHERE key IS NOT NULL").fetchone()[0]
+
+    def get(self, key):
+        row = self.conn.execute("SELECT id, body FROM nodes WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        ep = json.loads(row[1])
+        ep["tracks"] = self._tracks([row[0]]).get(row[0], [])
+        return ep
+
+    def page(self, mode, page, page_size):
+        """(keys on this page, has_more) for a view, in Catalog order."""
+        if mode == "all":
+            where, args = "key IS NOT NULL", []
+        elif mode in VIEW_MODES:
+            where, args = "key IS NOT NULL AND mode = ?", [mode]
+        else:
+            return [], False
+        start = max(0, page) * page_size
+        rows = self.conn.execute(
+            f"SELECT key FROM nodes WHERE {where} ORDER BY sort_artist, sort_year, sort_title, id "
+            "LIMIT ? OFFSET ?", args + [page_size + 1, start]).fetchall()
+        return [r[0] for r in rows[:page_size]], len(rows) > page_size
+
+    def find_by_title(self, title):
+        row = self.conn.execute("SELECT key FROM nodes WHERE key IS NOT NULL AND title = ? ORDER BY id LIMIT 1",
+                                (title,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def episodes(self):
+        """{key: episode} for everything (only search index builds need it)."""
+        if self._episodes is None:
+            rows = self.conn.execute("SELECT id, key, body FROM nodes WHERE key IS NOT NULL ORDER BY id").fetchall()
+            tracks = {}
+            for node, body in self.conn.execute("SELECT node, body FROM tracks WHERE track IS NOT NULL ORDER BY node, track"):
+                tracks.setdefault(node, []).append(json.loads(body))
+            self._episodes = {}
+            for node_id, key, body in rows:
+                ep = json.loads(body)
+                ep["tracks"] = tracks.get(node_id, [])
+                self._episodes[key] = ep
+        return self._episodes
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Crash-safe writer for episodes.json (and any other catalog file).
+
+Three pieces:
+
+  FileLock          advisory lock: an O_CREAT|O_EXCL "<file>.lock" holding
+                    the owner's pid and start time. approve-candidates.js
+                    takes the same lock, so Python and Node writers queue
+                    up instead of clobbering each other. A lock older than
+                    `stale` seconds is assumed abandoned and broken.
+
+  write_json_atomic temp file in the same directory + fsync + rename, so
+                    readers see either the old file or the new one, never
+                    a truncated one.
+
+  CatalogStore      edit() = lock, load, hand out the data, and write it
+                    back atomically on the way out if it changed. The
+                    site serves episodes.json as-is, so every edit ends
+                    with the full file on disk; there is nothing to batch.
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+LOCK_SUFFIX = ".lock"
+
+
+class LockTimeout(Exception):
+    pass
+
+
+class FileLock(object):
+    def __init__(self, path, timeout=60, stale=600, poll=0.1):
+        self.path = path
+        self.timeout = timeout
+        self.stale = stale
+        self.poll = poll
+        self._held = False
+
+    def _break_if_stale(self):
+        try:
+            age = time.time() - os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if age > self.stale:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def acquire(self):
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                self._break_if_stale()
+                if time.time() >= deadline:
+                    raise LockTimeout(f"could not lock {self.path} within {self.timeout}s")
+                time.sleep(self.poll)
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps({"pid": os.getpid(), "since": time.time()}))
+            self._held = True
+            return
+
+    def release(self):
+        if self._held:
+            self._held = False
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows: directories can't be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_bytes_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def dump_catalog(data):
+    """The repo's on-disk format: 2-space indent, UTF-8, trailing newline."""
+    return (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def write_json_atomic(path, data):
+    write_bytes_atomic(path, dump_catalog(data))
+
+
+class CatalogStore(object):
+    def __init__(self, path, lock_timeout=60):
+        self.path = path
+        self.lock = FileLock(path + LOCK_SUFFIX, timeout=lock_timeout)
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @contextlib.contextmanager
+    def edit(self):
+        """
+        with store.edit() as data:
+            ...mutate data...
+
+        Under the lock. If the block raises, or leaves the data as it
+        was, nothing is written.
+        """
+        with self.lock:
+            data = self.load()
+            before = json.loads(json.dumps(data))
+            yield data
+            if data != before:
+                write_json_atomic(self.path, data)
+
+    def save(self, data):
+        """Replaces the whole catalog with `data`."""
+        with self.edit() as current:
+            current[:] = data
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Per-invocation timing spans.
+
+    TRACE = Tracer(enabled=True)
+    with TRACE.span("router", action="open_folder"):
+        with TRACE.span("load"):
+            with TRACE.span("fetch", key="episodes") as span:
+                ...
+                span.add("bytes", len(body))
+        with TRACE.span("render"):
+            TRACE.add("items", 50)
+
+Spans nest by `with` block; each records its wall time plus whatever
+counters were added to it (items, bytes, ...). summary() renders the
+tree on one line for the Kodi log, to_dict() as plain JSON, and
+append_jsonl() adds it to a trace file for offline analysis.
+
+A disabled tracer hands out one shared no-op span, so leaving the
+calls in place costs next to nothing.
+"""
+
+import json
+import os
+import time
+
+MAX_JSONL_BYTES = 1024 * 1024  # rotated to "<file>.1" beyond this
+
+
+class Span(object):
+    __slots__ = ("tracer", "name", "attrs", "children", "start", "elapsed")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.children = []
+        self.start = None
+        self.elapsed = None
+
+    def __enter__(self):
+        stack = self.tracer._stack
+        (stack[-1].children if stack else self.tracer.roots).append(self)
+        stack.append(self)
+        self.start = self.tracer.clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = self.tracer.clock() - self.start
+        self.tracer._stack.pop()
+
+    def add(self, key, n=1):
+        self.attrs[key] = self.attrs.get(key, 0) + n
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        out = {"name": self.name, "ms": round((self.elapsed or 0.0) * 1000, 3)}
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.children:
+            out["children"] = [c.to_dict() for c in self.children]
+        return out
+
+    def summary(self):
+        text = f"{self.name} {(self.elapsed or 0.0) * 1000:.1f}ms"
+        if self.attrs:
+            text += " " + " ".join(f"{k}={v}" for k, v in self.attrs.items())
+        if self.children:
+            text += " [" + ", ".join(c.summary() for c in self.children) + "]"
+        return text
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def add(self, key, n=1):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.roots = []
+        self._stack = []
+
+    def span(self, name, **attrs):
+        """Context manager timing the block; yields the span (or a no-op)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, attrs)
+
+    def add(self, key, n=1):
+        """Adds to a counter on the innermost open span."""
+        if self._stack:
+            self._stack[-1].add(key, n)
+
+    def set(self, **attrs):
+        if self._stack:
+            self._stack[-1].set(**attrs)
+
+    def summary(self):
+        return "Trace: " + " | ".join(s.summary() for s in self.roots)
+
+    def to_dict(self):
+        return {"ts": time.time(), "spans": [s.to_dict() for s in self.roots]}
+
+    def append_jsonl(self, path):
+        try:
+            if os.path.getsize(path) > MAX_JSONL_BYTES:
+                os.replace(path, path + ".1")
+        except OSError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False) + "\n")
+
+
+NULL_TRACER = Tracer(enabled=False)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP client for the addons and the scraper.
+
+One HttpClient keeps a persistent (keep-alive) connection per
+scheme/host/port, asks for gzip/deflate and decodes it, and retries
+transient failures (connection errors, 429 and 5xx) a bounded number of
+times with full-jitter exponential backoff. A connection that the
+server quietly closed between requests is reopened once straight away,
+without counting as a retry.
+
+Every request is recorded in `stats` (latency, bytes on the wire vs
+decoded bytes, whether the connection was reused), and summary() turns
+that into one log line.
+"""
+
+import gzip
+import http.client
+import json
+import random
+import ssl
+import time
+import urllib.parse
+import zlib
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_REDIRECTS = 5
+
+
+class HttpError(Exception):
+    def __init__(self, url, code, response=None):
+        Exception.__init__(self, f"HTTP {code} for {url}")
+        self.url = url
+        self.code = code
+        self.response = response
+
+
+class Response(object):
+    __slots__ = ("url", "status", "headers", "body", "wire_bytes", "elapsed")
+
+    def __init__(self, url, status, headers, body, wire_bytes, elapsed):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.wire_bytes = wire_bytes
+        self.elapsed = elapsed
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+def decode_body(raw, encoding):
+    encoding = (encoding or "").strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:  # some servers send raw deflate without the zlib header
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    return raw
+
+
+class HttpClient(object):
+    def __init__(self, user_agent="Kodi", timeout=20, retries=2, backoff=0.5, max_backoff=8.0):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._conns = {}
+        self._ssl = None
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "connections": 0,
+            "reused": 0,
+            "wire_bytes": 0,
+            "body_bytes": 0,
+            "latencies": [],
+        }
+
+    # ---- connections -------------------------------------------------
+
+    def _connection(self, scheme, netloc):
+        key = (scheme, netloc)
+        conn = self._conns.get(key)
+        if conn is not None:
+            return conn, True
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        self._conns[key] = conn
+        self.stats["connections"] += 1
+        return conn, False
+
+    def _drop(self, scheme, netloc):
+        conn = self._conns.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def close(self):
+        for conn in self._conns.values():
+            conn.close()
+        self._conns.clear()
+
+    # ---- requests ----------------------------------------------------
+
+    def _once(self, method, url, headers):
+        """One request/response on a pooled connection."""
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        send_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        send_headers.update(headers or {})
+
+        while True:
+            conn, reused = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request(method, target, headers=send_headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._drop(parts.scheme, parts.netloc)
+                if not reused:
+                    raise
+                # Server closed an idle keep-alive connection; reopen once.
+            except Exception:
+                self._drop(parts.scheme, parts.netloc)
+                raise
+
+        if resp.will_close:
+            self._drop(parts.scheme, parts.netloc)
+        if reused:
+            self.stats["reused"] += 1
+        return resp, raw
+
+    def request(self, method, url, headers=None):
+        """
+        Returns a Response for any status (including 304 and 4xx). Raises
+        only after the retry budget is spent on connection errors.
+        """
+        started = time.time()
+        attempt = 0
+        redirects = 0
+        while True:
+            try:
+                resp, raw = self._once(method, url, headers)
+            except (OSError, http.client.HTTPException):
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                self.stats["retries"] += 1
+                self._sleep(attempt)
+                continue
+
+            if resp.status in (301, 302, 303, 307, 308) and redirects < MAX_REDIRECTS:
+                location = resp.getheader("Location")
+                if location:
+                    url = urllib.parse.urljoin(url, location)
+                    redirects += 1
+                    continue
+
+            if resp.status in RETRY_STATUSES and attempt < self.retries:
+                attempt += 1
+                self.stats["retries"] += 1
+                self._sleep(attempt, resp.getheader("Retry-After"))
+                continue
+            break
+
+        body = decode_body(raw, resp.getheader("Content-Encoding"))
+        elapsed = time.time() - started
+        self.stats["requests"] += 1
+        self.stats["wire_bytes"] += len(raw)
+        self.stats["body_bytes"] += len(body)
+        self.stats["latencies"].append(elapsed)
+        return Response(url, resp.status, resp.msg, body, len(raw), elapsed)
+
+    def _sleep(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        try:
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+        time.sleep(delay)
+
+    def get(self, url, headers=None):
+        """GET that raises HttpError for any 4xx/5xx."""
+        resp = self.request("GET", url, headers)
+        if resp.status >= 400:
+            raise HttpError(url, resp.status, resp)
+        return resp
+
+    def get_json(self, url, headers=None):
+        return self.get(url, headers).json()
+
+    def summary(self):
+        s = self.stats
+        lat = sorted(s["latencies"])
+        if lat:
+            avg = sum(lat) / len(lat) * 1000
+            p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))] * 1000
+        else:
+            avg = p95 = 0
+        return (f"HTTP {s['requests']} req ({s['reused']} reused, {s['connections']} conn, "
+                f"{s['retries']} retries) {s['wire_bytes']} B wire / {s['body_bytes']} B body, "
+                f"avg {avg:.0f} ms p95 {p95:.0f} ms")
+
+
+_DEFAULT = {}
+
+
+def default_client(user_agent="Kodi"):
+    """Process-wide client per user agent, so connections get shared."""
+    client = _DEFAULT.get(user_agent)
+    if client is None:
+        client = _DEFAULT[user_agent] = HttpClient(user_agent=user_agent)
+    return client
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+One index of every video the project already knows about.
+
+canonical_key() reduces a URL to what identifies it: "yt:<video id>"
+for any spelling of a YouTube video (jac.youtube.canonical_video_id),
+"ytlist:<playlist id>" for a bare playlist link, and a normalized URL
+(lowercase scheme/host, no fragment or trailing slash) for anything
+else.
+
+VideoIndex maps those keys to every place they occur. build_index()
+fills it in one pass per file over the catalog files (episodes.json,
+episodes_MASTER_22.json, episodes_mobile.json) and the review history
+under data/ (approved and rejected videos), so "have we got this
+already?" is a single dict lookup for the scrapers, and duplicates()
+lists the videos that appear in more than one place.
+
+A location is a dict:
+  {"source": file, "path": "0/2/1", "track": index | "encore", "title": ...}
+for catalog entries (path in default.py's folder/item numbering), and
+  {"source": file, "index": position, "title": ...}
+for history entries.
+"""
+
+import json
+import os
+import urllib.parse
+
+from jac.youtube import canonical_video_id, playlist_id_from_url
+
+CATALOG_FILES = ("episodes.json", "episodes_MASTER_22.json", "episodes_mobile.json")
+HISTORY_FILES = ("data/approved-history.json", "data/rejected-history.json")
+
+
+def canonical_key(url):
+    if not url:
+        return None
+    vid = canonical_video_id(url)
+    if vid:
+        return "yt:" + vid
+    if "youtube.com/playlist" in url:
+        pid = playlist_id_from_url(url)
+        if pid:
+            return "ytlist:" + pid
+    parts = urllib.parse.urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def iter_tree_urls(tree):
+    """(path, track index or "encore", title, url) for every URL in a catalog tree."""
+    stack = [("", tree if isinstance(tree, list) else [])]
+    while stack:
+        prefix, items = stack.pop()
+        for i, node in enumerate(items):
+            if not isinstance(node, dict):
+                continue
+            path = f"{prefix}/{i}" if prefix else str(i)
+            if str(node.get("mode", "")).lower() == "folder":
+                stack.append((path, node.get("items", []) or []))
+                continue
+            title = node.get("title")
+            for j, t in enumerate(node.get("tracks", []) or []):
+                if isinstance(t, dict) and t.get("url"):
+                    yield path, j, t.get("title") or title, t["url"]
+            encore = node.get("encore")
+            if isinstance(encore, dict) and encore.get("url"):
+                yield path, "encore", encore.get("title") or title, encore["url"]
+
+
+class VideoIndex(object):
+    def __init__(self):
+        self.locations = {}
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __contains__(self, url):
+        return canonical_key(url) in self.locations
+
+    def get(self, url):
+        return self.locations.get(canonical_key(url), [])
+
+    def add(self, url, location):
+        key = canonical_key(url)
+        if key:
+            self.locations.setdefault(key, []).append(location)
+        return key
+
+    def add_tree(self, source, tree):
+        for path, track, title, url in iter_tree_urls(tree):
+            self.add(url, {"source": source, "path": path, "track": track, "title": title})
+
+    def add_history(self, source, entries):
+        for i, entry in enumerate(entries if isinstance(entries, list) else []):
+            if not isinstance(entry, dict):
+                continue
+            url = entry.get("url")
+            if not url and entry.get("videoId"):
+                url = f"https://youtu.be/{entry['videoId']}"
+            self.add(url, {"source": source, "index": i, "title": entry.get("title")})
+
+    def duplicates(self, sources=None, cross_file=False):
+        """
+        {key: locations} for keys found at more than one catalog node.
+        Only catalog entries (those with a "path") count; `sources`
+        limits which files are looked at. Copies of the same video in
+        two different files are only reported with cross_file=True
+        (episodes_MASTER_22.json is an older copy of episodes.json).
+        """
+        out = {}
+        for key, locations in self.locations.items():
+            found = [loc for loc in locations
+                     if "path" in loc and (sources is None or loc["source"] in sources)]
+            by_file = {}
+            for loc in found:
+                by_file.setdefault(loc["source"], set()).add(loc["path"])
+            if cross_file:
+                dup = len({(src, p) for src, paths in by_file.items() for p in paths}) > 1
+            else:
+                dup = any(len(paths) > 1 for paths in by_file.values())
+            if dup:
+                out[key] = found
+        return out
+
+
+def _load(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_index(root=".", catalog_files=CATALOG_FILES, history_files=HISTORY_FILES, trees=None):
+    """
+    VideoIndex over the given files (relative to `root`; missing ones
+    are skipped). `trees` ({file: already-loaded tree}) is used instead
+    of reading those files, e.g. for an episodes.json being edited.
+    """
+    trees = trees or {}
+    index = VideoIndex()
+    for name in catalog_files:
+        tree = trees[name] if name in trees else _load(os.path.join(root, name))
+        if tree is not None:
+            index.add_tree(name, tree)
+    for name in history_files:
+        entries = _load(os.path.join(root, name))
+        if entries is not None:
+            index.add_history(name, entries)
+    return index
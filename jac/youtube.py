@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+YouTube URL parsing and queue expansion shared by default.py and the
+background service.
+
+The patterns are compiled once at import; yt_id_from_url() tries them
+in the same order as always (youtu.be/, then ?v=/&v=, then /embed/).
+
+iter_track_video_ids() yields a queue's video IDs lazily, with the
+encore slotted in after the encoreAfterTrackIndex-th playable track
+(clamped to the start/end of the queue), so a caller that only needs
+the first few never parses the rest.
+
+pack_video_ids()/unpack_video_ids() carry a queue's IDs in a plugin
+URL: "."-separated, a character no video ID contains and that URLs
+don't escape.
+
+canonical_video_id() is the strict form for deduplication: it only
+accepts real YouTube hosts and knows every URL shape a video turns up
+in (youtu.be/, watch?v=, /embed/, /shorts/, /live/, /v/), so the same
+video spelled two ways compares equal.
+"""
+
+import re
+import urllib.parse
+
+_VIDEO_RES = (
+    re.compile(r"youtu\.be/([A-Za-z0-9_\-]+)"),
+    re.compile(r"[?&]v=([A-Za-z0-9_\-]+)"),
+    re.compile(r"/embed/([A-Za-z0-9_\-]+)"),
+)
+_PLAYLIST_RE = re.compile(r"[?&]list=([A-Za-z0-9_\-]+)")
+
+_ID_RE = re.compile(r"[A-Za-z0-9_\-]{6,}")
+_ID_CHARS_RE = re.compile(r"[A-Za-z0-9_\-]+")
+_PATH_ID_RE = re.compile(r"/(?:embed|shorts|live|v)/([A-Za-z0-9_\-]+)")
+_SHORT_HOSTS = ("youtu.be", "www.youtu.be")
+_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+          "youtube-nocookie.com", "www.youtube-nocookie.com")
+
+
+def yt_id_from_url(url):
+    if not url:
+        return None
+    for regex in _VIDEO_RES:
+        m = regex.search(url)
+        if m:
+            return m.group(1)
+    return None
+
+
+def canonical_video_id(url):
+    """Video ID of a YouTube video URL in any of its spellings, else None."""
+    if not url:
+        return None
+    url = url.strip()
+    if "//" not in url:
+        url = "https://" + url
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host in _SHORT_HOSTS:
+        candidate = parts.path.strip("/").split("/")[0]
+    elif host in _HOSTS:
+        candidate = (urllib.parse.parse_qs(parts.query).get("v") or [""])[0]
+        if not candidate:
+            m = _PATH_ID_RE.match(parts.path)
+            candidate = m.group(1) if m else ""
+    else:
+        return None
+    return candidate if _ID_RE.fullmatch(candidate) else None
+
+
+def playlist_id_from_url(url):
+    if not url:
+        return None
+    m = _PLAYLIST_RE.search(url)
+    return m.group(1) if m else None
+
+
+def youtube_play_video(video_id):
+    return f"plugin://plugin.video.youtube/play/?video_id={video_id}"
+
+
+def has_encore(ep):
+    try:
+        mode = str(ep.get("mode", "")).lower()
+        encore = ep.get("encore") or {}
+        encore_url = encore.get("url")
+        after_idx = ep.get("encoreAfterTrackIndex")
+        return (mode == "queue" and encore_url and isinstance(after_idx, int))
+    except Exception:
+        return False
+
+
+def iter_track_video_ids(ep):
+    encore_id = None
+    if has_encore(ep):
+        encore_id = yt_id_from_url((ep.get("encore") or {}).get("url"))
+        insert_at = max(0, ep.get("encoreAfterTrackIndex") + 1)
+
+    count = 0
+    for t in ep.get("tracks", []) or []:
+        if encore_id and count == insert_at:
+            yield encore_id
+            encore_id = None
+        vid = yt_id_from_url((t or {}).get("url", ""))
+        if vid:
+            yield vid
+            count += 1
+    if encore_id:
+        yield encore_id
+
+
+def get_track_video_ids(ep):
+    return list(iter_track_video_ids(ep))
+
+
+def pack_video_ids(ids):
+    return ".".join(ids)
+
+
+def unpack_video_ids(text):
+    """IDs from pack_video_ids(); anything that isn't made of ID characters is dropped."""
+    return [vid for vid in (text or "").split(".") if _ID_CHARS_RE.fullmatch(vid)]
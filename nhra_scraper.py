@@ -18,19 +18,90 @@ free full broadcasts that do appear (selected Division-level races)
 show up as regular uploads, not in any special "full broadcast"
 playlist. This script just watches for them and grabs anything that
 looks like the real thing the moment it's posted.
+
+Every run records its phase timings (fetch, parse, classify, load,
+merge, save) and counters (feed size, entries parsed, include/exclude
+hits, duplicates skipped, tracks added/evicted by the MAX_TRACKS cap)
+with jac.metrics, even when it stops early: data/metrics/nhra_scraper.prom
+(Prometheus text format) holds the last run, nhra_scraper.jsonl the
+history. data/metrics/ is git-ignored; the scheduled workflow writes to
+the runner's temp directory and uploads the files as a build artifact.
+
+--daemon keeps the scraper running instead of exiting after one pass
+(for a host of its own rather than the scheduled workflow):
+
+  - the feed is fetched with If-None-Match / If-Modified-Since, so an
+    unchanged feed costs a 304 and no parsing
+  - the interval between polls adapts: it drops to the minimum when new
+    uploads show up and doubles after every poll that finds nothing
+    (or fails), between POLL_RACE_MIN..POLL_RACE_MAX inside the race
+    weekend window (Fri 12:00 to Mon 04:00 UTC) and POLL_MIN..POLL_MAX
+    outside it. Once a few changes have been seen, the upper bound is
+    also kept to half the typical gap between them, and a quiet
+    stretch never sleeps past the start of the next race weekend.
+  - validators, seen IDs, the current interval, the next poll time and
+    recent change times live in data/nhra-feed-state.json, so a restart
+    picks up where it left off. New validators are only stored once the
+    body they came with has been processed, so a failed pass gets the
+    same body again rather than a 304
+  - a poll that fails for any reason (a locked or unreadable
+    episodes.json, a missing section, ...) is logged and recorded as
+    "crashed" (or its own outcome) in the metrics, and counts as a poll
+    that found nothing: the daemon backs off and keeps going
+  - --on-change CMD runs a shell command after episodes.json gained
+    tracks (e.g. the build_shards / build_sqlite / build_deltas steps
+    the workflow runs)
+
+SIGTERM or Ctrl-C stops it between polls.
+
+Usage:
+  python nhra_scraper.py [--metrics-dir DIR]
+  python nhra_scraper.py --daemon [--on-change CMD] [--metrics-dir DIR]
 """
 
+import argparse
+import io
 import json
-import re
+import os
+import signal
+import statistics
+import subprocess
 import sys
-import urllib.request
+import threading
+import time
+import traceback
 import xml.etree.ElementTree as ET
 
+from jac.classifier import TitleClassifier
+from jac.metrics import RunMetrics
+from jac.store import CatalogStore
+from jac.transport import HttpClient, HttpError
+from jac.videoindex import build_index, canonical_key
+
 NHRA_CHANNEL_ID = "UCJcErqlzaBzFmAh2uIxeqxQ"
 RSS_URL = f"https://www.youtube.com/feeds/videos.xml?channel_id={NHRA_CHANNEL_ID}"
 
 EPISODES_JSON_PATH = "episodes.json"
+# High-water mark: video IDs already processed, newest first
+FEED_STATE_PATH = "data/nhra-feed-state.json"
+SEEN_KEEP = 50
 DRAG_RACING_TITLE = "🚗 Drag Racing"
+MAX_TRACKS = 30
+# <job>.prom (last run) and <job>.jsonl (history) go here
+METRICS_DIR = "data/metrics"
+METRICS_JOB = "nhra_scraper"
+
+# --daemon polling intervals (seconds)
+POLL_RACE_MIN = 5 * 60
+POLL_RACE_MAX = 30 * 60
+POLL_MIN = 30 * 60
+POLL_MAX = 6 * 3600
+POLL_BACKOFF = 2
+# Race weekend window in minutes since Monday 00:00 UTC: Fri 12:00 -> Mon 04:00
+RACE_WINDOW_START = 4 * 1440 + 12 * 60
+RACE_WINDOW_END = 4 * 60
+WEEK_MINUTES = 7 * 1440
+CHANGES_KEEP = 20
 
 INCLUDE_KEYWORDS = [
     "full broadcast", "full race", "full event", "full session",
@@ -42,6 +113,12 @@ EXCLUDE_KEYWORDS = [
     "best of", "top 5", "top5", "moments",
 ]
 
+CLASSIFIER = TitleClassifier(include=INCLUDE_KEYWORDS, exclude=EXCLUDE_KEYWORDS)
+
+
+class SectionMissing(Exception):
+    pass
+
 # Atom feed namespaces YouTube uses
 NS = {
     "atom": "http://www.w3.org/2005/Atom",
@@ -50,64 +127,113 @@ NS = {
 }
 
 
-def fetch_feed():
-    req = urllib.request.Request(RSS_URL, headers={"User-Agent": "Mozilla/5.0"})
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        return resp.read()
+def fetch_feed(client=None):
+    client = client or HttpClient(user_agent="Mozilla/5.0")
+    return client.get(RSS_URL).body
 
 
-def parse_entries(xml_bytes):
-    root = ET.fromstring(xml_bytes)
-    entries = []
-    for entry in root.findall("atom:entry", NS):
-        title_el = entry.find("atom:title", NS)
-        link_el = entry.find("atom:link", NS)
-        video_id_el = entry.find("yt:videoId", NS)
-        published_el = entry.find("atom:published", NS)
-
-        if title_el is None or video_id_el is None:
+_ENTRY_TAG = "{%s}entry" % NS["atom"]
+
+
+def iter_entries(source, stop_at=()):
+    """
+    Streams entries out of an Atom feed (bytes or a file object) as each
+    <entry> closes, clearing parsed elements so memory stays flat.
+
+    The feed is newest-first, so parsing stops at the first entry whose
+    video ID is in `stop_at` (everything after it was seen on an earlier
+    run). Yields {"title", "url", "published", "video_id"}.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    root = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or elem.tag != _ENTRY_TAG:
             continue
 
-        title = (title_el.text or "").strip()
-        video_id = (video_id_el.text or "").strip()
+        title_el = elem.find("atom:title", NS)
+        link_el = elem.find("atom:link", NS)
+        video_id_el = elem.find("yt:videoId", NS)
+        published_el = elem.find("atom:published", NS)
+
+        title = (title_el.text or "").strip() if title_el is not None else ""
+        video_id = (video_id_el.text or "").strip() if video_id_el is not None else ""
         url = f"https://youtu.be/{video_id}" if video_id else (
             link_el.get("href") if link_el is not None else None
         )
         published = published_el.text if published_el is not None else ""
+        has_video_id = video_id_el is not None
+
+        # Done with this entry: drop it (and any earlier siblings) from the tree.
+        root.clear()
 
-        if not title or not url:
+        if video_id and video_id in stop_at:
+            return
+        if not has_video_id or not title or not url:
             continue
 
-        entries.append({"title": title, "url": url, "published": published})
-    return entries
+        yield {"title": title, "url": url, "published": published, "video_id": video_id}
+
+
+def parse_entries(xml_bytes):
+    return list(iter_entries(xml_bytes))
+
+
+def load_feed_state(path=FEED_STATE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"seen": []}
+
+
+def save_feed_state(state, new_ids, path=FEED_STATE_PATH):
+    """Records `new_ids` (newest first) as processed, keeping SEEN_KEEP."""
+    fresh = set(new_ids)
+    seen = list(new_ids) + [v for v in state.get("seen", []) if v not in fresh]
+    state["seen"] = seen[:SEEN_KEEP]
+    write_json_atomic(path, state)
+
+
+def write_json_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
 
 
 def looks_like_full_broadcast(title):
-    lower = title.lower()
-    if any(bad in lower for bad in EXCLUDE_KEYWORDS):
-        return False
-    return any(good in lower for good in INCLUDE_KEYWORDS)
+    return CLASSIFIER.accepts(title)
+
+
+def episodes_store():
+    return CatalogStore(EPISODES_JSON_PATH)
 
 
 def load_episodes():
-    with open(EPISODES_JSON_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return episodes_store().load()
 
 
 def save_episodes(data):
-    with open(EPISODES_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    episodes_store().save(data)
 
 
-def find_drag_racing_section(data):
+def find_section(data, title):
     for section in data:
-        if section.get("title") == DRAG_RACING_TITLE:
+        if section.get("title") == title:
             return section
     return None
 
 
-def ensure_queue_mode(section):
+def find_drag_racing_section(data):
+    return find_section(data, DRAG_RACING_TITLE)
+
+
+def ensure_queue_mode(section, thumb="./images/nhra-4-logo-svg-vector.svg"):
     """
     The Drag Racing section originally pointed at a single generic
     playlist URL (mode: "playlist"). To let the scraper append
@@ -121,8 +247,8 @@ def ensure_queue_mode(section):
         return
 
     section["mode"] = "queue"
-    if "thumb" not in section:
-        section["thumb"] = "./images/nhra-4-logo-svg-vector.svg"
+    if thumb and "thumb" not in section:
+        section["thumb"] = thumb
 
     existing_tracks = section.get("tracks", [])
     # Drop the old generic playlist link if present — it's not a
@@ -133,50 +259,266 @@ def ensure_queue_mode(section):
     ]
 
 
-def main():
-    try:
-        xml_bytes = fetch_feed()
-    except Exception as e:
-        print(f"Failed to fetch NHRA RSS feed: {e}", file=sys.stderr)
-        sys.exit(0)  # don't fail the whole workflow over a transient fetch error
-
-    entries = parse_entries(xml_bytes)
-    candidates = [e for e in entries if looks_like_full_broadcast(e["title"])]
-
-    if not candidates:
-        print("No full-broadcast-style videos found in the latest feed. Nothing to do.")
-        return
-
-    data = load_episodes()
-    section = find_drag_racing_section(data)
-    if section is None:
-        print("Could not find the Drag Racing section in episodes.json — aborting.", file=sys.stderr)
-        sys.exit(1)
-
-    ensure_queue_mode(section)
+def add_candidates(section, candidates, max_tracks=MAX_TRACKS, index=None):
+    """
+    Prepends any candidates not already in the section's queue and trims
+    it to the newest `max_tracks`. Returns the titles that were added.
 
-    existing_urls = {t.get("url") for t in section.get("tracks", [])}
+    URLs are compared by canonical_key(), so youtu.be/X and watch?v=X
+    are the same video. With `index` (jac.videoindex.VideoIndex) a video
+    listed anywhere else in the catalog files or the review history is
+    skipped too, and what gets added is recorded in it.
+    """
+    existing = {canonical_key(t.get("url")) for t in section.get("tracks", [])}
     added = []
 
     for c in candidates:
-        if c["url"] in existing_urls:
+        key = canonical_key(c["url"])
+        if key in existing or (index is not None and c["url"] in index):
             continue
         section["tracks"].insert(0, {"title": c["title"], "url": c["url"]})
-        existing_urls.add(c["url"])
+        existing.add(key)
+        if index is not None:
+            index.add(c["url"], {"source": EPISODES_JSON_PATH, "section": section.get("title"), "title": c["title"]})
         added.append(c["title"])
 
-    # Keep this from growing forever — cap at the 30 most recent finds.
-    section["tracks"] = section["tracks"][:30]
+    # Keep this from growing forever — cap at the most recent finds.
+    section["tracks"] = section["tracks"][:max_tracks]
+    return added
+
+
+def fetch_feed_conditional(client, state):
+    """
+    (body, validators): body is None when the validators in `state` say
+    the feed hasn't changed. The caller stores the new validators in
+    `state` once the body has been processed.
+    """
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("lastModified"):
+        headers["If-Modified-Since"] = state["lastModified"]
+    resp = client.request("GET", RSS_URL, headers)
+    if resp.status == 304:
+        return None, {}
+    if resp.status >= 400:
+        raise HttpError(RSS_URL, resp.status, resp)
+    return resp.body, {"etag": resp.headers.get("ETag"), "lastModified": resp.headers.get("Last-Modified")}
+
+
+def process_feed(metrics, xml_bytes, state):
+    """Everything after the fetch. Returns the new entries (empty if the feed had none)."""
+    metrics.set(feed_bytes=len(xml_bytes))
+    with metrics.phase("parse"):
+        entries = list(iter_entries(xml_bytes, stop_at=set(state.get("seen", []))))
+    new_ids = [e["video_id"] for e in entries]
+    metrics.set(entries_parsed=len(entries))
+    if not entries:
+        print("No new uploads since the last run. Nothing to do.")
+        metrics.finish("no_new_uploads")
+        return entries
+
+    with metrics.phase("classify"):
+        classified = [(e, CLASSIFIER.classify(e["title"])) for e in entries]
+        candidates = [e for e, c in classified if c.accepted]
+    metrics.set(include_hits=sum(1 for _, c in classified if "include" in c.hits),
+                exclude_hits=sum(1 for _, c in classified if "exclude" in c.hits),
+                candidates=len(candidates))
+
+    if not candidates:
+        print(f"{len(entries)} new upload(s), none look like full broadcasts. Nothing to do.")
+        save_feed_state(state, new_ids)
+        metrics.finish("no_candidates")
+        return entries
+
+    # Locked read-modify-write; episodes.json is only rewritten if it changed.
+    started = metrics.clock()
+    with episodes_store().edit() as data:
+        metrics.record("load", metrics.clock() - started)
+        with metrics.phase("merge"):
+            section = find_drag_racing_section(data)
+            if section is None:
+                metrics.finish("section_missing", ok=False)
+                raise SectionMissing(f"Could not find the {DRAG_RACING_TITLE!r} section in {EPISODES_JSON_PATH}")
+
+            ensure_queue_mode(section)
+            # Everything already listed anywhere (this file as it is right now,
+            # the other catalog files, approved/rejected history).
+            index = build_index(trees={EPISODES_JSON_PATH: data})
+            before = len(section.get("tracks", []))
+            added = add_candidates(section, candidates, index=index)
+            metrics.set(tracks_added=len(added),
+                        duplicates_skipped=len(candidates) - len(added),
+                        tracks_evicted=before + len(added) - len(section["tracks"]),
+                        queue_length=len(section["tracks"]))
+        started = metrics.clock()
+    metrics.record("save", metrics.clock() - started)
 
     if added:
-        save_episodes(data)
         print(f"Added {len(added)} new full broadcast(s):")
         for t in added:
             print(f"  - {t}")
+        metrics.finish("added")
     else:
-        print("Found full-broadcast-style titles, but all were already in episodes.json.")
+        print("Found full-broadcast-style titles, but all were already in the catalog.")
+        metrics.finish("all_duplicates")
+    save_feed_state(state, new_ids)
+    return entries
+
+
+def run(metrics):
+    client = HttpClient(user_agent="Mozilla/5.0")
+    try:
+        with metrics.phase("fetch"):
+            xml_bytes = fetch_feed(client)
+    except Exception as e:
+        print(f"Failed to fetch NHRA RSS feed: {e}", file=sys.stderr)
+        metrics.finish("fetch_failed", ok=False)
+        sys.exit(0)  # don't fail the whole workflow over a transient fetch error
+    finally:
+        metrics.set(fetch_retries=client.stats["retries"], feed_wire_bytes=client.stats["wire_bytes"])
+    try:
+        process_feed(metrics, xml_bytes, load_feed_state())
+    except SectionMissing as e:
+        print(f"{e} — aborting.", file=sys.stderr)
+        sys.exit(1)
+
+
+# ---- --daemon ----------------------------------------------------------
+
+def _week_minute(now):
+    t = time.gmtime(now)
+    return t.tm_wday * 1440 + t.tm_hour * 60 + t.tm_min
+
+
+def in_race_window(now):
+    minute = _week_minute(now)
+    return minute >= RACE_WINDOW_START or minute < RACE_WINDOW_END
+
+
+def next_race_window(now):
+    """Unix time the next race weekend window opens (now, if already inside)."""
+    if in_race_window(now):
+        return now
+    minutes = (RACE_WINDOW_START - _week_minute(now)) % WEEK_MINUTES
+    return now - now % 60 + minutes * 60
+
+
+def typical_change_gap(changes):
+    """Median seconds between the recorded change times; None with fewer than 3."""
+    if len(changes) < 3:
+        return None
+    ordered = sorted(changes)
+    return statistics.median(b - a for a, b in zip(ordered, ordered[1:]))
+
+
+def schedule_next_poll(state, changed, now):
+    """Sets state["interval"] and state["nextPoll"] after a poll."""
+    if changed:
+        state["changes"] = (state.get("changes", []) + [round(now)])[-CHANGES_KEEP:]
+    racing = in_race_window(now)
+    low, high = (POLL_RACE_MIN, POLL_RACE_MAX) if racing else (POLL_MIN, POLL_MAX)
+    gap = typical_change_gap(state.get("changes", []))
+    if gap:
+        high = max(low, min(high, gap / 2))
+
+    interval = low if changed else state.get("interval", low) * POLL_BACKOFF
+    interval = min(high, max(low, interval))
+    next_poll = now + interval
+    if not racing:
+        next_poll = min(next_poll, next_race_window(now))
+    state["interval"] = round(interval)
+    state["nextPoll"] = round(next_poll)
+    return next_poll
+
+
+def poll(metrics, client, state):
+    """One daemon pass. Returns True when the feed had new entries."""
+    try:
+        with metrics.phase("fetch"):
+            xml_bytes, validators = fetch_feed_conditional(client, state)
+    except Exception as e:
+        print(f"Failed to fetch NHRA RSS feed: {e}", file=sys.stderr)
+        metrics.finish("fetch_failed", ok=False)
+        return False
+    finally:
+        metrics.set(fetch_retries=client.stats["retries"], feed_wire_bytes=client.stats["wire_bytes"])
+    if xml_bytes is None:
+        metrics.finish("not_modified")
+        return False
+    entries = process_feed(metrics, xml_bytes, state)
+    state.update(validators)
+    return bool(entries)
+
+
+def daemon(metrics_dir=METRICS_DIR, on_change=None):
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    client = HttpClient(user_agent="Mozilla/5.0")
+    print(f"Daemon: watching {RSS_URL}")
+    while not stop.is_set():
+        state = load_feed_state()
+        wait = state.get("nextPoll", 0) - time.time()
+        if wait > 0:
+            print(f"Daemon: next poll in {wait / 60:.0f} min")
+            stop.wait(wait)
+            continue
+
+        metrics = RunMetrics(METRICS_JOB)
+        changed = False
+        try:
+            changed = poll(metrics, client, state)
+        except Exception as e:
+            print(f"Daemon: poll failed: {e}", file=sys.stderr)
+            traceback.print_exc()
+            metrics.finish("crashed", ok=False)
+            # Whatever the failed pass half-updated is dropped; the
+            # schedule below backs off as for a poll that found nothing.
+            state = load_feed_state()
+        finally:
+            metrics.finish("crashed", ok=False)  # no-op unless poll() ended without an outcome
+            write_metrics(metrics, metrics_dir)
+        schedule_next_poll(state, changed, time.time())
+        write_json_atomic(FEED_STATE_PATH, state)
+
+        if on_change and metrics.counters.get("tracks_added"):
+            print(f"Daemon: running {on_change}")
+            result = subprocess.run(on_change, shell=True)
+            if result.returncode:
+                print(f"Daemon: --on-change exited {result.returncode}", file=sys.stderr)
+    print("Daemon: stopped")
+
+
+def write_metrics(metrics, directory=METRICS_DIR):
+    try:
+        metrics.write_prometheus(os.path.join(directory, METRICS_JOB + ".prom"))
+        metrics.append_jsonl(os.path.join(directory, METRICS_JOB + ".jsonl"))
+    except OSError as e:
+        print(f"Could not write run metrics: {e}", file=sys.stderr)
+
+
+def main(argv=()):
+    parser = argparse.ArgumentParser(description="Add new NHRA full broadcasts to episodes.json.")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, metavar="DIR",
+                        help=f"where the run metrics go (default {METRICS_DIR})")
+    parser.add_argument("--daemon", action="store_true", help="keep polling instead of exiting after one pass")
+    parser.add_argument("--on-change", metavar="CMD", help="with --daemon: shell command to run after tracks are added")
+    args = parser.parse_args(list(argv))
+    if args.on_change and not args.daemon:
+        parser.error("--on-change needs --daemon")
+    if args.daemon:
+        daemon(args.metrics_dir, args.on_change)
+        return
+
+    metrics = RunMetrics(METRICS_JOB)
+    try:
+        run(metrics)
+    finally:
+        metrics.finish("crashed", ok=False)  # no-op unless run() ended without an outcome
+        write_metrics(metrics, args.metrics_dir)
 
 
 if __name__ == "__main__":
-    main()
-  
+    main(sys.argv[1:])
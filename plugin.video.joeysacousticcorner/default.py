@@ -1,27 +1,83 @@
 # -*- coding: utf-8 -*-
+import os
 import sys
-import json
-import urllib.request
 import urllib.parse
 
 import xbmc
+import xbmcaddon
 import xbmcgui
 import xbmcplugin
+import xbmcvfs
+
+# Shared helpers live in jac/ (vendored next to this file by
+# scripts/package_addon.py, or one level up in the repo checkout).
+_HERE = os.path.dirname(os.path.abspath(__file__))
+for _p in (_HERE, os.path.dirname(_HERE)):
+    if os.path.isdir(os.path.join(_p, "jac")):
+        if _p not in sys.path:
+            sys.path.insert(0, _p)
+        break
+
+from jac.cache import JsonCache
+from jac.catalog import Catalog
+from jac.delta import DeltaSync
+from jac.search import load_or_build
+from jac.sqlcatalog import SqliteCatalog, fetch_database
+from jac.trace import Tracer
 
 HANDLE = int(sys.argv[1])
 BASE_URL = sys.argv[0]
+ADDON = xbmcaddon.Addon()
+PROFILE_DIR = xbmcvfs.translatePath(ADDON.getAddonInfo("profile"))
 
 # ✅ YOUR LIVE SITE (Netlify)
 SITE = "https://mellifluous-tanuki-51d911.netlify.app"
 EP_URL = SITE + "/episodes.json"
+# Compiled catalog (scripts/build_sqlite.py): listings query just their page
+SQLITE_URL = SITE + "/catalog/sqlite"
+# Version + change sets for episodes.json (scripts/build_deltas.py)
+VERSION_URL = SITE + "/catalog/version.json"
+
+PAGE_SIZE = 200
+
+TRACE = Tracer(enabled=ADDON.getSetting("trace_enabled") == "true")
+CACHE = JsonCache(os.path.join(PROFILE_DIR, "cache"), ttl=900, user_agent="Kodi", tracer=TRACE)
 
 def build_url(query):
     return BASE_URL + "?" + urllib.parse.urlencode(query)
 
-def http_get_json(url):
-    req = urllib.request.Request(url, headers={"User-Agent": "Kodi"})
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+def end_dir():
+    with TRACE.span("endOfDirectory"):
+        xbmcplugin.endOfDirectory(HANDLE)
+
+def load_catalog():
+    """
+    Opens the published SQLite catalog (downloaded again only when its
+    content changed); failing that, brings the cached copy of
+    episodes.json up to date (through the published deltas when there
+    are any) and builds the indexed model once for this invocation.
+    Returns None on failure.
+    """
+    with TRACE.span("load") as span:
+        try:
+            catalog = fetch_database(CACHE, SQLITE_URL, os.path.join(PROFILE_DIR, "sqlite"))
+            span.set(source="sqlite")
+            return catalog
+        except Exception as e:
+            xbmc.log("JAC: SQLite catalog unavailable, using episodes.json: %s" % e, xbmc.LOGINFO)
+        try:
+            try:
+                data = DeltaSync(CACHE, VERSION_URL, EP_URL).get()
+            except Exception as e:
+                xbmc.log("JAC: Delta sync unavailable: %s" % e, xbmc.LOGINFO)
+                data = CACHE.get("episodes", EP_URL)
+        except Exception as e:
+            xbmc.log("JAC: Failed loading episodes.json: %s" % e, xbmc.LOGERROR)
+            return None
+        with TRACE.span("index"):
+            catalog = Catalog(data if isinstance(data, list) else [])
+        span.set(items=len(catalog))
+        return catalog
 
 def yt_id_from_url(url):
     # supports youtu.be/ID and youtube.com/watch?v=ID
@@ -60,7 +116,7 @@ def list_root():
         ("Full Sessions", "fullshow"),
         ("Queues", "queue"),
         ("Playlists", "playlist"),
-        ("All Sessions", "all")
+        ("All Sessions", "all"),
     ]
     for label, mode in items:
         url = build_url({"action": "list", "mode": mode})
@@ -68,86 +124,122 @@ def list_root():
         li.setInfo("video", {"title": label})
         xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=True)
 
-    xbmcplugin.endOfDirectory(HANDLE)
-
-def list_mode(mode):
-    try:
-        data = http_get_json(EP_URL + "?cb=1")
-    except Exception as e:
-        xbmc.log("JAC: Failed loading episodes.json: %s" % e, xbmc.LOGERROR)
-        xbmcgui.Dialog().notification("Joey’s Acoustic Corner", "episodes.json failed to load", xbmcgui.NOTIFICATION_ERROR, 4000)
-        xbmcplugin.endOfDirectory(HANDLE)
-        return
-
-    eps = data if isinstance(data, list) else []
+    li = xbmcgui.ListItem(label="Search")
+    xbmcplugin.addDirectoryItem(HANDLE, build_url({"action": "search"}), li, isFolder=True)
 
-    if mode != "all":
-        eps = [e for e in eps if str(e.get("mode", "")).lower() == mode]
+    end_dir()
 
-    def key(e):
-        return (str(e.get("artist", "")).lower(),
-                str(e.get("year", "")),
-                str(e.get("title", "")).lower())
-    eps.sort(key=key)
-
-    for e in eps:
+def search_docs(catalog):
+    for key, e in catalog.episodes.items():
         title = e.get("title", "Untitled")
         artist = e.get("artist", "")
-        year = e.get("year", "")
         m = str(e.get("mode", "")).lower()
         tracks = e.get("tracks", []) or []
+        text = f"{artist} {title}"
 
-        label = f"{title}"
-        meta = {"title": title, "artist": artist, "year": year}
-
-        # Queue/playlist => folder to pick tracks
         if m in ["queue", "playlist"] and len(tracks) > 0:
-            url = build_url({"action": "tracks", "title": title})
-            li = xbmcgui.ListItem(label=label)
-            li.setInfo("video", meta)
-            xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=True)
-        else:
-            # fullshow => play first track
-            play_url = tracks[0].get("url") if len(tracks) else None
-            if not play_url:
-                continue
-            url = build_url({"action": "play", "u": play_url})
-            li = xbmcgui.ListItem(label=label)
-            li.setInfo("video", meta)
+            yield text, title, {"action": "tracks", "key": key}
+            for t in tracks:
+                if t.get("url"):
+                    yield f"{text} {t.get('title', '')}", f"{title} — {t.get('title', 'Track')}", {"action": "play", "u": t["url"]}
+        elif tracks and tracks[0].get("url"):
+            yield text, title, {"action": "play", "u": tracks[0]["url"]}
+
+def search(query):
+    if not query:
+        query = xbmcgui.Dialog().input("Search")
+    catalog = load_catalog() if query else None
+    if catalog is None:
+        end_dir()
+        return
+
+    # Own file name: both addons share the addon id, hence the profile dir.
+    if isinstance(catalog, SqliteCatalog):
+        version = "sqlite-" + catalog.version
+    else:
+        version = CACHE.version("episodes")
+    index = load_or_build(os.path.join(PROFILE_DIR, "search-index-modes.json"),
+                          version,
+                          lambda: search_docs(catalog))
+    for label, target in index.search(query):
+        is_folder = target["action"] == "tracks"
+        li = xbmcgui.ListItem(label=label)
+        if not is_folder:
             li.setProperty("IsPlayable", "true")
-            xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=False)
+        xbmcplugin.addDirectoryItem(HANDLE, build_url(target), li, isFolder=is_folder)
 
-    xbmcplugin.endOfDirectory(HANDLE)
+    end_dir()
 
-def list_tracks(title_match):
-    try:
-        data = http_get_json(EP_URL + "?cb=1")
-    except Exception as e:
-        xbmc.log("JAC: Failed loading episodes.json: %s" % e, xbmc.LOGERROR)
-        xbmcplugin.endOfDirectory(HANDLE)
+def list_mode(mode, page=0):
+    catalog = load_catalog()
+    if catalog is None:
+        xbmcgui.Dialog().notification("Joey’s Acoustic Corner", "episodes.json failed to load", xbmcgui.NOTIFICATION_ERROR, 4000)
+        end_dir()
+        return
+
+    with TRACE.span("render"):
+        keys, has_more = catalog.page(mode, page, PAGE_SIZE)
+        for key in keys:
+            e = catalog.get(key)
+            title = e.get("title", "Untitled")
+            artist = e.get("artist", "")
+            year = e.get("year", "")
+            m = str(e.get("mode", "")).lower()
+            tracks = e.get("tracks", []) or []
+
+            label = f"{title}"
+            meta = {"title": title, "artist": artist, "year": year}
+
+            # Queue/playlist => folder to pick tracks
+            if m in ["queue", "playlist"] and len(tracks) > 0:
+                url = build_url({"action": "tracks", "key": key})
+                li = xbmcgui.ListItem(label=label)
+                li.setInfo("video", meta)
+                xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=True)
+                TRACE.add("items")
+            else:
+                # fullshow => play first track
+                play_url = tracks[0].get("url") if len(tracks) else None
+                if not play_url:
+                    continue
+                url = build_url({"action": "play", "u": play_url})
+                li = xbmcgui.ListItem(label=label)
+                li.setInfo("video", meta)
+                li.setProperty("IsPlayable", "true")
+                xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=False)
+                TRACE.add("items")
+
+        if has_more:
+            url = build_url({"action": "list", "mode": mode, "page": page + 1})
+            xbmcplugin.addDirectoryItem(HANDLE, url, xbmcgui.ListItem(label="Next page »"), isFolder=True)
+
+    end_dir()
+
+def list_tracks(key, title_match=""):
+    catalog = load_catalog()
+    if catalog is None:
+        end_dir()
         return
 
-    eps = data if isinstance(data, list) else []
-    ep = None
-    for e in eps:
-        if e.get("title") == title_match:
-            ep = e
-            break
+    if not key and title_match:
+        key = catalog.find_by_title(title_match)
+    ep = catalog.get(key) if key else None
 
     if not ep:
-        xbmcplugin.endOfDirectory(HANDLE)
+        end_dir()
         return
 
     tracks = ep.get("tracks", []) or []
-    for t in tracks:
-        tname = t.get("title", "Track")
-        u = t.get("url", "")
-        li = xbmcgui.ListItem(label=tname)
-        li.setProperty("IsPlayable", "true")
-        url = build_url({"action": "play", "u": u})
-        xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=False)
+    with TRACE.span("render", items=len(tracks)):
+        for t in tracks:
+            tname = t.get("title", "Track")
+            u = t.get("url", "")
+            li = xbmcgui.ListItem(label=tname)
+            li.setProperty("IsPlayable", "true")
+            url = build_url({"action": "play", "u": u})
+            xbmcplugin.addDirectoryItem(HANDLE, url, li, isFolder=False)
 
-    xbmcplugin.endOfDirectory(HANDLE)
+    end_dir()
 
 def router():
     params = {}
@@ -155,16 +247,34 @@ def router():
         params = dict(urllib.parse.parse_qsl(sys.argv[2][1:]))
 
     action = params.get("action")
+    TRACE.set(action=action or "root")
     if not action:
         return list_root()
 
     if action == "list":
-        return list_mode(params.get("mode", "all"))
+        try:
+            page = int(params.get("page", 0))
+        except ValueError:
+            page = 0
+        return list_mode(params.get("mode", "all"), page)
     if action == "tracks":
-        return list_tracks(params.get("title", ""))
+        return list_tracks(params.get("key", ""), params.get("title", ""))
     if action == "play":
         return resolve_to_youtube(params.get("u", ""))
+    if action == "search":
+        return search(params.get("q", ""))
 
     return list_root()
 
-router()
+if __name__ == "__main__":
+    try:
+        with TRACE.span("router"):
+            router()
+    finally:
+        if TRACE.enabled:
+            xbmc.log("JAC: " + TRACE.summary(), xbmc.LOGINFO)
+            if ADDON.getSetting("trace_jsonl") == "true":
+                try:
+                    TRACE.append_jsonl(os.path.join(PROFILE_DIR, "trace-modes.jsonl"))
+                except OSError:
+                    pass
@@ -46,8 +46,39 @@ function loadJson(filePath, fallback = []) {
   }
 }
 
+// Temp file + fsync + rename: readers never see a half-written file.
 function saveJson(filePath, data) {
-  fs.writeFileSync(filePath, JSON.stringify(data, null, 2), "utf8");
+  const tmp = `${filePath}.${process.pid}.tmp`;
+  const fd  = fs.openSync(tmp, "w");
+  try {
+    fs.writeSync(fd, JSON.stringify(data, null, 2));
+    fs.fsyncSync(fd);
+  } finally {
+    fs.closeSync(fd);
+  }
+  fs.renameSync(tmp, filePath);
+}
+
+// Same advisory lock the Python writers use (jac/store.py): an exclusive
+// "<file>.lock" created with O_EXCL. Stale locks (>10 min) are broken.
+function lockFile(filePath, timeoutMs = 60000, staleMs = 600000) {
+  const lockPath = `${filePath}.lock`;
+  const deadline = Date.now() + timeoutMs;
+  const pause    = new Int32Array(new SharedArrayBuffer(4));
+  for (;;) {
+    try {
+      fs.writeFileSync(lockPath, JSON.stringify({ pid: process.pid, since: Date.now() / 1000 }), { flag: "wx" });
+      break;
+    } catch (e) {
+      if (e.code !== "EEXIST") throw e;
+      try {
+        if (Date.now() - fs.statSync(lockPath).mtimeMs > staleMs) fs.unlinkSync(lockPath);
+      } catch {}
+      if (Date.now() > deadline) throw new Error(`Timed out waiting for ${path.basename(lockPath)}`);
+      Atomics.wait(pause, 0, 0, 100);
+    }
+  }
+  process.on("exit", () => { try { fs.unlinkSync(lockPath); } catch {} });
 }
 
 // ── Read env vars ─────────────────────────────────────────────────────────────
@@ -69,6 +100,7 @@ if (!approvedIds.length && !rejectedIds.length) {
 }
 
 // ── Load all files ────────────────────────────────────────────────────────────
+lockFile(EPISODES_PATH);  // held until exit, across the read-modify-write
 const episodes        = loadJson(EPISODES_PATH, []);
 const candidates      = loadJson(CANDIDATES_PATH, []);
 const approvedHistory = loadJson(APPROVED_PATH, []);
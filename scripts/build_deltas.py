@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+build_deltas.py — bump catalog/version.json when episodes.json changed and
+write the change set from the previous version (see jac/delta.py).
+
+Usage:
+  python scripts/build_deltas.py [episodes.json] [catalog] [--old previous.json]
+
+The previous content is read from --old, or else from the last commit
+(`git show HEAD:episodes.json`), so in a workflow run it after the step
+that edits episodes.json and before committing. Running it twice on
+the same content changes nothing.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.delta import load_version, publish  # noqa: E402
+
+
+def committed_copy(path):
+    rel = os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, "/")
+    try:
+        raw = subprocess.run(["git", "show", f"HEAD:{rel}"], cwd=ROOT, check=True,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+        return json.loads(raw.decode("utf-8"))
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Bump catalog/version.json and write the change set.")
+    parser.add_argument("src", nargs="?", default=os.path.join(ROOT, "episodes.json"), metavar="episodes.json")
+    parser.add_argument("out_dir", nargs="?", default=os.path.join(ROOT, "catalog"), metavar="catalog")
+    parser.add_argument("--old", metavar="previous.json",
+                        help="the previous content (default: episodes.json as last committed)")
+    args = parser.parse_args(argv)
+    src, out_dir, old_path = args.src, args.out_dir, args.old
+
+    with open(src, "r", encoding="utf-8") as f:
+        tree = json.load(f)
+    if old_path:
+        with open(old_path, "r", encoding="utf-8") as f:
+            old_tree = json.load(f)
+    else:
+        old_tree = committed_copy(src)
+
+    before = load_version(out_dir)["version"]
+    info, entry = publish(tree, out_dir, old_tree, full_bytes=os.path.getsize(src))
+    if info["version"] == before:
+        print(f"Catalog v{before}: unchanged")
+    elif before == 0:
+        print(f"Catalog v{info['version']}: first published version")
+    elif entry is not None:
+        print(f"Catalog v{info['version']}: delta {entry['file']} ({entry['bytes']} bytes)")
+    else:
+        print(f"Catalog v{info['version']}: no delta from the previous version; clients fetch in full")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
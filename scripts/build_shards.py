@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+build_shards.py — split episodes.json into catalog/manifest.json plus one
+content-addressed shard per folder/queue (see jac/shards.py).
+
+Usage:
+  python scripts/build_shards.py [episodes.json] [catalog] [--prune]
+
+Run after anything that edits episodes.json (the scraper, the approval
+workflow) so the Kodi addon's lazy loader sees the change. --prune
+deletes the shards that neither the new manifest nor the one it
+replaced (catalog/manifest.previous.json) reaches; the workflows pass it.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.shards import write_shards  # noqa: E402
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Split episodes.json into a manifest plus folder/queue shards.")
+    parser.add_argument("src", nargs="?", default=os.path.join(ROOT, "episodes.json"), metavar="episodes.json")
+    parser.add_argument("out_dir", nargs="?", default=os.path.join(ROOT, "catalog"), metavar="catalog")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete the shards neither the new nor the previous manifest reaches")
+    args = parser.parse_args(argv)
+
+    with open(args.src, "r", encoding="utf-8") as f:
+        tree = json.load(f)
+
+    written, removed = write_shards(tree, args.out_dir, prune=args.prune)
+    print(f"Catalog shards: {written} written, {removed} pruned -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+build_sqlite.py — compile the catalog JSON files into SQLite databases
+under catalog/sqlite/ (see jac/sqlcatalog.py): "<name>-<version>.db",
+named by a hash of the source, plus a "<name>.json" pointer to it.
+
+Usage:
+  python scripts/build_sqlite.py [source.json ...] [--out catalog/sqlite]
+
+Defaults to episodes.json and episodes_mobile.json. Run it next to
+build_shards.py whenever those files change; an unchanged source keeps
+its database file, so there is nothing new to commit.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.sqlcatalog import write_database  # noqa: E402
+
+DEFAULT_SOURCES = ("episodes.json", "episodes_mobile.json")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compile the catalog JSON files into SQLite databases.")
+    parser.add_argument("sources", nargs="*", metavar="source.json",
+                        help="catalog files (default: %s)" % ", ".join(DEFAULT_SOURCES))
+    parser.add_argument("--out", default=os.path.join(ROOT, "catalog", "sqlite"), metavar="DIR",
+                        help="output directory (default catalog/sqlite)")
+    args = parser.parse_args(argv)
+    out_dir = args.out
+    sources = args.sources or [os.path.join(ROOT, name) for name in DEFAULT_SOURCES]
+
+    for src in sources:
+        with open(src, "r", encoding="utf-8") as f:
+            tree = json.load(f)
+        name = os.path.splitext(os.path.basename(src))[0]
+        pointer, built = write_database(tree, out_dir, name)
+        state = "built" if built else "unchanged"
+        print(f"SQLite catalog: {name} {pointer['version']} {state} ({pointer['bytes']} bytes) -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
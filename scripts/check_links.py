@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+check_links.py — ask YouTube's oEmbed endpoint about every video and
+playlist in the catalog files, and report the dead, blocked and
+malformed ones with where they are used (see jac/linkcheck.py).
+
+Usage:
+  python scripts/check_links.py [--endpoint URL] [--concurrency N] [--rate R]
+                                [--ttl HOURS] [--cache file.json] [--out report.json] [file.json ...]
+
+  --endpoint     oEmbed URL template with {url} (default: YouTube's)
+  --concurrency  requests in flight at once (default 4)
+  --rate         requests per second per host, 0 for no limit (default 5)
+  --ttl          hours a cached answer is trusted (default 168)
+  --cache        results cache (default data/link-health-cache.json)
+
+Named files replace the default list (episodes.json,
+episodes_MASTER_22.json, episodes_mobile.json). Exits 1 when a link is
+dead, restricted or invalid.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.linkcheck import (  # noqa: E402
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    DEFAULT_TTL,
+    OEMBED_URL,
+    HealthCache,
+    build_report,
+    check_links,
+    collect_links,
+)
+from jac.videoindex import CATALOG_FILES  # noqa: E402
+
+CACHE_PATH = os.path.join(ROOT, "data", "link-health-cache.json")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Check every video and playlist in the catalog files.")
+    parser.add_argument("files", nargs="*", metavar="file.json", help="catalog files (default: all of them)")
+    parser.add_argument("--endpoint", default=OEMBED_URL, help="oEmbed URL template with {url}")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, metavar="N")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, metavar="R",
+                        help="requests per second per host, 0 for no limit")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL / 3600, metavar="HOURS")
+    parser.add_argument("--cache", default=CACHE_PATH, metavar="file.json")
+    parser.add_argument("--out", metavar="report.json")
+    args = parser.parse_args(argv)
+    endpoint, concurrency, rate = args.endpoint, args.concurrency, args.rate
+    ttl = args.ttl * 3600
+    cache_path, out = args.cache, args.out
+    files = args.files or list(CATALOG_FILES)
+
+    trees = {}
+    for name in files:
+        try:
+            with open(os.path.join(ROOT, name), "r", encoding="utf-8") as f:
+                trees[name] = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  ! {name}: skipped ({e})", file=sys.stderr)
+
+    links = collect_links(trees)
+    cache = HealthCache(cache_path, ttl=ttl)
+    results, stats = check_links(links, endpoint, concurrency, rate, cache)
+    cache.save()
+
+    report = build_report(links, results, stats, endpoint)
+    counts = report["counts"]
+    print(f"{stats['links']} links in {len(trees)} file(s): {stats['checked']} checked in {stats['seconds']:.2f}s, "
+          f"{stats['cached']} from cache")
+    print("  " + ", ".join(f"{status} {n}" for status, n in counts.items()))
+    for p in report["problems"]:
+        where = "; ".join(f"{loc['source']} {loc['path']}" for loc in p["locations"])
+        print(f"  {p['status']:<10} {p['kind']} {p['id']} ({p['code']}) — {where}")
+
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    return 1 if counts["dead"] or counts["restricted"] or counts["invalid"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+find_duplicates.py — list videos that appear at more than one place in
+the catalog (see jac/videoindex.py), however their URLs are spelled.
+
+Usage:
+  python scripts/find_duplicates.py [--cross-file] [--out report.json] [file.json ...]
+
+By default every catalog file is checked on its own; --cross-file also
+reports a video that is in two different files. Named files replace
+the default list (episodes.json, episodes_MASTER_22.json,
+episodes_mobile.json). Exits 1 when duplicates were found.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.videoindex import CATALOG_FILES, build_index  # noqa: E402
+
+
+def describe(loc):
+    track = "encore" if loc["track"] == "encore" else f"track {loc['track'] + 1}"
+    return f"{loc['source']} {loc['path']} {track}: {loc.get('title') or ''}"
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="List videos that appear at more than one place in the catalog.")
+    parser.add_argument("files", nargs="*", metavar="file.json", help="catalog files (default: all of them)")
+    parser.add_argument("--cross-file", action="store_true", help="also report a video that is in two files")
+    parser.add_argument("--out", metavar="report.json", help="write the duplicates as JSON")
+    args = parser.parse_args(argv)
+    cross_file, out = args.cross_file, args.out
+    files = args.files or list(CATALOG_FILES)
+
+    index = build_index(ROOT, catalog_files=files, history_files=())
+    dups = index.duplicates(cross_file=cross_file)
+    print(f"{len(index)} distinct videos/links in {len(files)} file(s), {len(dups)} duplicated")
+    for key in sorted(dups):
+        print(key)
+        for loc in dups[key]:
+            print(f"  {describe(loc)}")
+
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump({"files": files, "crossFile": cross_file, "duplicates": dups},
+                      f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    return 1 if dups else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
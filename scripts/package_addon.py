@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+package_addon.py — zip plugin.video.joeysacousticcorner/ for the Kodi
+repository under kodi/, with the shared jac/ package vendored into it.
+
+Usage:
+  python scripts/package_addon.py [addon_dir] [--out kodi]
+
+Writes kodi/<id>-<version>.zip (the version comes from the addon's
+addon.xml; older zips of the same addon are removed), puts that
+addon.xml into kodi/addons.xml byte for byte and refreshes
+kodi/addons.xml.md5. Bump the version in addon.xml before packaging,
+or installed copies won't update. The addon's name, summary and
+description are what the repository shows; any that differ from the
+published entry are printed, so a change there is never a surprise.
+
+Everything in the addon directory goes in as-is (addon.xml, default.py,
+resources/settings.xml, ...); jac/ is added next to it. The addon
+imports jac/ from its own directory once installed (see the
+sys.path lines at the top of its default.py), so jac/ has to be inside
+the zip; the copy in the repo is never edited by hand.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_DIR = os.path.join(ROOT, "plugin.video.joeysacousticcorner")
+JAC_DIR = os.path.join(ROOT, "jac")
+
+# Fixed timestamp, so an unchanged addon packs into the same bytes.
+ZIP_TIME = (2026, 1, 1, 0, 0, 0)
+
+
+def _files(directory):
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__" and not d.startswith("."))
+        for name in sorted(filenames):
+            if not name.endswith((".pyc", ".pyo")) and not name.startswith("."):
+                yield os.path.join(dirpath, name)
+
+
+def _add(zf, path, arcname):
+    info = zipfile.ZipInfo(arcname, ZIP_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    with open(path, "rb") as f:
+        zf.writestr(info, f.read())
+
+
+def build_zip(addon_dir, addon_id, zip_path):
+    """Zips addon_dir as <addon_id>/ plus jac/ as <addon_id>/jac/. Returns the file count."""
+    count = 0
+    tmp = zip_path + ".tmp"
+    with zipfile.ZipFile(tmp, "w") as zf:
+        for path in _files(addon_dir):
+            rel = os.path.relpath(path, addon_dir).replace(os.sep, "/")
+            if rel == "jac" or rel.startswith("jac/"):
+                continue  # a stale vendored copy; the repo's jac/ wins
+            _add(zf, path, addon_id + "/" + rel)
+            count += 1
+        for path in _files(JAC_DIR):
+            rel = os.path.relpath(path, JAC_DIR).replace(os.sep, "/")
+            _add(zf, path, addon_id + "/jac/" + rel)
+            count += 1
+    os.replace(tmp, zip_path)
+    return count
+
+
+def listing(addon_xml):
+    """(name, summary, description) as the repository shows them."""
+    root = ET.fromstring(addon_xml.encode("utf-8"))
+    meta = root.find("extension[@point='xbmc.addon.metadata']")
+    text = (lambda tag: (meta.findtext(tag) or "").strip()) if meta is not None else (lambda tag: "")
+    return root.get("name"), text("summary"), text("description")
+
+
+def update_addons_xml(path, addon_id, addon_xml):
+    """
+    Replaces (or appends) the <addon id=...> block in the repository's
+    addons.xml. Returns the (field, old, new) listing changes.
+    """
+    body = re.sub(r"^\s*<\?xml[^>]*\?>\s*", "", addon_xml).strip()
+    block = "\n".join(("  " + line) if line.strip() else "" for line in body.splitlines())
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        text = '<?xml version="1.0" encoding="UTF-8"?>\n<addons>\n\n</addons>\n'
+
+    pattern = re.compile(r'[ \t]*<addon\s+id="' + re.escape(addon_id) + r'".*?</addon>', re.S)
+    published = pattern.search(text)
+    changes = []
+    if published:
+        fields = ("name", "summary", "description")
+        old = listing(published.group(0).strip())
+        changes = [(f, a, b) for f, a, b in zip(fields, old, listing(addon_xml)) if a != b]
+        text = pattern.sub(lambda _: block, text, count=1)
+    else:
+        text = text.replace("</addons>", block + "\n\n</addons>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    with open(path + ".md5", "w", encoding="utf-8") as f:
+        f.write(hashlib.md5(text.encode("utf-8")).hexdigest())
+    return changes
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Zip the plugin, with jac/ vendored, for the Kodi repository.")
+    parser.add_argument("addon_dir", nargs="?", default=ADDON_DIR)
+    parser.add_argument("--out", default=os.path.join(ROOT, "kodi"), metavar="DIR",
+                        help="repository directory (default kodi)")
+    args = parser.parse_args(argv)
+    out_dir, addon_dir = args.out, args.addon_dir
+
+    with open(os.path.join(addon_dir, "addon.xml"), "r", encoding="utf-8") as f:
+        addon_xml = f.read()
+    root = ET.fromstring(addon_xml.encode("utf-8"))
+    addon_id, version = root.get("id"), root.get("version")
+
+    os.makedirs(out_dir, exist_ok=True)
+    zip_name = f"{addon_id}-{version}.zip"
+    count = build_zip(addon_dir, addon_id, os.path.join(out_dir, zip_name))
+    for other in os.listdir(out_dir):
+        if other.startswith(addon_id + "-") and other.endswith(".zip") and other != zip_name:
+            os.remove(os.path.join(out_dir, other))
+    changes = update_addons_xml(os.path.join(out_dir, "addons.xml"), addon_id, addon_xml)
+    print(f"Kodi addon: {addon_id} {version} ({count} files) -> {os.path.join(out_dir, zip_name)}")
+    for field, old, new in changes:
+        print(f"  ! published {field} changed: {old!r} -> {new!r}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
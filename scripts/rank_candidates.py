@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+rank_candidates.py — score every video in data/discovery-candidates.json
+in one batch (see jac/scoring.py) and print a ranked shortlist for review.
+
+Usage:
+  python scripts/rank_candidates.py [--top N] [--out shortlist.json]
+
+Uses the blockedTerms / blockedChannelKeywords / minDurationMinutes from
+data/artist-watchlist.json, the channels in data/trusted-channels.json,
+and skips videos already in the approved or rejected history.
+Needs numpy.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.scoring import MIN_SHOW_MINUTES, NON_PERFORMANCE_KEYWORDS, PERFORMANCE_KEYWORDS, rank  # noqa: E402
+
+
+def load(name, default=None):
+    try:
+        with open(os.path.join(ROOT, "data", name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Rank the discovery candidates for review.")
+    parser.add_argument("--top", type=int, default=50, metavar="N", help="shortlist length (default 50)")
+    parser.add_argument("--out", metavar="shortlist.json", help="write the shortlist as JSON")
+    args = parser.parse_args(argv)
+    top, out = args.top, args.out
+
+    candidates = load("discovery-candidates.json", [])
+    watchlist = load("artist-watchlist.json", {})
+
+    started = time.perf_counter()
+    shortlist = rank(
+        candidates,
+        approved=load("approved-history.json", []),
+        rejected=load("rejected-history.json", []),
+        include=PERFORMANCE_KEYWORDS,
+        exclude=NON_PERFORMANCE_KEYWORDS,
+        blocked_terms=watchlist.get("blockedTerms", []),
+        blocked_channels=watchlist.get("blockedChannelKeywords", []),
+        trusted_channels=load("trusted-channels.json", []),
+        min_minutes=watchlist.get("minDurationMinutes", MIN_SHOW_MINUTES),
+        top=top,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"Scored {len(candidates)} candidates in {elapsed_ms:.1f} ms; top {len(shortlist)}:")
+    for i, (score, c, _) in enumerate(shortlist, 1):
+        print(f"{i:3}. {score:.3f}  {c.get('videoId')}  {c.get('title', '')[:70]}  [{c.get('channelName', '')}]")
+
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump([dict(c, score=round(score, 4), features=features) for score, c, features in shortlist],
+                      f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
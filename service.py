@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Background service (xbmc.service): keeps the parsed catalog in memory
+for as long as Kodi runs and refreshes it every cache_ttl_minutes.
+default.py asks it for folders over a loopback socket (jac/service.py)
+and falls back to fetching the catalog itself when it isn't running.
+
+It also feeds "Play All" queues: default.py starts the first few
+tracks and hands the queue over, and QueueFeeder adds the rest a few
+at a time as playback moves along, and downloads the thumbnails a
+listing didn't have cached yet (jac/artwork.py ArtWarmer), so the
+plugin never waits on them.
+"""
+import itertools
+import os
+import threading
+
+import xbmc
+import xbmcaddon
+import xbmcvfs
+
+from jac.artwork import ArtCache, ArtWarmer
+from jac.cache import JsonCache
+from jac.delta import DeltaSync
+from jac.service import PORT_FILE, CatalogServer
+from jac.youtube import iter_track_video_ids, youtube_play_video
+
+ADDON = xbmcaddon.Addon()
+PROFILE_DIR = xbmcvfs.translatePath(ADDON.getAddonInfo("profile"))
+
+# Same site as default.py
+SITE = "https://mellifluous-tanuki-51d911.netlify.app"
+EP_URL = SITE + "/episodes.json"
+VERSION_URL = SITE + "/catalog/version.json"
+
+UA = "Kodi/21 JoeysAcousticCorner"
+
+# Retry sooner than the TTL while there is no catalog at all
+RETRY_SECONDS = 60
+
+# Playlist items kept queued after the one playing (same as default.py)
+QUEUE_AHEAD = 3
+
+def log(msg):
+    xbmc.log(f"[JAC] {msg}", xbmc.LOGINFO)
+
+def get_setting_int(key, default):
+    try:
+        return int(ADDON.getSetting(key))
+    except (TypeError, ValueError):
+        return default
+
+class QueueFeeder(xbmc.Player):
+    """Tops the video playlist up to QUEUE_AHEAD items past the playing one."""
+
+    def __init__(self):
+        xbmc.Player.__init__(self)
+        self.lock = threading.Lock()
+        self.ids = None
+        self.added = set()
+
+    def feed(self, request):
+        # "queue" op: {"node": queue episode, "queued": items already added},
+        # or {"ids": [video IDs in play order], ...} from a fast-path play
+        if "ids" in request:
+            ids = iter(request.get("ids") or [])
+        else:
+            ids = iter_track_video_ids(request.get("node") or {})
+        pl = xbmc.PlayList(xbmc.PLAYLIST_VIDEO)
+        with self.lock:
+            self.ids = itertools.islice(ids, int(request.get("queued", 0)), None)
+            self.added = {pl[i].getPath() for i in range(pl.size())}
+            self._top_up(pl, max(0, pl.getposition()))
+        return {"ok": True}
+
+    def _top_up(self, pl, pos):
+        while self.ids is not None and pl.size() - pos - 1 < QUEUE_AHEAD:
+            vid = next(self.ids, None)
+            if vid is None:
+                self.ids = None
+                break
+            url = youtube_play_video(vid)
+            pl.add(url)
+            self.added.add(url)
+
+    def onAVStarted(self):
+        with self.lock:
+            if self.ids is None:
+                return
+            pl = xbmc.PlayList(xbmc.PLAYLIST_VIDEO)
+            pos = pl.getposition()
+            # Something else replaced our playlist: stop feeding it.
+            if pos < 0 or pl[pos].getPath() not in self.added:
+                self.ids = None
+                return
+            self._top_up(pl, pos)
+
+    def onPlayBackStopped(self):
+        with self.lock:
+            self.ids = None
+
+def art_warmer():
+    # Same directory and budget as default.py's ArtCache
+    if ADDON.getSetting("art_enabled") == "false":
+        return None
+    budget = get_setting_int("art_cache_mb", 50) * 1024 * 1024
+    return ArtWarmer(ArtCache(os.path.join(PROFILE_DIR, "art"), budget=budget, user_agent=UA, log=log))
+
+def refresh_seconds():
+    return max(60, get_setting_int("cache_ttl_minutes", 15) * 60)
+
+def fetch_catalog(cache):
+    # Only the deltas since the last refresh when the site publishes them;
+    # otherwise the cache revalidates with ETag/Last-Modified, so an
+    # unchanged catalog costs a 304. Either way no re-publish if unchanged.
+    try:
+        return DeltaSync(cache, VERSION_URL, EP_URL, log=log).get(ttl=refresh_seconds())
+    except Exception as e:
+        log(f"Service: delta sync unavailable ({e})")
+    return cache.get("episodes", EP_URL, ttl=refresh_seconds())
+
+def refresh(server, cache):
+    try:
+        data = fetch_catalog(cache)
+    except Exception as e:
+        log(f"Service: catalog refresh failed: {e}")
+        return False
+    if not isinstance(data, list):
+        log("Service: episodes.json was not a list (bad format).")
+        return False
+    version = cache.version("episodes")
+    if version != server.version:
+        server.publish(data, version)
+    return True
+
+def run():
+    monitor = xbmc.Monitor()
+    if ADDON.getSetting("service_enabled") == "false":
+        log("Service: disabled in settings")
+        monitor.waitForAbort()
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    # Own cache dir: the plugin writes to "cache" from another process.
+    cache = JsonCache(os.path.join(PROFILE_DIR, "service-cache"), user_agent=UA, log=log)
+    feeder = QueueFeeder()
+    handlers = {"queue": feeder.feed}
+    warmer = art_warmer()
+    if warmer is not None:
+        # "art" op: {"urls": [thumbnail URLs]}; answered before any download
+        handlers["art"] = lambda request: {"ok": True, "queued": warmer.queue(request.get("urls"))}
+        warmer.start()
+    server = CatalogServer(os.path.join(PROFILE_DIR, PORT_FILE), log=log, handlers=handlers)
+    server.start()
+    try:
+        while not monitor.abortRequested():
+            ok = refresh(server, cache)
+            wait = refresh_seconds() if ok or server.version else RETRY_SECONDS
+            if monitor.waitForAbort(wait):
+                break
+    finally:
+        server.stop()
+        if warmer is not None:
+            warmer.stop()
+            log(warmer.art.summary())
+        log("Service: stopped")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+ArtCache against a local http.server stand-in image host: prefetch()
+downloads in parallel and gives up at its deadline, evict() keeps the
+directory under the byte budget by least recent use, and a cached
+image costs no request. ArtWarmer.queue() returns before downloading.
+
+  python -m pytest -q tests/test_artwork.py
+"""
+
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.artwork import ArtCache, ArtWarmer  # noqa: E402
+
+IMAGE = b"\xff\xd8\xff\xe0" + b"\x00" * 1020  # 1 KB "JPEG"
+
+
+class StandIn(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        http.server.ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), Handler)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.delay = 0.0  # seconds before each /slow/ response
+
+    @property
+    def base(self):
+        return "http://127.0.0.1:%d" % self.server_address[1]
+
+    def handle_error(self, request, client_address):
+        pass  # a client that timed out hung up on a slow response
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+        try:
+            if self.path.startswith("/slow/"):
+                time.sleep(self.server.delay)
+            if self.path.startswith("/gone/"):
+                self._send(404, b"gone")
+            else:
+                self._send(200, IMAGE, [("Content-Type", "image/jpeg")])
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+
+class ArtTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StandIn()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.dir = tempfile.mkdtemp(prefix="jac-art-")
+        self.art = ArtCache(self.dir, workers=4, user_agent="test")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def urls(self, prefix, count):
+        return ["%s/%s/%d.jpg" % (self.server.base, prefix, i) for i in range(count)]
+
+
+class ArtCacheTest(ArtTestCase):
+    def test_prefetch_runs_in_parallel(self):
+        self.server.delay = 0.3
+        urls = self.urls("slow", 4)
+        started = time.monotonic()
+        found = self.art.prefetch(urls, timeout=2.0)
+        elapsed = time.monotonic() - started
+        self.assertEqual(sorted(found), sorted(urls))
+        self.assertEqual(self.server.peak, 4)
+        self.assertLess(elapsed, 4 * 0.3)
+        for path in found.values():
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), IMAGE)
+        self.assertEqual(self.art.stats["fetched"], 4)
+
+    def test_prefetch_gives_up_at_the_deadline(self):
+        self.server.delay = 0.5
+        self.art.workers = 1
+        urls = self.urls("slow", 5)
+        started = time.monotonic()
+        found = self.art.prefetch(urls, timeout=0.2)
+        elapsed = time.monotonic() - started
+        # The download in flight runs into its socket timeout (at about
+        # the deadline, so a second one may just have started); the rest
+        # never start.
+        self.assertEqual(found, {})
+        self.assertGreaterEqual(self.art.stats["skipped"], 3)
+        self.assertLessEqual(self.server.requests, 2)
+        self.assertLess(elapsed, 1.0)
+
+    def test_cache_hit_makes_no_request(self):
+        urls = self.urls("img", 3)
+        first = self.art.prefetch(urls)
+        self.assertEqual(self.server.requests, 3)
+        second = self.art.prefetch(urls)
+        self.assertEqual(second, first)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.art.stats["hits"], 3)
+        self.assertEqual(self.art.lookup(urls[0]), first[urls[0]])
+
+    def test_404_is_not_asked_for_again(self):
+        url = self.server.base + "/gone/1.jpg"
+        self.assertEqual(self.art.prefetch([url]), {})
+        self.assertEqual(self.art.prefetch([url]), {})
+        self.assertEqual(self.server.requests, 1)
+
+    def test_evict_drops_least_recently_used(self):
+        urls = self.urls("img", 5)
+        found = self.art.prefetch(urls)
+        now = time.time()
+        for age, url in enumerate(reversed(urls)):
+            os.utime(found[url], (now - 100 - age, now - 100 - age))
+        # The oldest one is used again, so it's the newest now.
+        self.art.lookup(urls[0])
+
+        self.art.budget = 3 * len(IMAGE)
+        self.assertEqual(self.art.evict(), 3 * len(IMAGE))
+        self.assertEqual(self.art.stats["evicted"], 2)
+        kept = [url for url in urls if os.path.exists(found[url])]
+        self.assertEqual(kept, [urls[0], urls[3], urls[4]])
+
+
+class ArtWarmerTest(ArtTestCase):
+    def test_queue_returns_before_downloading(self):
+        self.server.delay = 0.3
+        warmer = ArtWarmer(self.art, timeout=2.0)
+        warmer.start()
+        try:
+            urls = self.urls("slow", 2)
+            started = time.monotonic()
+            self.assertEqual(warmer.queue(urls + [None]), 2)
+            self.assertLess(time.monotonic() - started, 0.1)
+            self.assertIsNone(self.art.lookup(urls[0]))
+        finally:
+            warmer.stop()
+        self.assertTrue(all(self.art.lookup(url) for url in urls))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+check_links() against a local http.server stand-in for the oEmbed
+endpoint: the concurrency cap, per-host rate limiting, HealthCache
+reuse (only stale entries are asked about again) and the report shape.
+The stand-in answers by video/playlist ID prefix: "dead" 404, "priv"
+403, "gone" 410 (an "error"), anything else 200.
+
+  python -m pytest -q tests/test_linkcheck.py
+"""
+
+import http.server
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.linkcheck import (  # noqa: E402
+    HealthCache,
+    RateLimiter,
+    build_report,
+    check_links,
+    collect_links,
+    link_keys,
+)
+
+_CODES = (("dead", 404), ("priv", 403), ("gone", 410))
+
+
+class StandIn(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        http.server.ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), Handler)
+        self.lock = threading.Lock()
+        self.asked = []  # (monotonic time, link ID) per request
+        self.in_flight = 0
+        self.peak = 0
+        self.delay = 0.0
+
+    @property
+    def endpoint(self):
+        return "http://127.0.0.1:%d/oembed?format=json&url={url}" % self.server_address[1]
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        watch = urllib.parse.parse_qs(urllib.parse.urlsplit(query["url"][0]).query)
+        ident = (watch.get("v") or watch.get("list"))[0]
+        with self.server.lock:
+            self.server.asked.append((time.monotonic(), ident))
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+        try:
+            time.sleep(self.server.delay)
+            code = next((c for prefix, c in _CODES if ident.startswith(prefix)), 200)
+            if code == 200:
+                self._send(200, json.dumps({"title": "Title " + ident}).encode("utf-8"),
+                           [("Content-Type", "application/json")])
+            else:
+                self._send(code, b"")
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+
+def video(ident):
+    return "https://www.youtube.com/watch?v=" + ident
+
+
+def catalog(*urls):
+    return [{"title": "Show", "mode": "queue", "tracks": [{"title": "T%d" % i, "url": u} for i, u in enumerate(urls)]}]
+
+
+class LinkCheckTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandIn()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.dir = tempfile.mkdtemp(prefix="jac-links-")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_url_with_both_ids_gives_both_keys(self):
+        url = video("okAAAAAAAAA") + "&list=PLshow"
+        self.assertEqual(link_keys(url), ["video:okAAAAAAAAA", "playlist:PLshow"])
+        links = collect_links({"episodes.json": catalog(url)})
+        self.assertEqual(sorted(links), ["playlist:PLshow", "video:okAAAAAAAAA"])
+        self.assertEqual(links["playlist:PLshow"], links["video:okAAAAAAAAA"])
+        self.assertEqual(link_keys("https://example.com/"), [])
+
+    def test_concurrency_is_capped(self):
+        self.server.delay = 0.1
+        keys = ["video:ok%09d" % i for i in range(12)]
+        results, stats = check_links(keys, self.server.endpoint, concurrency=3, rate=0)
+        self.assertEqual(self.server.peak, 3)
+        self.assertEqual(len(self.server.asked), 12)
+        self.assertEqual({r["status"] for r in results.values()}, {"ok"})
+        self.assertEqual(stats["checked"], 12)
+
+    def test_requests_to_one_host_are_spaced_out(self):
+        keys = ["video:ok%09d" % i for i in range(5)]
+        check_links(keys, self.server.endpoint, concurrency=5, rate=10)
+        times = sorted(t for t, _ in self.server.asked)
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        self.assertEqual(len(times), 5)
+        self.assertGreater(min(gaps), 0.08)
+
+    def test_rate_limit_is_per_host(self):
+        limiter = RateLimiter(10)
+        started = time.monotonic()
+        for _ in range(3):
+            limiter.wait("a.example")
+            limiter.wait("b.example")
+        # Two slots of 0.1 s per host; the hosts don't queue behind each other.
+        self.assertLess(time.monotonic() - started, 0.35)
+
+    def test_cache_reuses_fresh_answers(self):
+        path = os.path.join(self.dir, "cache.json")
+        keys = ["video:okAAAAAAAAA", "video:deadAAAAAAA", "video:goneAAAAAAA", "playlist:PLshow"]
+        cache = HealthCache(path, ttl=3600)
+        check_links(keys, self.server.endpoint, rate=0, cache=cache)
+        cache.save()
+        self.assertEqual(len(self.server.asked), 4)
+
+        # One entry goes stale; the "error" one was never cached.
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertNotIn("video:goneAAAAAAA", data["links"])
+        data["links"]["video:deadAAAAAAA"]["checked"] -= 7200
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        del self.server.asked[:]
+        results, stats = check_links(keys, self.server.endpoint, rate=0, cache=HealthCache(path, ttl=3600))
+        self.assertEqual(sorted(ident for _, ident in self.server.asked), ["deadAAAAAAA", "goneAAAAAAA"])
+        self.assertEqual(stats, dict(stats, links=4, cached=2, checked=2))
+        self.assertEqual(results["playlist:PLshow"]["title"], "Title PLshow")
+
+    def test_report_lists_problems_with_locations(self):
+        trees = {
+            "episodes.json": catalog(video("okAAAAAAAAA"), video("deadAAAAAAA")),
+            "episodes_mobile.json": catalog(video("privAAAAAAA"), video("deadAAAAAAA")),
+        }
+        links = collect_links(trees)
+        results, stats = check_links(links, self.server.endpoint, rate=0)
+        report = build_report(links, results, stats, self.server.endpoint)
+
+        self.assertEqual(sorted(report), ["counts", "endpoint", "generated", "problems", "stats"])
+        self.assertEqual(report["counts"], {"ok": 1, "restricted": 1, "dead": 1, "invalid": 0, "error": 0})
+        self.assertEqual(report["stats"], stats)
+        dead, restricted = report["problems"]
+        self.assertEqual((dead["status"], dead["code"], dead["kind"], dead["id"]),
+                         ("dead", 404, "video", "deadAAAAAAA"))
+        self.assertEqual(dead["url"], video("deadAAAAAAA"))
+        self.assertEqual(dead["locations"], [
+            {"source": "episodes.json", "path": "0", "track": 1, "title": "T1"},
+            {"source": "episodes_mobile.json", "path": "0", "track": 1, "title": "T1"},
+        ])
+        self.assertEqual((restricted["status"], restricted["code"]), ("restricted", 403))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+HttpClient against a local http.server stand-in: gzip decoding, one
+keep-alive connection across requests, and retries on 503 and on a
+reset connection. Bytes on the wire and round trips come from the
+client's own stats and the server's count of what it saw.
+
+  python -m pytest -q tests/test_transport.py
+"""
+
+import gzip
+import http.server
+import os
+import socket
+import struct
+import sys
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jac.transport import HttpClient  # noqa: E402
+
+BODY = b'{"title": "Unplugged"}' * 200
+
+
+class StandIn(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        http.server.ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), Handler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.failures = {}  # path -> how many more times to fail it
+
+    @property
+    def base(self):
+        return "http://127.0.0.1:%d" % self.server_address[1]
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        http.server.BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _fail_once(self):
+        with self.server.lock:
+            left = self.server.failures.get(self.path, 0)
+            if left:
+                self.server.failures[self.path] = left - 1
+            return bool(left)
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        if self.path == "/gzip" and "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._send(200, gzip.compress(BODY), [("Content-Encoding", "gzip")])
+        elif self.path == "/busy" and self._fail_once():
+            self._send(503, b"busy", [("Retry-After", "0")])
+        elif self.path == "/reset" and self._fail_once():
+            # RST instead of a response: linger 0, then close.
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.connection.close()
+            self.close_connection = True
+        else:
+            self._send(200, BODY)
+
+
+class HttpClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandIn()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = HttpClient(user_agent="test", timeout=5, retries=2, backoff=0.001, max_backoff=0.01)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_gzip_is_decoded(self):
+        resp = self.client.get(self.server.base + "/gzip")
+        self.assertEqual(resp.body, BODY)
+        self.assertEqual(resp.headers.get("Content-Encoding"), "gzip")
+        self.assertLess(resp.wire_bytes, len(BODY) // 10)
+        self.assertEqual(self.client.stats["wire_bytes"], resp.wire_bytes)
+        self.assertEqual(self.client.stats["body_bytes"], len(BODY))
+
+    def test_connection_is_reused(self):
+        for path in ("/plain", "/gzip", "/plain", "/gzip", "/plain"):
+            self.assertEqual(self.client.get(self.server.base + path).body, BODY)
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.client.stats["connections"], 1)
+        self.assertEqual(self.client.stats["reused"], 4)
+
+    def test_503_is_retried(self):
+        self.server.failures["/busy"] = 2
+        resp = self.client.get(self.server.base + "/busy")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.client.stats["retries"], 2)
+        self.assertEqual(self.client.stats["requests"], 1)
+
+    def test_503_gives_up_after_retries(self):
+        self.server.failures["/busy"] = 5
+        resp = self.client.request("GET", self.server.base + "/busy")
+        self.assertEqual(resp.status, 503)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_connection_reset_is_retried(self):
+        self.server.failures["/reset"] = 1
+        resp = self.client.get(self.server.base + "/reset")
+        self.assertEqual(resp.body, BODY)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.client.stats["retries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()